@@ -103,7 +103,11 @@ def main():
     project_slug = "{{ cookiecutter.project_slug }}"
     ci_provider = "{{ cookiecutter.ci_provider }}"
     use_celery = "{{ cookiecutter.use_celery }}"
+    celery_results = "{{ cookiecutter.celery_results }}"
     include_oauth2 = "{{ cookiecutter.include_oauth2 }}"
+    server = "{{ cookiecutter.server }}"
+    include_sentry = "{{ cookiecutter.include_sentry }}"
+    include_opentelemetry = "{{ cookiecutter.include_opentelemetry }}"
 
     # 1. Generate SECRET_KEY
     new_secret_key = generate_secret_key()
@@ -131,7 +135,30 @@ def main():
     if use_celery == "n":
         print("\nRemoving Celery configuration...")
         remove_file(f"{project_slug}/celery.py")
-        remove_docker_compose_services(["celeryworker", "celerybeat"], "docker-compose.yml")
+        remove_docker_compose_services(
+            ["celeryworker-critical", "celeryworker-default", "celeryworker-bulk", "celerybeat"],
+            "docker-compose.yml",
+        )
+        remove_file(f"{project_slug}/core/beat.py")
+        remove_file(f"{project_slug}/core/tests/test_beat.py")
+        remove_file(f"{project_slug}/core/batching.py")
+        remove_file(f"{project_slug}/core/tests/test_batching.py")
+        remove_file(f"{project_slug}/core/unique.py")
+        remove_file(f"{project_slug}/core/tests/test_unique.py")
+        remove_file(f"{project_slug}/core/claim_check.py")
+        remove_file(f"{project_slug}/core/tests/test_claim_check.py")
+        remove_file(f"{project_slug}/core/serialization.py")
+        remove_file(f"{project_slug}/core/tests/test_serialization.py")
+        remove_file(f"{project_slug}/core/tests/test_task_routes.py")
+        remove_file("benchmarks/celery_workers.py")
+        remove_file("benchmarks/celery_serialization.py")
+        remove_file("benchmarks/celery_batching.py")
+        remove_file("benchmarks/celery_beat.py")
+
+    # Remove the result cleanup task unless results are stored with django_celery_results
+    if use_celery == "n" or celery_results != "django-db":
+        remove_file(f"{project_slug}/core/results.py")
+        remove_file(f"{project_slug}/core/tests/test_results.py")
 
     # 4. Remove OAuth2 if not needed
     if include_oauth2 == "n":
@@ -139,17 +166,35 @@ def main():
         remove_file(".env.oauth2.example")
         remove_file(f"{project_slug}/accounts/oauth2")
         remove_file(f"{project_slug}/accounts/api/oauth2.py")
-
-    # 5. Initialize Git repository
+        remove_file("benchmarks/api/test_oauth2.py")
+        remove_file("benchmarks/load/fake_oauth2.py")
+
+    # 5. Remove the gunicorn config if another server is used
+    if not server.startswith("gunicorn"):
+        print("\nRemoving gunicorn configuration...")
+        remove_file("gunicorn.conf.py")
+        remove_file("benchmarks/preload.py")
+
+    # 6. Remove the Sentry benchmark if Sentry is not used
+    if include_sentry == "n":
+        remove_file("benchmarks/sentry.py")
+
+    # 7. Remove the tracing setup if OpenTelemetry is not used
+    if include_opentelemetry == "n":
+        remove_file(f"{project_slug}/core/tracing.py")
+        remove_file(f"{project_slug}/core/tests/test_tracing.py")
+        remove_file("benchmarks/tracing.py")
+
+    # 8. Initialize Git repository
     if not run_command("git init", "Initialize Git repository"):
         steps_succeeded = False
 
-    # 6. Install dependencies with uv
+    # 9. Install dependencies with uv
     print("\nInstalling dependencies with uv...")
     if not run_command("uv sync", "Install dependencies with uv"):
         print("--- uv sync failed. Run 'uv sync' manually later. ---", file=sys.stderr)
 
-    # 7. Install pre-commit hooks
+    # 10. Install pre-commit hooks
     if steps_succeeded:
         try:
             result = run_command("uv run pre-commit install", "Install pre-commit Git hooks")
@@ -158,7 +203,7 @@ def main():
         except Exception:
             print("--- pre-commit install skipped (can be installed manually) ---")
 
-    # 8. Initial commit
+    # 11. Initial commit
     if steps_succeeded:
         print("\nAttempting initial Git commit...")
         if run_command("git add .", "Stage all files"):
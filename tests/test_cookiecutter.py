@@ -43,9 +43,14 @@ def test_context():
         "ci_provider": "github",
         "use_docker": "y",
         "use_celery": "y",
+        "celery_results": "redis",
+        "use_db_pool": "y",
+        "use_pgbouncer": "n",
+        "server": "gunicorn-gthread",
         "include_oauth2": "y",
         "oauth2_providers": ["google", "github", "facebook"],
         "include_sentry": "y",
+        "include_opentelemetry": "n",
         "api_versioning": "none",
         "django_secret_key": "test-secret-key-for-testing-only",
         "postgresql_user": "test_user",
@@ -79,9 +84,14 @@ class TestCookiecutterTemplate:
             "ci_provider",
             "use_docker",
             "use_celery",
+            "celery_results",
+            "use_db_pool",
+            "use_pgbouncer",
+            "server",
             "include_oauth2",
             "oauth2_providers",
             "include_sentry",
+            "include_opentelemetry",
             "api_versioning",
             "django_secret_key",
             "postgresql_user",
@@ -453,6 +463,179 @@ class TestCookiecutterGeneration:
                 # but they should at least be syntactically valid
                 pass
 
+    @pytest.mark.parametrize("use_db_pool,expected", [("y", "True"), ("n", "False")])
+    def test_db_pool_option(self, temp_dir, template_dir, test_context, use_db_pool, expected):
+        """Test that use_db_pool sets the connection pooling default in settings."""
+        pytest.importorskip("cookiecutter")
+        from cookiecutter.main import cookiecutter
+
+        test_context["use_db_pool"] = use_db_pool
+        generated_project = cookiecutter(
+            template_dir, no_input=True, extra_context=test_context, output_dir=temp_dir
+        )
+
+        settings_dir = os.path.join(generated_project, test_context["project_slug"], "settings")
+        for settings_file in ["local.py", "production.py"]:
+            with open(os.path.join(settings_dir, settings_file), "r") as f:
+                content = f.read()
+            compile(content, settings_file, "exec")
+            pool_line = next(line for line in content.splitlines() if line.startswith("DB_POOL ="))
+            assert f"default={expected}" in pool_line, (
+                f"{settings_file} should default DB_POOL to {expected}"
+            )
+            assert "get_connection_settings(DB_POOL" in content
+
+        with open(os.path.join(generated_project, ".env.example"), "r") as f:
+            assert f"DB_POOL={expected}" in f.read()
+
+    @pytest.mark.parametrize("use_pgbouncer", ["y", "n"])
+    def test_pgbouncer_option(self, temp_dir, template_dir, test_context, use_pgbouncer):
+        """Test that use_pgbouncer routes app services through the pgbouncer service."""
+        pytest.importorskip("cookiecutter")
+        yaml = pytest.importorskip("yaml")
+        from cookiecutter.main import cookiecutter
+
+        test_context["use_pgbouncer"] = use_pgbouncer
+        generated_project = cookiecutter(
+            template_dir, no_input=True, extra_context=test_context, output_dir=temp_dir
+        )
+
+        with open(os.path.join(generated_project, "docker-compose.yml"), "r") as f:
+            services = yaml.safe_load(f)["services"]
+
+        expected_host = "pgbouncer" if use_pgbouncer == "y" else "db"
+        assert ("pgbouncer" in services) == (use_pgbouncer == "y")
+        for service in ["web", "celeryworker-critical", "celeryworker-bulk", "celerybeat"]:
+            environment = [entry.split(" ")[0] for entry in services[service]["environment"]]
+            assert f"POSTGRES_HOST={expected_host}" in environment, (
+                f"{service} should connect to {expected_host}"
+            )
+
+    def test_read_replica_setup(self, temp_dir, template_dir, test_context):
+        """Test that the streaming replica service and router settings are generated."""
+        pytest.importorskip("cookiecutter")
+        yaml = pytest.importorskip("yaml")
+        from cookiecutter.main import cookiecutter
+
+        generated_project = cookiecutter(
+            template_dir, no_input=True, extra_context=test_context, output_dir=temp_dir
+        )
+
+        with open(os.path.join(generated_project, "docker-compose.yml"), "r") as f:
+            services = yaml.safe_load(f)["services"]
+        assert services["db-replica"]["profiles"] == ["replica"]
+
+        for script in ["primary-replication.sh", "replica-entrypoint.sh"]:
+            assert os.path.exists(os.path.join(generated_project, "compose", "postgres", script))
+
+        project_slug = test_context["project_slug"]
+        for settings_file in ["local.py", "production.py"]:
+            settings_path = os.path.join(generated_project, project_slug, "settings", settings_file)
+            with open(settings_path, "r") as f:
+                content = f.read()
+            assert "get_replica_databases(DATABASES" in content
+            assert "core.routers.PrimaryReplicaRouter" in content
+
+    @pytest.mark.parametrize(
+        "server,command,dependency",
+        [
+            ("gunicorn-sync", "gunicorn", '"gunicorn'),
+            ("gunicorn-gthread", "gunicorn", '"gunicorn'),
+            ("gunicorn-uvicorn", "gunicorn", '"uvicorn-worker'),
+            ("granian", "granian", '"granian'),
+        ],
+    )
+    def test_server_option(self, temp_dir, template_dir, test_context, server, command, dependency):
+        """Test that the server option selects the Docker command, config and dependencies."""
+        pytest.importorskip("cookiecutter")
+        from cookiecutter.main import cookiecutter
+
+        test_context["server"] = server
+        generated_project = cookiecutter(
+            template_dir, no_input=True, extra_context=test_context, output_dir=temp_dir
+        )
+
+        with open(os.path.join(generated_project, "Dockerfile"), "r") as f:
+            cmd = [line for line in f if line.startswith("CMD")][-1]
+        assert f'CMD ["{command}"' in cmd
+        entrypoint = "asgi" if server == "gunicorn-uvicorn" else "wsgi"
+        assert f"{test_context['project_slug']}.{entrypoint}:application" in cmd
+
+        with open(os.path.join(generated_project, "pyproject.toml"), "r") as f:
+            assert dependency in f.read()
+
+        gunicorn_conf = os.path.join(generated_project, "gunicorn.conf.py")
+        assert os.path.exists(gunicorn_conf) == server.startswith("gunicorn")
+        preload_benchmark = os.path.join(generated_project, "benchmarks", "preload.py")
+        assert os.path.exists(preload_benchmark) == server.startswith("gunicorn")
+        if server.startswith("gunicorn"):
+            with open(gunicorn_conf, "r") as f:
+                source = f.read()
+            compile(source, gunicorn_conf, "exec")
+            worker_class = server.split("-")[1].replace("uvicorn", "uvicorn_worker.UvicornWorker")
+            assert f"worker_class = '{worker_class}'" in source
+            for hook in ["def pre_fork", "def post_fork", "def post_worker_init", "def child_exit"]:
+                assert hook in source
+            assert "PROMETHEUS_MULTIPROC_DIR" in source
+
+    @pytest.mark.parametrize("use_celery", ["y", "n"])
+    def test_celery_option(self, temp_dir, template_dir, test_context, use_celery):
+        """Test that use_celery adds or removes the per-queue workers and the Celery app."""
+        pytest.importorskip("cookiecutter")
+        yaml = pytest.importorskip("yaml")
+        from cookiecutter.main import cookiecutter
+
+        test_context["use_celery"] = use_celery
+        generated_project = cookiecutter(
+            template_dir, no_input=True, extra_context=test_context, output_dir=temp_dir
+        )
+
+        with open(os.path.join(generated_project, "docker-compose.yml"), "r") as f:
+            services = yaml.safe_load(f)["services"]
+        celery_services = sorted(name for name in services if name.startswith("celery"))
+        if use_celery == "y":
+            assert celery_services == [
+                "celerybeat",
+                "celeryworker-bulk",
+                "celeryworker-critical",
+                "celeryworker-default",
+            ]
+            command = services["celeryworker-bulk"]["command"]
+            assert "--queues bulk" in command
+        else:
+            assert celery_services == []
+
+        project_slug = test_context["project_slug"]
+        assert os.path.exists(os.path.join(generated_project, project_slug, "celery.py")) == (
+            use_celery == "y"
+        )
+        init_path = os.path.join(generated_project, project_slug, "__init__.py")
+        with open(init_path, "r") as f:
+            source = f.read()
+        compile(source, init_path, "exec")
+        assert ("from .celery import app" in source) == (use_celery == "y")
+
+    def test_static_files_built_into_image(self, temp_dir, template_dir, test_context):
+        """Test that collectstatic runs at build time with the compressed manifest storage."""
+        pytest.importorskip("cookiecutter")
+        from cookiecutter.main import cookiecutter
+
+        generated_project = cookiecutter(
+            template_dir, no_input=True, extra_context=test_context, output_dir=temp_dir
+        )
+
+        with open(os.path.join(generated_project, "Dockerfile"), "r") as f:
+            dockerfile = f.read()
+        production_stage = dockerfile.split("AS production", 1)[1]
+        assert "manage.py collectstatic --noinput" in production_stage
+
+        project_slug = test_context["project_slug"]
+        with open(os.path.join(generated_project, project_slug, "settings", "production.py")) as f:
+            assert "whitenoise.storage.CompressedManifestStaticFilesStorage" in f.read()
+        for module in ["wsgi.py", "asgi.py"]:
+            with open(os.path.join(generated_project, project_slug, module)) as f:
+                assert "check_static_manifest()" in f.read()
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,6 @@
+"""
+Benchmarks Package
+
+Standalone performance scripts for the project. Run them from the project root
+against a migrated database, e.g. ``python -m benchmarks.db_pool``.
+"""
@@ -0,0 +1,172 @@
+"""
+Fixtures and options for the accounts API benchmarks.
+
+The test database is seeded once per session with ``--users`` accounts (1k,
+100k or 1M) by the ``seed_users`` command, all with the same password. Use
+``--reuse-db`` to keep a seeded database between runs. Latency is measured by pytest-benchmark,
+whose saved runs are kept per dataset size in ``.benchmarks/users-<size>``.
+Query counts per request are compared with ``queries.json``.
+"""
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from benchmarks.common import API_PREFIX
+
+QUERY_BASELINE = Path(__file__).with_name('queries.json')
+DEFAULT_STORAGE = 'file://./.benchmarks'
+PASSWORD = 'benchmark-password'
+DATASETS = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+
+QUERY_COUNTS = pytest.StashKey[dict]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('accounts api benchmarks')
+    group.addoption(
+        '--users',
+        choices=list(DATASETS),
+        default='1k',
+        help='seeded dataset size (default: 1k)',
+    )
+    group.addoption(
+        '--query-threshold',
+        type=int,
+        default=0,
+        help='extra queries per request allowed over queries.json (default: 0)',
+    )
+    group.addoption(
+        '--update-query-baseline',
+        action='store_true',
+        help='write the measured query counts to queries.json',
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Runs before pytest-benchmark loads its storage: keep one history per dataset size
+    if config.getoption('benchmark_storage', None) == DEFAULT_STORAGE:
+        config.option.benchmark_storage = f'{DEFAULT_STORAGE}/users-{config.getoption("users")}'
+    config.stash[QUERY_COUNTS] = {}
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    counts = config.stash.get(QUERY_COUNTS, {})
+    if config.getoption('update_query_baseline') and counts:
+        baseline = json.loads(QUERY_BASELINE.read_text()) if QUERY_BASELINE.exists() else {}
+        baseline.update(counts)
+        QUERY_BASELINE.write_text(json.dumps(dict(sorted(baseline.items())), indent=2) + '\n')
+
+
+def seed_users(count: int) -> None:
+    """Add seeded accounts until the table holds ``count`` users."""
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+
+    missing = count - User.objects.count()
+    if missing > 0:
+        call_command('seed_users', missing, password=PASSWORD, seed=0, stdout=io.StringIO())
+
+
+@pytest.fixture(scope='session')
+def dataset_size(request) -> int:
+    return DATASETS[request.config.getoption('users')]
+
+
+@pytest.fixture(scope='session')
+def password() -> str:
+    """Password of every seeded user."""
+    return PASSWORD
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker, dataset_size):
+    with django_db_blocker.unblock():
+        seed_users(dataset_size)
+
+
+class ApiClient:
+    """JSON client for the API that checks each response's status code."""
+
+    def __init__(self):
+        from django.test import Client
+
+        self.client = Client()
+
+    def post(self, path, data, status=200, headers=None):
+        response = self.client.post(
+            API_PREFIX + path, json.dumps(data), content_type='application/json', headers=headers
+        )
+        assert response.status_code == status, response.content
+        return response
+
+    def get(self, path, status=200, headers=None):
+        response = self.client.get(API_PREFIX + path, headers=headers)
+        assert response.status_code == status, response.content
+        return response
+
+
+@pytest.fixture
+def api() -> ApiClient:
+    return ApiClient()
+
+
+@pytest.fixture(autouse=True)
+def benchmark_settings(settings):
+    # Development instrumentation would otherwise be part of every measurement
+    settings.DEBUG = False
+    settings.SERVER_TIMING_SAMPLE_RATE = 0
+    settings.QUERY_INSPECTOR_ENABLED = False
+
+
+@pytest.fixture
+def measure(benchmark, request, dataset_size):
+    """
+    Benchmark ``func`` and check its query count against ``queries.json``.
+
+    ``func`` is called once as a warm-up and once more to count its queries
+    before pytest-benchmark times it. ``setup``, if given, runs before every
+    call and returns its ``(args, kwargs)``.
+    """
+    from {{ cookiecutter.project_slug }}.core.queries import QueryInspector
+
+    config = request.config
+    name = request.node.name
+
+    def run(func, setup=None, rounds=None):
+        # The first call warms up imports and caches, the second one is counted
+        for _ in range(2):
+            args, kwargs = setup() if setup else ((), {})
+            inspector = QueryInspector()
+            with inspector.capture():
+                func(*args, **kwargs)
+        queries = len(inspector.queries)
+        config.stash[QUERY_COUNTS][name] = queries
+        benchmark.extra_info.update(queries=queries, users=dataset_size)
+
+        baseline = json.loads(QUERY_BASELINE.read_text()) if QUERY_BASELINE.exists() else {}
+        allowed = baseline.get(name)
+        if (
+            allowed is not None
+            and not config.getoption('update_query_baseline')
+            and queries > allowed + config.getoption('query_threshold')
+        ):
+            pytest.fail(
+                f'{name} ran {queries} queries per request, baseline is {allowed}\n'
+                + inspector.report(all_shapes=True),
+                pytrace=False,
+            )
+
+        if rounds:
+            result = benchmark.pedantic(func, setup=setup, rounds=rounds, warmup_rounds=1)
+        elif setup:
+            result = benchmark.pedantic(func, setup=setup, rounds=100, warmup_rounds=5)
+        else:
+            result = benchmark(func)
+        return result
+
+    return run
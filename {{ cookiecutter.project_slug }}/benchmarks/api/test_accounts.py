@@ -0,0 +1,65 @@
+"""
+Latency and query count benchmarks for the accounts API.
+
+Run from the project root (see the README for saving and comparing runs)::
+
+    pytest benchmarks/api --users 100k --reuse-db
+"""
+
+import itertools
+import random
+
+import pytest
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+
+pytestmark = pytest.mark.django_db
+
+# Password hashing dominates these, so fewer rounds give a stable mean
+HASHING_ROUNDS = 20
+
+_counter = itertools.count()
+
+
+@pytest.fixture
+def user(dataset_size):
+    return User.objects.filter(is_active=True).order_by('id')[dataset_size // 2]
+
+
+@pytest.fixture
+def auth_headers(user):
+    return {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+
+
+def test_register(api, measure, password):
+    def setup():
+        name = f'registered{next(_counter)}'
+        payload = {'username': name, 'email': f'{name}@example.com', 'password': password}
+        return ('/accounts/auth/register', payload, 201), {}
+
+    measure(api.post, setup=setup, rounds=HASHING_ROUNDS)
+
+
+def test_login(api, measure, user, password):
+    payload = {'username': user.username, 'password': password}
+    measure(lambda: api.post('/accounts/auth/login', payload), rounds=HASHING_ROUNDS)
+
+
+def test_users_me(api, measure, auth_headers):
+    measure(lambda: api.get('/accounts/users/me', headers=auth_headers))
+
+
+def test_user_by_id(api, measure, auth_headers, dataset_size):
+    first_id = User.objects.order_by('id').values_list('id', flat=True).first()
+
+    def setup():
+        # Spread lookups over the whole table rather than one cached row
+        user_id = first_id + random.randrange(dataset_size)
+        return (f'/accounts/users/{user_id}',), {'headers': auth_headers}
+
+    measure(api.get, setup=setup)
+
+
+def test_token_refresh(api, measure, user):
+    refresh = str(RefreshToken.for_user(user))
+    measure(lambda: api.post('/token/refresh/', {'refresh': refresh}))
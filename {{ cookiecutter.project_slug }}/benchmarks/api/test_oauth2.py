@@ -0,0 +1,69 @@
+"""
+Latency and query count benchmark for the OAuth2 callback.
+
+The provider is faked at the HTTP adapter, so the callback runs its real token
+exchange, user info and sign-up code without leaving the process.
+"""
+
+import itertools
+import json
+from unittest.mock import patch
+
+import pytest
+import requests
+from django.contrib.auth.models import User
+
+pytestmark = pytest.mark.django_db
+
+REDIRECT_URI = 'https://app.example.com/callback'
+
+_counter = itertools.count()
+
+
+class FakeProvider:
+    """Answer the token and user info requests of the Google OAuth2 flow."""
+
+    def __init__(self):
+        self.email = None
+
+    def send(self, request, **kwargs):
+        # Replaces HTTPAdapter.send as a bound method, so there is no adapter argument
+        if 'token' in request.url:
+            body = {'access_token': 'fake-access-token', 'token_type': 'Bearer'}
+        else:
+            body = {
+                'id': self.email,
+                'email': self.email,
+                'given_name': 'Bench',
+                'family_name': 'User',
+            }
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(body).encode()
+        response.headers['Content-Type'] = 'application/json'
+        response.request = request
+        return response
+
+
+def test_oauth2_callback(api, measure, settings):
+    settings.GOOGLE_OAUTH2_CLIENT_ID = 'benchmark-client'
+    settings.GOOGLE_OAUTH2_CLIENT_SECRET = 'benchmark-secret'
+    provider = FakeProvider()
+    # Every sign-up wants the username "oauth", which is taken a few times over
+    User.objects.bulk_create(User(username=f'oauth{n or ""}') for n in range(5))
+
+    def setup():
+        authorize = {'provider': 'google', 'redirect_uri': REDIRECT_URI}
+        state = api.post('/accounts/oauth2/authorize', authorize).json()['state']
+        # A new account per round, so each callback signs up a user
+        provider.email = f'oauth@{next(_counter)}.example.com'
+        payload = {
+            'provider': 'google',
+            'code': 'fake-code',
+            'state': state,
+            'redirect_uri': REDIRECT_URI,
+        }
+        return ('/accounts/oauth2/callback', payload), {}
+
+    with patch('requests.adapters.HTTPAdapter.send', provider.send):
+        measure(api.post, setup=setup)
@@ -0,0 +1,148 @@
+"""
+Redis cache set/get throughput and memory footprint per cache profile.
+
+Compares the ``django_redis`` defaults (pickle, no compression, pure-Python
+parser) with msgpack serialization and with the tuned profile from
+``core.cache.get_redis_cache_options`` (hiredis, msgpack and zstd above
+``CACHE_COMPRESS_MIN_LENGTH``) for typical cached objects:
+
+* ``oauth-state``: the state dict cached by ``/oauth2/authorize``
+* ``user-dict``: a user profile as returned by the API
+* ``user-model``: a ``User`` instance (falls back to pickle in msgpack)
+* ``user-page``: a list of 100 user profiles
+
+Memory is Redis' ``MEMORY USAGE`` for the key, including its overhead.
+
+Usage (from the project root, with the ``redis`` service running)::
+
+    python -m benchmarks.cache --operations 5000 --concurrency 1
+"""
+
+import argparse
+from datetime import UTC, datetime
+from typing import Any
+
+from benchmarks.common import print_table, run_concurrently, setup_django
+
+PURE_PYTHON_PARSER = 'redis._parsers.resp2._RESP2Parser'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--operations', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--location', default=None, help='Redis URL, defaults to CACHE_URL')
+    return parser.parse_args()
+
+
+def get_variants() -> dict[str, dict[str, Any]]:
+    from {{ cookiecutter.project_slug }}.core.cache import get_redis_cache_options
+
+    tuned = get_redis_cache_options()
+    return {
+        'default': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'PARSER_CLASS': PURE_PYTHON_PARSER,
+        },
+        'msgpack': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'PARSER_CLASS': PURE_PYTHON_PARSER,
+            'SERIALIZER': tuned['SERIALIZER'],
+        },
+        'tuned': tuned,
+    }
+
+
+def get_payloads() -> dict[str, Any]:
+    from django.contrib.auth.models import User
+
+    def user_dict(index: int) -> dict[str, Any]:
+        return {
+            'id': index,
+            'username': f'user{index}',
+            'email': f'user{index}@example.com',
+            'first_name': 'Ada',
+            'last_name': 'Lovelace',
+            'is_active': True,
+            'date_joined': '2024-01-01T12:00:00+00:00',
+        }
+
+    user = User(
+        id=1,
+        username='user1',
+        email='user1@example.com',
+        first_name='Ada',
+        last_name='Lovelace',
+        password='pbkdf2_sha256$870000$salt$' + 'x' * 44,
+        date_joined=datetime(2024, 1, 1, 12, tzinfo=UTC),
+    )
+    return {
+        'oauth-state': {
+            'provider': 'google',
+            'redirect_uri': 'https://app.example.com/oauth/callback',
+        },
+        'user-dict': user_dict(1),
+        'user-model': user,
+        'user-page': [user_dict(index) for index in range(100)],
+    }
+
+
+def measure(cache, key: str, value: Any, operations: int, concurrency: int) -> dict[str, Any]:
+    cache.set(key, value, timeout=600)
+    assert cache.get(key) is not None, f'{key} did not round-trip'
+
+    set_result = run_concurrently(
+        lambda: cache.set(key, value, timeout=600), operations, concurrency
+    )
+    get_result = run_concurrently(lambda: cache.get(key), operations, concurrency)
+
+    client = cache.client.get_client()
+    redis_key = cache.make_key(key)
+    return {
+        'set_ops': set_result['throughput'],
+        'get_ops': get_result['throughput'],
+        'get_p99': get_result['p99'],
+        'stored_bytes': client.strlen(redis_key),
+        'memory_bytes': client.memory_usage(redis_key),
+        'errors': set_result['errors'] + get_result['errors'],
+    }
+
+
+def main():
+    args = parse_args()
+    setup_django()
+    from django.conf import settings
+    from django_redis.cache import RedisCache
+    from django_redis.pool import ConnectionFactory
+
+    location = args.location or settings.CACHES['default']['LOCATION']
+    payloads = get_payloads()
+
+    rows = []
+    for variant, options in get_variants().items():
+        # Pools are cached per URL; start each profile with its own pool and parser
+        ConnectionFactory._pools.clear()
+        cache = RedisCache(location, {'OPTIONS': options, 'KEY_PREFIX': f'benchmark-{variant}'})
+        for name, value in payloads.items():
+            result = measure(cache, name, value, args.operations, args.concurrency)
+            rows.append({'payload': name, 'profile': variant, **result})
+            cache.delete(name)
+
+    rows.sort(key=lambda row: row['payload'])
+    print_table(
+        rows,
+        [
+            'payload',
+            'profile',
+            'set_ops',
+            'get_ops',
+            'get_p99',
+            'stored_bytes',
+            'memory_bytes',
+            'errors',
+        ],
+    )
+
+
+if __name__ == '__main__':
+    main()
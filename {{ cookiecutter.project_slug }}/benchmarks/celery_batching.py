@@ -0,0 +1,113 @@
+"""
+Throughput of tiny Celery tasks sent one message each vs batched in Redis.
+
+Starts a worker (``cpu`` preset) on a private queue and sends the same number
+of tiny calls, each incrementing a counter, in two ways:
+
+* ``per-item``: one ``apply_async`` message and one task execution per call
+* ``batched``: ``delay()`` of a ``batch_task`` (``core/batching.py``), which
+  buffers calls in Redis and runs them 500 at a time
+
+Elapsed time runs from the first call until the counter reached the total.
+The broker and the ``default`` cache of the current settings must be running.
+
+Usage (from the project root)::
+
+    python -m benchmarks.celery_batching --tasks 100000
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from collections import Counter
+
+from benchmarks.celery_workers import start_worker, stop_worker
+from benchmarks.common import print_table, setup_django
+
+setup_django()
+
+from django.core.cache import cache  # noqa: E402
+
+from {{ cookiecutter.project_slug }}.celery import app  # noqa: E402
+from {{ cookiecutter.project_slug }}.core.batching import batch_task  # noqa: E402
+
+QUEUE = 'benchmark-batching'
+
+
+@app.task(name='benchmarks.celery_batching.tick', ignore_result=True)
+def tick(counter_key):
+    cache.incr(counter_key)
+
+
+@batch_task(
+    name='benchmarks.celery_batching.tick_batch',
+    flush_every=500,
+    flush_interval=100,
+    queue=QUEUE,
+)
+def tick_batch(items):
+    for counter_key, count in Counter(item.args[0] for item in items).items():
+        cache.incr(counter_key, count)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, default=100_000)
+    parser.add_argument('--timeout', type=float, default=1800.0)
+    return parser.parse_args(argv)
+
+
+def per_item(counter_key, total):
+    with app.producer_or_acquire() as producer:
+        for _ in range(total):
+            tick.apply_async((counter_key,), queue=QUEUE, producer=producer)
+
+
+def batched(counter_key, total):
+    for _ in range(total):
+        tick_batch.delay(counter_key)
+
+
+def run(send, total, timeout):
+    counter_key = f'benchmark:batching:{uuid.uuid4().hex}'
+    cache.set(counter_key, 0, timeout=None)
+    start = time.perf_counter()
+    send(counter_key, total)
+    published = time.perf_counter() - start
+
+    deadline = time.monotonic() + timeout
+    while (done := cache.get(counter_key, 0)) < total:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f'only {done}/{total} calls finished within {timeout}s')
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    cache.delete(counter_key)
+    return {
+        'calls': total,
+        'publish_s': round(published, 2),
+        'elapsed_s': round(elapsed, 2),
+        'throughput': round(total / elapsed, 1),
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    with app.connection_for_write() as connection:
+        # Leftovers of an interrupted run
+        connection.default_channel.queue_purge(QUEUE)
+    tick_batch.client.delete(tick_batch.buffer_key)
+
+    worker = start_worker('cpu', include='benchmarks.celery_batching', queue=QUEUE)
+    try:
+        rows = [
+            {'mode': 'per-item', **run(per_item, args.tasks, args.timeout)},
+            {'mode': 'batched', **run(batched, args.tasks, args.timeout)},
+        ]
+    finally:
+        stop_worker(worker)
+    print_table(rows, ['mode', 'calls', 'publish_s', 'elapsed_s', 'throughput'])
+
+
+if __name__ == '__main__':
+    main()
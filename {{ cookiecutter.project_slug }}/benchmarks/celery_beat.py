@@ -0,0 +1,183 @@
+"""
+Beat scheduler CPU time and database load with a large periodic task table.
+
+Creates ``--tasks`` interval tasks (every 1, 5, 15 or 60 minutes, with their
+last runs spread over the interval, so a steady share is due every second) and
+runs each scheduler's tick loop for ``--duration`` seconds in a child process:
+
+* ``database``: ``django_celery_beat.schedulers:DatabaseScheduler``
+* ``redis``: ``core.beat:RedisScheduler``, the only replica and so the leader
+
+Every ``--change-every`` seconds one task is edited, as from the admin. The
+table is recreated before each variant. Due tasks are sent to a private queue,
+which is purged afterwards. ``load_s`` is the first read of the schedule;
+``cpu_s`` and ``queries`` cover the loop after it.
+
+Usage (from the project root, against a migrated database, with the broker running)::
+
+    python -m benchmarks.celery_beat --tasks 10000 --duration 60
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from datetime import timedelta
+
+from benchmarks.common import (
+    CHILD_FLAG,
+    emit_child_result,
+    print_table,
+    run_variant,
+    setup_django,
+)
+
+QUEUE = 'benchmark-beat'
+PREFIX = 'benchmark-beat-'
+SCHEDULERS = {
+    'database': 'django_celery_beat.schedulers:DatabaseScheduler',
+    'redis': '{{ cookiecutter.project_slug }}.core.beat:RedisScheduler',
+}
+INTERVALS = (60, 300, 900, 3600)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, default=10_000)
+    parser.add_argument('--duration', type=float, default=60.0)
+    parser.add_argument('--change-every', type=float, default=20.0)
+    parser.add_argument('--scheduler', choices=SCHEDULERS, default='database')
+    parser.add_argument(CHILD_FLAG, action='store_true', help='internal: run one variant')
+    return parser.parse_args(argv)
+
+
+def create_tasks(total):
+    from django.utils import timezone
+    from django_celery_beat.models import IntervalSchedule, PeriodicTask, PeriodicTasks
+
+    PeriodicTask.objects.filter(name__startswith=PREFIX).delete()
+    intervals = [
+        IntervalSchedule.objects.get_or_create(every=every, period=IntervalSchedule.SECONDS)[0]
+        for every in INTERVALS
+    ]
+    rng = random.Random(1)
+    now = timezone.now()
+    tasks = []
+    for i in range(total):
+        interval = intervals[i % len(intervals)]
+        tasks.append(
+            PeriodicTask(
+                name=f'{PREFIX}{i}',
+                task='benchmarks.celery_beat.noop',
+                interval=interval,
+                queue=QUEUE,
+                last_run_at=now - timedelta(seconds=rng.uniform(0, interval.every)),
+            )
+        )
+    PeriodicTask.objects.bulk_create(tasks, batch_size=1000)
+    PeriodicTasks.update_changed()
+
+
+def edit_task(total):
+    """Change one task's arguments from another thread and connection, like the admin."""
+    from django.db import connection
+    from django_celery_beat.models import PeriodicTask
+
+    task = PeriodicTask.objects.get(name=f'{PREFIX}{random.randrange(total)}')
+    task.args = f'[{time.time()}]'
+    task.save()
+    connection.close()
+
+
+def run_child(args):
+    setup_django()
+    from celery.utils.imports import symbol_by_name
+    from django.db import connection
+
+    from {{ cookiecutter.project_slug }}.celery import app
+
+    queries = [0]
+
+    def count(execute, sql, params, many, context):
+        queries[0] += 1
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    scheduler = symbol_by_name(SCHEDULERS[args.scheduler])(app=app)
+    scheduler.tick()
+    load = time.perf_counter() - started
+
+    started = time.monotonic()
+    deadline = started + args.duration
+    next_change = started + args.change_every
+    cpu = time.process_time()
+    with connection.execute_wrapper(count):
+        while (now := time.monotonic()) < deadline:
+            if now >= next_change:
+                threading.Thread(target=edit_task, args=(args.tasks,)).start()
+                next_change += args.change_every
+            interval = scheduler.tick()
+            if scheduler.should_sync():
+                scheduler._do_sync()
+            time.sleep(max(0.0, min(interval, next_change - now, deadline - now)))
+        scheduler.close()
+    cpu = time.process_time() - cpu
+    # A scheduler that falls behind overruns the duration
+    elapsed = time.monotonic() - started
+    emit_child_result(
+        {
+            'load_s': round(load, 2),
+            'elapsed_s': round(elapsed, 1),
+            'cpu_s': round(cpu, 2),
+            'cpu_pct': round(100 * cpu / elapsed, 1),
+            'queries': queries[0],
+        }
+    )
+
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    if args.child:
+        run_child(args)
+        return
+
+    setup_django()
+    from django.conf import settings
+    from django_celery_beat.models import PeriodicTask
+
+    from {{ cookiecutter.project_slug }}.celery import app
+    from {{ cookiecutter.project_slug }}.core.beat import RedisScheduler
+    from {{ cookiecutter.project_slug }}.core.unique import get_lock_client
+
+    client = get_lock_client(settings.BEAT_REDIS_URL or app.conf.broker_url)
+    keys = [f'{RedisScheduler.key_prefix}:{key}' for key in ('leader', 'due', 'schedules')]
+
+    rows = []
+    try:
+        for name in SCHEDULERS:
+            create_tasks(args.tasks)
+            client.delete(*keys)
+            with app.connection_for_write() as connection:
+                connection.default_channel.queue_purge(QUEUE)
+
+            result = run_variant(
+                'benchmarks.celery_beat',
+                {},
+                [
+                    f'--scheduler={name}',
+                    f'--tasks={args.tasks}',
+                    f'--duration={args.duration}',
+                    f'--change-every={args.change_every}',
+                ],
+            )
+            with app.connection_for_write() as connection:
+                sent = connection.default_channel.queue_purge(QUEUE)
+            rows.append({'scheduler': name, 'sent': sent, **result})
+    finally:
+        PeriodicTask.objects.filter(name__startswith=PREFIX).delete()
+    print_table(rows, ['scheduler', 'load_s', 'sent', 'elapsed_s', 'cpu_s', 'cpu_pct', 'queries'])
+
+
+if __name__ == '__main__':
+    main()
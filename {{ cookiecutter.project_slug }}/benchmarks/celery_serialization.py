@@ -0,0 +1,139 @@
+"""
+Celery publish/consume throughput and Redis memory per task payload format.
+
+Publishes a burst of tasks with each serializer from ``core/serialization.py``
+(and kombu's ``json`` as the baseline) to a private queue, measures the memory
+the queued messages take in Redis, then consumes and decodes all of them the
+way a worker does (without running the task):
+
+* ``small``: a few ids and a template name, below the compression threshold
+* ``large``: a page of 50 user profiles with datetimes, a few KiB
+
+Memory is Redis' ``MEMORY USAGE`` of the queue lists, scaled to 100k tasks.
+Every Redis message is a JSON envelope with the body base64-encoded, so only
+compression makes the large payload noticeably smaller in the broker.
+
+Usage (from the project root, with the ``redis`` broker running)::
+
+    python -m benchmarks.celery_serialization --tasks 100000
+"""
+
+import argparse
+import sys
+import time
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from benchmarks.common import print_table, setup_django
+
+setup_django()
+
+from kombu import Consumer, Queue  # noqa: E402
+
+from {{ cookiecutter.project_slug }}.celery import app  # noqa: E402
+from {{ cookiecutter.project_slug }}.core.serialization import SERIALIZERS  # noqa: E402
+
+QUEUE = 'benchmark-serialization'
+TASK_NAME = 'benchmarks.celery_serialization.noop'
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument(
+        '--serializers', nargs='+', default=['json', *SERIALIZERS], help='formats to compare'
+    )
+    return parser.parse_args(argv)
+
+
+def get_payloads() -> dict[str, tuple[tuple, dict[str, Any]]]:
+    joined = datetime(2024, 1, 1, 12, tzinfo=UTC)
+    users = [
+        {
+            'id': index,
+            'username': f'user{index}',
+            'email': f'user{index}@example.com',
+            'first_name': 'Ada',
+            'last_name': 'Lovelace',
+            'is_active': True,
+            'date_joined': joined + timedelta(minutes=index),
+        }
+        for index in range(50)
+    ]
+    return {
+        'small': ((42,), {'template': 'welcome', 'language': 'en'}),
+        'large': ((users,), {'page': 1, 'generated_at': joined}),
+    }
+
+
+def queue_memory(client) -> int:
+    """Bytes used by the queue's lists, one per priority step."""
+    return sum(client.memory_usage(key, samples=0) or 0 for key in client.scan_iter(f'{QUEUE}*'))
+
+
+def publish(serializer: str, args: tuple, kwargs: dict[str, Any], total: int) -> float:
+    start = time.perf_counter()
+    with app.producer_or_acquire() as producer:
+        for _ in range(total):
+            app.send_task(
+                TASK_NAME, args, kwargs, queue=QUEUE, serializer=serializer, producer=producer
+            )
+    return time.perf_counter() - start
+
+
+def consume(connection, total: int) -> float:
+    """Fetch, decode and acknowledge ``total`` messages like a worker."""
+    received = 0
+
+    def on_message(message):
+        nonlocal received
+        message.decode()
+        message.ack()
+        received += 1
+
+    start = time.perf_counter()
+    with Consumer(
+        connection,
+        [Queue(QUEUE)],
+        callbacks=[],
+        on_message=on_message,
+        accept=app.conf.accept_content,
+    ) as consumer:
+        consumer.qos(prefetch_count=100)
+        while received < total:
+            connection.drain_events(timeout=10)
+    return time.perf_counter() - start
+
+
+def measure(connection, serializer, args, kwargs, total) -> dict[str, Any]:
+    client = connection.default_channel.client
+    published = publish(serializer, args, kwargs, total)
+    memory = queue_memory(client)
+    consumed = consume(connection, total)
+    return {
+        'publish_ops': round(total / published),
+        'consume_ops': round(total / consumed),
+        'bytes_per_task': round(memory / total),
+        'mib_per_100k': round(memory / total * 100_000 / 2**20, 1),
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    payloads = get_payloads()
+    rows = []
+    with app.connection_for_write() as connection:
+        # Leftovers of an interrupted run
+        connection.default_channel.queue_purge(QUEUE)
+        for payload, (task_args, task_kwargs) in payloads.items():
+            for serializer in args.serializers:
+                result = measure(connection, serializer, task_args, task_kwargs, args.tasks)
+                rows.append({'payload': payload, 'serializer': serializer, **result})
+    print_table(
+        rows,
+        ['payload', 'serializer', 'publish_ops', 'consume_ops', 'bytes_per_task', 'mib_per_100k'],
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Celery task throughput per worker preset and workload.
+
+Starts a real worker for each preset (``core/worker_presets.py``) on a private
+queue, publishes a burst of tasks and times until all of them finished:
+
+* ``cpu`` workload: pure Python hashing, bound by the GIL and the core count
+* ``io`` workload: a sleep standing in for an HTTP call or a slow query
+
+The CPU preset should win the CPU-bound burst and the I/O preset the I/O-bound
+one. Tasks count their completions in the ``default`` cache, so the broker and
+cache of the current settings must be running.
+
+Usage (from the project root)::
+
+    python -m benchmarks.celery_workers --tasks 500 --io-ms 50 --cpu-ms 5
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+from benchmarks.common import print_table, setup_django
+
+setup_django()
+
+from django.core.cache import cache  # noqa: E402
+
+from {{ cookiecutter.project_slug }}.celery import app  # noqa: E402
+
+QUEUE = 'benchmark'
+PRESETS = ('cpu', 'io')
+
+
+def hash_rounds(rounds):
+    digest = b'benchmark'
+    for _ in range(rounds):
+        digest = hashlib.sha256(digest).digest()
+    return digest
+
+
+# Named explicitly: the script runs as __main__ but the worker imports it by module name
+@app.task(name='benchmarks.celery_workers.cpu_task', ignore_result=True)
+def cpu_task(counter_key, rounds):
+    """Burn CPU by hashing ``rounds`` times."""
+    hash_rounds(rounds)
+    cache.incr(counter_key)
+
+
+@app.task(name='benchmarks.celery_workers.io_task', ignore_result=True)
+def io_task(counter_key, seconds):
+    """Wait like a network call would."""
+    time.sleep(seconds)
+    cache.incr(counter_key)
+
+
+WORKLOADS = {'cpu': cpu_task, 'io': io_task}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, default=500)
+    parser.add_argument('--cpu-ms', type=float, default=5.0, help='approximate CPU time per task')
+    parser.add_argument('--io-ms', type=float, default=50.0, help='wait per I/O task')
+    parser.add_argument('--timeout', type=float, default=300.0)
+    return parser.parse_args(argv)
+
+
+def calibrate_iterations(milliseconds):
+    """Number of sha256 rounds that take about ``milliseconds`` on this machine."""
+    rounds = 10_000
+    start = time.perf_counter()
+    hash_rounds(rounds)
+    per_round = (time.perf_counter() - start) / rounds
+    return max(int(milliseconds / 1000 / per_round), 1)
+
+
+def start_worker(preset, include='benchmarks.celery_workers', queue=QUEUE):
+    """Start a worker with ``preset`` consuming only the benchmark queue."""
+    node = f'benchmark-{preset}-{uuid.uuid4().hex[:6]}@{socket.gethostname()}'
+    # The celery executable (not ``python -m celery``) so the worker is detected as one
+    celery = shutil.which('celery', path=os.path.dirname(sys.executable)) or 'celery'
+    process = subprocess.Popen(
+        [
+            celery,
+            '-A',
+            '{{ cookiecutter.project_slug }}.celery',
+            'worker',
+            '--include',
+            include,
+            '--queues',
+            queue,
+            '--hostname',
+            node,
+            '--loglevel',
+            'warning',
+            '--without-gossip',
+            '--without-mingle',
+        ],
+        env={**os.environ, 'CELERY_WORKER_PRESET': preset},
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'worker exited with status {process.returncode}')
+        if app.control.ping(destination=[node], timeout=0.5):
+            return process
+    process.kill()
+    raise RuntimeError(f'worker {node} did not start within 60s')
+
+
+def stop_worker(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def run_burst(task, argument, total, timeout):
+    """Publish ``total`` tasks and wait for all of them to finish."""
+    counter_key = f'benchmark:celery:{uuid.uuid4().hex}'
+    cache.set(counter_key, 0, timeout=None)
+    start = time.perf_counter()
+    with app.producer_or_acquire() as producer:
+        for _ in range(total):
+            task.apply_async((counter_key, argument), queue=QUEUE, producer=producer)
+    published = time.perf_counter() - start
+
+    deadline = time.monotonic() + timeout
+    while (done := cache.get(counter_key, 0)) < total:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f'only {done}/{total} tasks finished within {timeout}s')
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    cache.delete(counter_key)
+    return {
+        'tasks': total,
+        'publish_s': round(published, 2),
+        'elapsed_s': round(elapsed, 2),
+        'throughput': round(total / elapsed, 1),
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    arguments = {'cpu': calibrate_iterations(args.cpu_ms), 'io': args.io_ms / 1000}
+    with app.connection_for_write() as connection:
+        # Leftovers of an interrupted run
+        connection.default_channel.queue_purge(QUEUE)
+
+    rows = []
+    for preset in PRESETS:
+        worker = start_worker(preset)
+        try:
+            for workload, task in WORKLOADS.items():
+                result = run_burst(task, arguments[workload], args.tasks, args.timeout)
+                rows.append({'preset': preset, 'workload': workload, **result})
+        finally:
+            stop_worker(worker)
+    print_table(rows, ['preset', 'workload', 'tasks', 'publish_s', 'elapsed_s', 'throughput'])
+
+
+if __name__ == '__main__':
+    main()
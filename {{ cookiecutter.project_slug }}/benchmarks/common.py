@@ -0,0 +1,210 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Each benchmark compares several configurations. Because most of them are read
+from settings at startup, every variant runs in a fresh child process with its
+own environment and reports its numbers back to the parent as JSON.
+"""
+
+import http.client
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+from wsgiref.util import setup_testing_defaults
+
+API_PREFIX = '/api{% if cookiecutter.api_versioning == 'v1' %}/v1{% endif %}'
+CHILD_FLAG = '--child'
+
+
+def setup_django(settings_module: str = '{{ cookiecutter.project_slug }}.settings.local') -> None:
+    """Configure Django for a standalone script."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+
+    django.setup()
+
+
+def wsgi_request(
+    application: Callable,
+    method: str,
+    path: str,
+    body: bytes | None = None,
+    headers: dict[str, str] | None = None,
+) -> tuple[int, bytes]:
+    """
+    Send one request through the WSGI application like a real server would.
+
+    Unlike ``django.test.Client`` this fires ``request_finished`` normally, so
+    connections are closed or returned to the pool exactly as in production.
+
+    Returns:
+        Tuple of (status code, response body)
+    """
+    body = body or b''
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'HTTP_HOST': 'localhost',
+        # Outside INTERNAL_IPS so the debug toolbar stays out of the measurement
+        'REMOTE_ADDR': '192.0.2.10',
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+    }
+    for name, value in (headers or {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+    setup_testing_defaults(environ)
+
+    status_holder = []
+
+    def start_response(status, response_headers, exc_info=None):
+        status_holder.append(int(status.split(' ', 1)[0]))
+
+    response = application(environ, start_response)
+    try:
+        content = b''.join(response)
+    finally:
+        if hasattr(response, 'close'):
+            response.close()
+    return status_holder[0], content
+
+
+def run_concurrently(func: Callable[[], Any], total: int, concurrency: int) -> dict[str, Any]:
+    """
+    Call ``func`` ``total`` times spread over ``concurrency`` threads.
+
+    Returns:
+        Latency summary (milliseconds), throughput and error count
+    """
+    latencies: list[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    per_thread = max(total // concurrency, 1)
+
+    def worker():
+        local_latencies = []
+        local_errors = 0
+        for _ in range(per_thread):
+            start = time.perf_counter()
+            try:
+                func()
+            except Exception:
+                local_errors += 1
+            local_latencies.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    summary = summarize(latencies)
+    summary['throughput'] = round(len(latencies) / elapsed, 1) if elapsed else 0.0
+    summary['errors'] = errors[0]
+    return summary
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples``."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def summarize(samples: list[float]) -> dict[str, Any]:
+    """Summarize latency samples in milliseconds."""
+    if not samples:
+        return {'count': 0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    return {
+        'count': len(samples),
+        'mean': round(sum(samples) / len(samples), 3),
+        'p50': round(percentile(samples, 50), 3),
+        'p95': round(percentile(samples, 95), 3),
+        'p99': round(percentile(samples, 99), 3),
+        'max': round(max(samples), 3),
+    }
+
+
+def run_variant(module: str, env: dict[str, str], args: Iterable[str] = ()) -> dict[str, Any]:
+    """
+    Run ``python -m <module> --child`` with extra environment variables.
+
+    The child prints its result as a JSON object on the last line of stdout.
+    """
+    child_env = {**os.environ, **env}
+    completed = subprocess.run(
+        [sys.executable, '-m', module, CHILD_FLAG, *args],
+        env=child_env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f'{module} child failed:\n{completed.stderr}')
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def emit_child_result(result: dict[str, Any]) -> None:
+    """Report a child result to the parent process."""
+    print(json.dumps(result))
+
+
+def print_table(rows: list[dict[str, Any]], columns: list[str]) -> None:
+    """Print rows as a fixed-width table."""
+    widths = {
+        column: max(len(column), *(len(str(row.get(column, ''))) for row in rows))
+        for column in columns
+    }
+    print('  '.join(column.ljust(widths[column]) for column in columns))
+    print('  '.join('-' * widths[column] for column in columns))
+    for row in rows:
+        print('  '.join(str(row.get(column, '')).ljust(widths[column]) for column in columns))
+
+
+def wait_for_port(port: int, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    """Wait until a server started as ``process`` accepts connections on ``port``."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'server exited with status {process.returncode}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'server did not listen on port {port} within {timeout}s')
+
+
+def http_get(port: int, path: str, headers: dict[str, str] | None = None) -> Callable[[], None]:
+    """Return a callable that sends ``GET path`` over a keep-alive connection per thread."""
+    local = threading.local()
+
+    def request():
+        connection = getattr(local, 'connection', None)
+        if connection is None:
+            connection = local.connection = http.client.HTTPConnection('127.0.0.1', port)
+        try:
+            connection.request('GET', path, headers=headers or {})
+            response = connection.getresponse()
+            response.read()
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            local.connection = None
+            raise
+        if response.status != 200:
+            raise RuntimeError(f'unexpected status {response.status}')
+
+    return request
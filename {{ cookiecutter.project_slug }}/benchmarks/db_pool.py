@@ -0,0 +1,96 @@
+"""
+Request latency with and without database connection pooling.
+
+Runs the same ``GET /accounts/users/{id}`` loop in a child process per variant:
+
+* ``no-reuse``: ``DB_POOL=False`` and ``DB_CONN_MAX_AGE=0`` - a new Postgres
+  connection for every request (the previous default)
+* ``persistent``: ``DB_POOL=False`` with ``CONN_MAX_AGE`` - one connection kept
+  per thread
+* ``pool``: ``DB_POOL=True`` - psycopg3 pool sized from ``GUNICORN_THREADS``
+
+Usage (from the project root, against a migrated database)::
+
+    python -m benchmarks.db_pool --requests 2000 --concurrency 4
+"""
+
+import argparse
+import sys
+
+from benchmarks.common import (
+    API_PREFIX,
+    CHILD_FLAG,
+    emit_child_result,
+    print_table,
+    run_concurrently,
+    run_variant,
+    setup_django,
+    wsgi_request,
+)
+
+VARIANTS = {
+    'no-reuse': {'DB_POOL': 'False', 'DB_CONN_MAX_AGE': '0'},
+    'persistent': {'DB_POOL': 'False', 'DB_CONN_MAX_AGE': '60'},
+    'pool': {'DB_POOL': 'True'},
+}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument(CHILD_FLAG, action='store_true', help='internal: run one variant')
+    return parser.parse_args(argv)
+
+
+def run_child(args):
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+
+    user, _ = User.objects.get_or_create(
+        username='benchmark-user', defaults={'email': 'benchmark@example.com'}
+    )
+    connection.close()
+    application = get_wsgi_application()
+    path = f'{API_PREFIX}/accounts/users/{user.id}'
+
+    def request():
+        status, _ = wsgi_request(application, 'GET', path)
+        if status != 200:
+            raise RuntimeError(f'unexpected status {status}')
+
+    for _ in range(args.warmup):
+        request()
+    emit_child_result(run_concurrently(request, args.requests, args.concurrency))
+
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    if args.child:
+        run_child(args)
+        return
+
+    rows = []
+    for name, env in VARIANTS.items():
+        env = {**env, 'GUNICORN_THREADS': str(args.concurrency)}
+        result = run_variant(
+            'benchmarks.db_pool',
+            env,
+            [
+                '--requests',
+                str(args.requests),
+                '--concurrency',
+                str(args.concurrency),
+                '--warmup',
+                str(args.warmup),
+            ],
+        )
+        rows.append({'variant': name, **result})
+    print_table(rows, ['variant', 'count', 'mean', 'p50', 'p95', 'p99', 'throughput', 'errors'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+"""
+Load Tests
+
+Locust scenarios and a stand-in OAuth2 provider for the ``perf`` compose
+profile, and ``python -m benchmarks.load.report`` to compare their results.
+"""
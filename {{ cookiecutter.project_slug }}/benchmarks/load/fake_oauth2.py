@@ -0,0 +1,83 @@
+"""
+Stand-in OAuth2 provider for the load tests.
+
+Answers the token exchange and user info requests of the OAuth2 callback, so
+sign-ins can be load tested without calling Google, GitHub or Facebook. The web
+service sends them here when ``OAUTH2_FAKE_PROVIDER_URL`` is set. The same
+authorization code always maps to the same account, so a run mixes first
+sign-ups with returning users. ``FAKE_OAUTH2_LATENCY_MS`` adds a delay to every
+response, like the round trip to a real provider.
+
+Standard library only, so it runs in a plain Python image::
+
+    python benchmarks/load/fake_oauth2.py --port 8080
+"""
+
+import argparse
+import json
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+LATENCY = float(os.getenv('FAKE_OAUTH2_LATENCY_MS', '50')) / 1000
+
+
+def user_info(provider: str, account: str) -> dict:
+    """Return the user info payload of ``provider`` for ``account``."""
+    email = f'{account}@load.example.com'
+    if provider == 'github':
+        return {'id': account, 'login': account, 'email': email, 'name': 'Load Test'}
+    if provider == 'facebook':
+        return {'id': account, 'email': email, 'first_name': 'Load', 'last_name': 'Test'}
+    return {'id': account, 'email': email, 'given_name': 'Load', 'family_name': 'Test'}
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        # POST /<provider>/token with the authorization code in a form body
+        length = int(self.headers.get('Content-Length', 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        code = form.get('code', [''])[0]
+        if not self.path.endswith('/token') or not code:
+            return self.respond(400, {'error': 'invalid_request'})
+        self.respond(200, {'access_token': f'fake-{code}', 'token_type': 'Bearer'})
+
+    def do_GET(self):
+        # GET /<provider>/userinfo with the access token from the exchange
+        provider, _, endpoint = self.path.split('?')[0].strip('/').partition('/')
+        token = self.headers.get('Authorization', '').removeprefix('Bearer ')
+        if endpoint != 'userinfo' or not token.startswith('fake-'):
+            return self.respond(401, {'error': 'invalid_token'})
+        self.respond(200, user_info(provider, token.removeprefix('fake-')))
+
+    def respond(self, status: int, body: dict) -> None:
+        time.sleep(LATENCY)
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        # One line per request would slow the provider down under load
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), FakeProviderHandler)
+    server.daemon_threads = True
+    print(f'Fake OAuth2 provider on {args.host}:{args.port}', flush=True)
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
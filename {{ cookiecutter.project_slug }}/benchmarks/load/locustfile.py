@@ -0,0 +1,181 @@
+"""
+Load test scenarios for the accounts API.
+
+Run by the ``locust`` service of the ``perf`` compose profile (see the README),
+or against any running server::
+
+    locust -f benchmarks/load/locustfile.py --headless --host http://localhost:8000 \
+        --users 200 --spawn-rate 20 --run-time 2m
+
+Each scenario is a user class, weighted to a typical mix. Name classes after
+the options to run only those, e.g. ``LoginStormUser``. When the run ends, one
+JSON line per run is appended to ``results/results.jsonl`` with the requests per
+second, p50/p95/p99 latency and error rate of every endpoint. ``PERF_LABEL``
+tags the line, so runs with different settings or servers can be compared with
+``python -m benchmarks.load.report``.
+"""
+
+import json
+import os
+import random
+import time
+import uuid
+from pathlib import Path
+
+from locust import HttpUser, between, constant, events, task
+
+API_PREFIX = '/api{% if cookiecutter.api_versioning == 'v1' %}/v1{% endif %}'
+PASSWORD = 'load-test-password'
+RESULTS_DIR = Path(os.getenv('PERF_RESULTS_DIR', Path(__file__).with_name('results')))
+PERCENTILES = {'p50': 0.5, 'p95': 0.95, 'p99': 0.99}
+
+# Ids of the accounts created by this process, read back by ProfileReader
+KNOWN_USER_IDS: list[int] = []
+
+
+def register(user: HttpUser) -> str | None:
+    """Sign up a new account and return its username."""
+    username = f'load-{uuid.uuid4().hex[:16]}'
+    payload = {'username': username, 'email': f'{username}@load.example.com', 'password': PASSWORD}
+    with user.client.post(
+        f'{API_PREFIX}/accounts/auth/register', json=payload, name='register', catch_response=True
+    ) as response:
+        if response.status_code != 201:
+            response.failure(f'status {response.status_code}')
+            return None
+        KNOWN_USER_IDS.append(response.json()['id'])
+    return username
+
+
+def login(user: HttpUser, username: str) -> str | None:
+    """Log in and return the access token."""
+    payload = {'username': username, 'password': PASSWORD}
+    response = user.client.post(f'{API_PREFIX}/accounts/auth/login', json=payload, name='login')
+    return response.json()['access'] if response.ok else None
+
+
+class SignupUser(HttpUser):
+    """New visitors signing up: password hashing and the uniqueness checks."""
+
+    weight = 1
+    wait_time = between(1, 3)
+
+    @task
+    def signup(self):
+        register(self)
+
+
+class LoginStormUser(HttpUser):
+    """Clients logging in back to back, as after a deploy or an expired session wave."""
+
+    weight = 2
+    wait_time = constant(0)
+
+    def on_start(self):
+        self.username = register(self)
+
+    @task
+    def login(self):
+        if self.username:
+            login(self, self.username)
+
+
+class ProfileReader(HttpUser):
+    """Signed-in clients reading their own profile and other users' profiles."""
+
+    weight = 6
+    wait_time = between(0.5, 2)
+
+    def on_start(self):
+        username = register(self)
+        token = login(self, username) if username else None
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    @task(3)
+    def me(self):
+        self.client.get(f'{API_PREFIX}/accounts/users/me', headers=self.headers, name='users/me')
+
+    @task(1)
+    def by_id(self):
+        if KNOWN_USER_IDS:
+            user_id = random.choice(KNOWN_USER_IDS)
+            self.client.get(
+                f'{API_PREFIX}/accounts/users/{user_id}', headers=self.headers, name='users/{id}'
+            )
+{%- if cookiecutter.include_oauth2 == 'y' %}
+
+
+class OAuth2User(HttpUser):
+    """
+    Sign-ins through Google against the fake provider (``fake_oauth2.py``).
+
+    Codes are drawn from a pool of ``OAUTH2_ACCOUNTS``, and the provider maps a
+    code to the same account every time: early sign-ins create users, later
+    ones mostly find them.
+    """
+
+    weight = 1
+    wait_time = between(1, 3)
+    accounts = int(os.getenv('OAUTH2_ACCOUNTS', '10000'))
+    redirect_uri = 'https://load.example.com/callback'
+
+    @task
+    def sign_in(self):
+        authorize = {'provider': 'google', 'redirect_uri': self.redirect_uri}
+        response = self.client.post(
+            f'{API_PREFIX}/accounts/oauth2/authorize', json=authorize, name='oauth2/authorize'
+        )
+        if not response.ok:
+            return
+        callback = {
+            'provider': 'google',
+            'code': f'account{random.randrange(self.accounts)}',
+            'state': response.json()['state'],
+            'redirect_uri': self.redirect_uri,
+        }
+        with self.client.post(
+            f'{API_PREFIX}/accounts/oauth2/callback',
+            json=callback,
+            name='oauth2/callback',
+            catch_response=True,
+        ) as response:
+            # Errors come back as 400 with a reason, keep it in the failure stats
+            if response.status_code != 200:
+                response.failure(response.text[:200])
+{%- endif %}
+
+
+@events.quitting.add_listener
+def write_results(environment, **kwargs):
+    """Append this run's summary to ``results/results.jsonl``."""
+    stats = environment.stats
+    if not stats.total.num_requests:
+        return
+    endpoints = []
+    for entry in [*sorted(stats.entries.values(), key=lambda e: e.name), stats.total]:
+        endpoints.append(
+            {
+                'name': entry.name,
+                'method': entry.method or '',
+                'requests': entry.num_requests,
+                'rps': round(entry.total_rps, 1),
+                **{
+                    name: entry.get_response_time_percentile(fraction)
+                    for name, fraction in PERCENTILES.items()
+                },
+                'error_rate': round(entry.fail_ratio, 4),
+            }
+        )
+    options = environment.parsed_options
+    record = {
+        'label': os.getenv('PERF_LABEL', ''),
+        'server': os.getenv('PERF_SERVER', '{{ cookiecutter.server }}'),
+        'finished_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'host': environment.host,
+        'users': getattr(options, 'num_users', None),
+        'run_time': getattr(options, 'run_time', None),
+        'endpoints': endpoints,
+    }
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(RESULTS_DIR / 'results.jsonl', 'a') as results:
+        results.write(json.dumps(record) + '\n')
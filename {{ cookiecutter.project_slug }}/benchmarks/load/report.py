@@ -0,0 +1,79 @@
+"""
+Compare the load test runs recorded in ``results/results.jsonl``.
+
+Prints one row per run and endpoint, oldest run first. ``--label`` keeps the
+runs whose ``PERF_LABEL`` contains the given text, ``--endpoint`` only the
+named endpoints (``Aggregated`` is the total of a run).
+
+Usage (from the project root)::
+
+    python -m benchmarks.load.report --last 4 --endpoint Aggregated login
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.common import print_table
+
+RESULTS = Path(__file__).with_name('results') / 'results.jsonl'
+COLUMNS = [
+    'run',
+    'label',
+    'server',
+    'users',
+    'endpoint',
+    'requests',
+    'rps',
+    'p50',
+    'p95',
+    'p99',
+    'errors',
+]
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--results', type=Path, default=RESULTS)
+    parser.add_argument('--label', default='')
+    parser.add_argument('--endpoint', nargs='*', default=[])
+    parser.add_argument('--last', type=int, default=0, help='only the last N runs')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    if not args.results.exists():
+        sys.exit(f'No results in {args.results}, run the perf profile first')
+
+    with open(args.results) as results:
+        runs = [json.loads(line) for line in results if line.strip()]
+    runs = [run for run in runs if args.label in run['label']]
+    if args.last:
+        runs = runs[-args.last :]
+
+    rows = []
+    for run in runs:
+        for endpoint in run['endpoints']:
+            if args.endpoint and endpoint['name'] not in args.endpoint:
+                continue
+            rows.append(
+                {
+                    'run': run['finished_at'],
+                    'label': run['label'] or '-',
+                    'server': run['server'],
+                    'users': run['users'],
+                    'endpoint': endpoint['name'],
+                    'requests': endpoint['requests'],
+                    'rps': endpoint['rps'],
+                    **{key: endpoint[key] for key in ('p50', 'p95', 'p99')},
+                    'errors': f'{endpoint["error_rate"]:.2%}',
+                }
+            )
+    if rows:
+        print_table(rows, COLUMNS)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Per-request overhead of the full middleware stack on API routes.
+
+Runs ``GET /accounts/users/{id}`` in a child process per variant, with
+``API_MIDDLEWARE_FAST_PATH`` off (``full``: session, CSRF, authentication,
+messages and clickjacking middleware run on every request) and on (``slim``:
+API requests skip them). Each variant is measured without cookies and with
+the session and CSRF cookies a browser that also uses the admin would send.
+
+Usage (from the project root, against a migrated database)::
+
+    python -m benchmarks.middleware --requests 5000
+"""
+
+import argparse
+import sys
+
+from benchmarks.common import (
+    API_PREFIX,
+    CHILD_FLAG,
+    emit_child_result,
+    print_table,
+    run_concurrently,
+    run_variant,
+    setup_django,
+    wsgi_request,
+)
+
+VARIANTS = {
+    'full': {'API_MIDDLEWARE_FAST_PATH': 'False'},
+    'slim': {'API_MIDDLEWARE_FAST_PATH': 'True'},
+}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--warmup', type=int, default=200)
+    parser.add_argument('--cookies', action='store_true', help='internal: send cookies')
+    parser.add_argument(CHILD_FLAG, action='store_true', help='internal: run one variant')
+    return parser.parse_args(argv)
+
+
+def run_child(args):
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.contrib.sessions.backends.db import SessionStore
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+
+    user, _ = User.objects.get_or_create(
+        username='benchmark-user', defaults={'email': 'benchmark@example.com'}
+    )
+    headers = {}
+    if args.cookies:
+        session = SessionStore()
+        session['_auth_user_id'] = str(user.pk)
+        session.create()
+        headers['Cookie'] = (
+            f'{settings.SESSION_COOKIE_NAME}={session.session_key}; '
+            f'{settings.CSRF_COOKIE_NAME}={"x" * 32}'
+        )
+    connection.close()
+    application = get_wsgi_application()
+    path = f'{API_PREFIX}/accounts/users/{user.id}'
+
+    def request():
+        status, _ = wsgi_request(application, 'GET', path, headers=headers)
+        if status != 200:
+            raise RuntimeError(f'unexpected status {status}')
+
+    for _ in range(args.warmup):
+        request()
+    emit_child_result(run_concurrently(request, args.requests, args.concurrency))
+
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    if args.child:
+        run_child(args)
+        return
+
+    rows = []
+    for cookies in (False, True):
+        for name, env in VARIANTS.items():
+            extra = ['--cookies'] if cookies else []
+            result = run_variant(
+                'benchmarks.middleware',
+                env,
+                [
+                    '--requests',
+                    str(args.requests),
+                    '--concurrency',
+                    str(args.concurrency),
+                    '--warmup',
+                    str(args.warmup),
+                    *extra,
+                ],
+            )
+            rows.append({'variant': name, 'cookies': 'yes' if cookies else 'no', **result})
+        full, slim = rows[-2], rows[-1]
+        saved_us = round((full['mean'] - slim['mean']) * 1000, 1)
+        slim['saved_us'] = saved_us
+    print_table(
+        rows,
+        ['variant', 'cookies', 'count', 'mean', 'p50', 'p99', 'throughput', 'saved_us', 'errors'],
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Server connections and throughput with and without PgBouncer.
+
+Simulates many application processes: each client thread keeps its own
+connection open (like a web or Celery worker would) and runs short read
+transactions in a loop. The same load is run directly against Postgres and
+through PgBouncer while a sampler polls ``pg_stat_activity`` on the server to
+record the peak number of server connections.
+
+Usage (from the project root, with the ``pgbouncer`` service running)::
+
+    python -m benchmarks.pgbouncer --clients 500 --duration 20 \\
+        --direct db:5432 --pgbouncer pgbouncer:6432
+"""
+
+import argparse
+import threading
+import time
+from typing import Any
+
+import psycopg
+
+from benchmarks.common import print_table, setup_django, summarize
+
+QUERY = 'SELECT id, username FROM auth_user ORDER BY id LIMIT 1'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--direct', default='db:5432', help='host:port of Postgres')
+    parser.add_argument('--pgbouncer', default='pgbouncer:6432', help='host:port of PgBouncer')
+    return parser.parse_args()
+
+
+def connection_kwargs(address: str) -> dict[str, Any]:
+    from django.conf import settings
+
+    database = settings.DATABASES['default']
+    host, port = address.rsplit(':', 1)
+    return {
+        'host': host,
+        'port': int(port),
+        'dbname': database['NAME'],
+        'user': database['USER'],
+        'password': database['PASSWORD'],
+        'autocommit': True,
+        # Prepared statements are not portable across PgBouncer server connections
+        'prepare_threshold': None,
+        'connect_timeout': 10,
+    }
+
+
+def sample_server_connections(kwargs: dict[str, Any], stop: threading.Event, peak: list[int]):
+    with psycopg.connect(**kwargs) as conn:
+        while not stop.is_set():
+            row = conn.execute(
+                'SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()'
+            ).fetchone()
+            peak[0] = max(peak[0], row[0])
+            time.sleep(0.5)
+
+
+def run_load(target: str, direct: str, clients: int, duration: float) -> dict[str, Any]:
+    target_kwargs = connection_kwargs(target)
+    latencies: list[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    stop = threading.Event()
+    peak = [0]
+
+    def client():
+        local_latencies = []
+        try:
+            conn = psycopg.connect(**target_kwargs)
+        except psycopg.Error:
+            with lock:
+                errors[0] += 1
+            return
+        with conn:
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    with conn.transaction():
+                        conn.execute(QUERY).fetchall()
+                except psycopg.Error:
+                    with lock:
+                        errors[0] += 1
+                    break
+                local_latencies.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local_latencies)
+
+    sampler = threading.Thread(
+        target=sample_server_connections, args=(connection_kwargs(direct), stop, peak)
+    )
+    sampler.start()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    sampler.join()
+
+    summary = summarize(latencies)
+    summary['throughput'] = round(len(latencies) / duration, 1)
+    summary['errors'] = errors[0]
+    summary['server_conns'] = peak[0]
+    return summary
+
+
+def main():
+    args = parse_args()
+    setup_django()
+
+    rows = []
+    for name, target in (('direct', args.direct), ('pgbouncer', args.pgbouncer)):
+        result = run_load(target, args.direct, args.clients, args.duration)
+        rows.append({'target': name, 'clients': args.clients, **result})
+    print_table(
+        rows,
+        ['target', 'clients', 'server_conns', 'throughput', 'p50', 'p95', 'p99', 'errors'],
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Memory per gunicorn worker with and without preloading.
+
+Starts gunicorn with ``gunicorn.conf.py`` once per variant, serves some
+``GET /accounts/users/{id}`` requests so every worker has handled traffic, then
+reads each worker's memory from ``/proc``:
+
+* ``no-preload``: ``GUNICORN_PRELOAD=False`` - every worker imports Django
+* ``preload``: the master imports the application, ``GUNICORN_GC_FREEZE=False``
+* ``preload+freeze``: preload plus ``gc.freeze()`` before each fork
+
+``shared`` is the memory each worker still shares with the master and its
+siblings, and ``saved`` is how much less private memory a worker needs than
+without preloading. Linux only.
+
+Usage (from the project root, against a migrated database)::
+
+    python -m benchmarks.preload --workers 4 --requests 2000
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import (
+    API_PREFIX,
+    http_get,
+    print_table,
+    run_concurrently,
+    setup_django,
+    wait_for_port,
+)
+from {{ cookiecutter.project_slug }}.core.workers import get_memory_usage
+
+VARIANTS = {
+    'no-preload': {'GUNICORN_PRELOAD': 'False'},
+    'preload': {'GUNICORN_PRELOAD': 'True', 'GUNICORN_GC_FREEZE': 'False'},
+    'preload+freeze': {'GUNICORN_PRELOAD': 'True', 'GUNICORN_GC_FREEZE': 'True'},
+}
+
+MEMORY_FIELDS = ('rss', 'shared', 'private', 'pss')
+MIB = 2**20
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--port', type=int, default=8765)
+    return parser.parse_args(argv)
+
+
+def worker_pids(master_pid: int) -> list[int]:
+    with open(f'/proc/{master_pid}/task/{master_pid}/children') as children:
+        return [int(pid) for pid in children.read().split()]
+
+
+def wait_for_workers(master_pid: int, count: int, timeout: float = 30.0) -> list[int]:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        pids = worker_pids(master_pid)
+        if len(pids) >= count:
+            return pids
+        time.sleep(0.1)
+    raise RuntimeError(f'gunicorn did not start {count} workers within {timeout}s')
+
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        sys.exit('This benchmark reads /proc/<pid>/smaps_rollup and needs Linux 4.14+')
+
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.db import connection
+
+    user, _ = User.objects.get_or_create(
+        username='benchmark-user', defaults={'email': 'benchmark@example.com'}
+    )
+    connection.close()
+    path = f'{API_PREFIX}/accounts/users/{user.id}'
+    command = [
+        sys.executable,
+        '-m',
+        'gunicorn',
+        '--config',
+        'gunicorn.conf.py',
+        '--access-logfile',
+        os.devnull,
+        '--log-level',
+        'warning',
+        # Recycling would replace workers during the measurement
+        '--max-requests',
+        '0',
+        '{{ cookiecutter.project_slug }}.wsgi:application',
+    ]
+
+    rows = []
+    for name, variant_env in VARIANTS.items():
+        env = {
+            **os.environ,
+            **variant_env,
+            'WEB_CONCURRENCY': str(args.workers),
+            'GUNICORN_BIND': f'127.0.0.1:{args.port}',
+        }
+        process = subprocess.Popen(command, env=env)
+        try:
+            wait_for_port(args.port, process)
+            pids = wait_for_workers(process.pid, args.workers)
+            result = run_concurrently(http_get(args.port, path), args.requests, args.clients)
+            usages = [get_memory_usage(pid) for pid in pids]
+            master = get_memory_usage(process.pid)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+        row = {'variant': name, 'errors': result['errors'], 'master_rss': master['rss'] / MIB}
+        for field in MEMORY_FIELDS:
+            row[field] = sum(usage[field] for usage in usages) / len(usages) / MIB
+        row['total_pss'] = (master['pss'] + sum(usage['pss'] for usage in usages)) / MIB
+        rows.append(row)
+
+    baseline = rows[0]['private']
+    for row in rows:
+        row['saved'] = baseline - row['private']
+        for field in ('master_rss', *MEMORY_FIELDS, 'total_pss', 'saved'):
+            row[field] = round(row[field], 1)
+
+    print(f'Memory in MiB, averaged over {args.workers} workers')
+    print_table(rows, ['variant', 'master_rss', *MEMORY_FIELDS, 'saved', 'total_pss', 'errors'])
+
+
+if __name__ == '__main__':
+    main()
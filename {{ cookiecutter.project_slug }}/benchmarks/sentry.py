@@ -0,0 +1,155 @@
+"""
+Request overhead of Sentry tracing with a flat vs adaptive sample rate.
+
+Runs ``GET /accounts/users/me`` (JWT) and ``GET /accounts/users/{id}`` in a child
+process per variant. Events go to an in-memory transport that only counts them:
+
+* ``off``: Sentry not initialised
+* ``flat``: ``traces_sample_rate=1.0`` - every request is traced
+* ``adaptive``: ``core.sampling.TracesSampler`` with 1% for ``/users/me``, 10%
+  elsewhere and a budget of ``--budget`` traces per second
+
+Usage (from the project root, against a migrated database)::
+
+    python -m benchmarks.sentry --requests 5000
+"""
+
+import argparse
+import sys
+
+from benchmarks.common import (
+    API_PREFIX,
+    CHILD_FLAG,
+    emit_child_result,
+    print_table,
+    run_concurrently,
+    run_variant,
+    setup_django,
+    wsgi_request,
+)
+
+VARIANTS = ('off', 'flat', 'adaptive')
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--warmup', type=int, default=200)
+    parser.add_argument('--budget', type=float, default=5.0, help='adaptive traces per second')
+    parser.add_argument('--variant', choices=VARIANTS, default='off')
+    parser.add_argument(CHILD_FLAG, action='store_true', help='internal: run one variant')
+    return parser.parse_args(argv)
+
+
+def init_sentry(args):
+    """Initialise Sentry for the variant and return the list of captured transactions."""
+    transactions = []
+    if args.variant == 'off':
+        return transactions
+
+    import sentry_sdk
+    from sentry_sdk.integrations.django import DjangoIntegration
+    from sentry_sdk.transport import Transport
+
+    from {{ cookiecutter.project_slug }}.core.sampling import TracesSampler
+
+    class CountingTransport(Transport):
+        def capture_envelope(self, envelope):
+            event = envelope.get_transaction_event()
+            if event is not None:
+                transactions.append(event)
+
+    if args.variant == 'flat':
+        sampling = {'traces_sample_rate': 1.0}
+    else:
+        sampler = TracesSampler(
+            default_rate=0.1,
+            route_rates=[(f'{API_PREFIX}/accounts/users/me', 0.01)],
+            max_per_second=args.budget,
+        )
+        sampling = {'traces_sampler': sampler}
+    sentry_sdk.init(
+        dsn='https://public@sentry.invalid/1',
+        transport=CountingTransport,
+        integrations=[DjangoIntegration()],
+        **sampling,
+    )
+    return transactions
+
+
+def run_child(args):
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    user, _ = User.objects.get_or_create(
+        username='benchmark-user', defaults={'email': 'benchmark@example.com'}
+    )
+    token = str(RefreshToken.for_user(user).access_token)
+    connection.close()
+
+    transactions = init_sentry(args)
+    application = get_wsgi_application()
+    endpoints = {
+        'users/me': (f'{API_PREFIX}/accounts/users/me', {'Authorization': f'Bearer {token}'}),
+        'users/{id}': (f'{API_PREFIX}/accounts/users/{user.id}', {}),
+    }
+
+    results = {}
+    for name, (path, headers) in endpoints.items():
+
+        def request(path=path, headers=headers):
+            status, _ = wsgi_request(application, 'GET', path, headers=headers)
+            if status != 200:
+                raise RuntimeError(f'unexpected status {status}')
+
+        for _ in range(args.warmup):
+            request()
+        transactions.clear()
+        result = run_concurrently(request, args.requests, args.concurrency)
+        result['traces'] = len(transactions)
+        results[name] = result
+    emit_child_result(results)
+
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    if args.child:
+        run_child(args)
+        return
+
+    rows = []
+    for variant in VARIANTS:
+        results = run_variant(
+            'benchmarks.sentry',
+            {},
+            [
+                '--variant',
+                variant,
+                '--requests',
+                str(args.requests),
+                '--concurrency',
+                str(args.concurrency),
+                '--warmup',
+                str(args.warmup),
+                '--budget',
+                str(args.budget),
+            ],
+        )
+        for endpoint, result in results.items():
+            rows.append({'variant': variant, 'endpoint': endpoint, **result})
+
+    baseline = {row['endpoint']: row['mean'] for row in rows if row['variant'] == 'off'}
+    for row in rows:
+        row['overhead_us'] = round((row['mean'] - baseline[row['endpoint']]) * 1000, 1)
+    print_table(
+        rows,
+        ['variant', 'endpoint', 'mean', 'p50', 'p99', 'throughput', 'traces', 'overhead_us'],
+    )
+
+
+if __name__ == '__main__':
+    main()
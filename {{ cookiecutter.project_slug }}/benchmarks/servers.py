@@ -0,0 +1,168 @@
+"""
+Throughput and latency of the supported application servers.
+
+Starts each installed server in turn on a local port and drives it over
+keep-alive HTTP connections with ``GET /accounts/users/{id}`` (anonymous) and
+``GET /accounts/users/me`` (JWT bearer token):
+
+* ``gunicorn-sync``: ``2 x workers + 1`` sync workers
+* ``gunicorn-gthread``: gthread workers with ``--threads`` threads each
+* ``gunicorn-uvicorn``: uvicorn workers serving the ASGI application
+* ``granian``: granian's WSGI interface with ``--threads`` blocking threads
+
+Servers that are not installed are skipped, so install the others into the
+virtualenv (``uv pip install gunicorn uvicorn-worker granian``) to compare them.
+
+Usage (from the project root, against a migrated database)::
+
+    python -m benchmarks.servers --workers 2 --threads 4 --clients 16 --requests 5000
+"""
+
+import argparse
+import importlib.util
+import os
+import subprocess
+import sys
+
+from benchmarks.common import (
+    API_PREFIX,
+    http_get,
+    print_table,
+    run_concurrently,
+    setup_django,
+    wait_for_port,
+)
+
+PROJECT = '{{ cookiecutter.project_slug }}'
+
+# Modules each server needs
+SERVERS = {
+    'gunicorn-sync': ('gunicorn',),
+    'gunicorn-gthread': ('gunicorn',),
+    'gunicorn-uvicorn': ('gunicorn', 'uvicorn_worker'),
+    'granian': ('granian',),
+}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--warmup', type=int, default=200)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--servers', nargs='*', choices=list(SERVERS), default=list(SERVERS))
+    return parser.parse_args(argv)
+
+
+def is_installed(server: str) -> bool:
+    return all(importlib.util.find_spec(module) is not None for module in SERVERS[server])
+
+
+def server_command(server: str, args) -> list[str]:
+    bind = f'127.0.0.1:{args.port}'
+    # gunicorn also reads ./gunicorn.conf.py; the flags below take precedence over it
+    gunicorn = [
+        sys.executable,
+        '-m',
+        'gunicorn',
+        '--bind',
+        bind,
+        '--log-level',
+        'warning',
+        '--access-logfile',
+        os.devnull,
+    ]
+    if server == 'gunicorn-sync':
+        workers = args.workers * 2 + 1
+        return [*gunicorn, '--workers', str(workers), f'{PROJECT}.wsgi:application']
+    if server == 'gunicorn-gthread':
+        return [
+            *gunicorn,
+            '--workers',
+            str(args.workers),
+            '--worker-class',
+            'gthread',
+            '--threads',
+            str(args.threads),
+            f'{PROJECT}.wsgi:application',
+        ]
+    if server == 'gunicorn-uvicorn':
+        return [
+            *gunicorn,
+            '--workers',
+            str(args.workers),
+            '--worker-class',
+            'uvicorn_worker.UvicornWorker',
+            f'{PROJECT}.asgi:application',
+        ]
+    return [
+        sys.executable,
+        '-m',
+        'granian',
+        '--interface',
+        'wsgi',
+        '--host',
+        '127.0.0.1',
+        '--port',
+        str(args.port),
+        '--workers',
+        str(args.workers),
+        '--blocking-threads',
+        str(args.threads),
+        '--log-level',
+        'warning',
+        f'{PROJECT}.wsgi:application',
+    ]
+
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    user, _ = User.objects.get_or_create(
+        username='benchmark-user', defaults={'email': 'benchmark@example.com'}
+    )
+    token = str(RefreshToken.for_user(user).access_token)
+    connection.close()
+
+    endpoints = {
+        'users/{id}': (f'{API_PREFIX}/accounts/users/{user.id}', {}),
+        'users/me': (f'{API_PREFIX}/accounts/users/me', {'Authorization': f'Bearer {token}'}),
+    }
+    # Each server runs with the same per-process concurrency so the pools match
+    env = {
+        **os.environ,
+        'GUNICORN_THREADS': str(args.threads),
+        'GRANIAN_BLOCKING_THREADS': str(args.threads),
+    }
+
+    rows = []
+    for server in args.servers:
+        if not is_installed(server):
+            print(f'Skipping {server}: not installed', file=sys.stderr)
+            continue
+        process = subprocess.Popen(server_command(server, args), env=env)
+        try:
+            wait_for_port(args.port, process)
+            for name, (path, headers) in endpoints.items():
+                request = http_get(args.port, path, headers)
+                run_concurrently(request, args.warmup, args.clients)
+                result = run_concurrently(request, args.requests, args.clients)
+                rows.append({'server': server, 'endpoint': name, **result})
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    print_table(
+        rows,
+        ['server', 'endpoint', 'count', 'throughput', 'p50', 'p95', 'p99', 'max', 'errors'],
+    )
+
+
+if __name__ == '__main__':
+    main()
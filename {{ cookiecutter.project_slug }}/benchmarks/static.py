@@ -0,0 +1,149 @@
+"""
+Cold start and bytes served with build-time static file compression.
+
+Uses the production settings with ``STATIC_ROOT`` in a temporary directory:
+
+* ``collectstatic-at-start``: what a container without prebuilt static files
+  does before serving - ``collectstatic`` (hashing plus gzip and Brotli
+  compression) followed by loading the application and serving a first request
+* ``prebuilt``: loading the application and serving a first request when
+  ``collectstatic`` already ran in the image build
+
+Then the largest static files are requested through WhiteNoise with each
+``Accept-Encoding`` to compare the bytes sent and check the ``Cache-Control``
+header of hashed files.
+
+Usage (from the project root; no database is needed)::
+
+    python -m benchmarks.static --runs 3
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import (
+    CHILD_FLAG,
+    emit_child_result,
+    print_table,
+    run_variant,
+    wsgi_request,
+)
+
+ENCODINGS = ('identity', 'gzip', 'br')
+COMPRESSIBLE = ('.css', '.js', '.svg', '.map', '.txt')
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--files', type=int, default=5, help='largest files to request')
+    parser.add_argument('--bytes', action='store_true', help='internal: report bytes served')
+    parser.add_argument(CHILD_FLAG, action='store_true', help='internal: run one variant')
+    return parser.parse_args(argv)
+
+
+def first_request():
+    """Load the WSGI application and serve one static file."""
+    from django.contrib.staticfiles.storage import staticfiles_storage
+
+    from {{ cookiecutter.project_slug }}.wsgi import application
+
+    status, _ = wsgi_request(application, 'GET', staticfiles_storage.url('admin/css/base.css'))
+    if status != 200:
+        raise RuntimeError(f'unexpected status {status}')
+    emit_child_result({'status': status})
+
+
+def bytes_served(files):
+    """Request the largest compressible files with each encoding."""
+    import django
+
+    django.setup()
+    from django.contrib.staticfiles.storage import staticfiles_storage
+    from django.test import Client
+
+    client = Client()
+    names = sorted(
+        (name for name in staticfiles_storage.hashed_files if name.endswith(COMPRESSIBLE)),
+        key=lambda name: staticfiles_storage.size(name),
+        reverse=True,
+    )[:files]
+
+    rows = []
+    for name in names:
+        row = {'file': name}
+        for encoding in ENCODINGS:
+            response = client.get(
+                staticfiles_storage.url(name), headers={'Accept-Encoding': encoding}
+            )
+            row[encoding] = len(b''.join(response.streaming_content))
+            row['cache_control'] = response.headers.get('Cache-Control', '')
+        rows.append(row)
+    emit_child_result(rows)
+
+
+def collectstatic(env):
+    subprocess.run(
+        [sys.executable, 'manage.py', 'collectstatic', '--noinput', '-v', '0'],
+        env={**os.environ, **env},
+        check=True,
+    )
+
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    if args.child and args.bytes:
+        bytes_served(args.files)
+        return
+    if args.child:
+        first_request()
+        return
+
+    static_root = tempfile.mkdtemp()
+    env = {
+        'DJANGO_SETTINGS_MODULE': '{{ cookiecutter.project_slug }}.settings.production',
+        'DJANGO_SECRET_KEY': 'benchmark',
+        'DJANGO_ALLOWED_HOSTS': 'localhost,testserver',
+        'DJANGO_STATIC_ROOT': static_root,
+        'SECURE_SSL_REDIRECT': 'False',
+    }
+    timings = {'collectstatic-at-start': [], 'prebuilt': []}
+    try:
+        for _ in range(args.runs):
+            shutil.rmtree(static_root)
+            os.mkdir(static_root)
+            started = time.perf_counter()
+            collectstatic(env)
+            run_variant('benchmarks.static', env)
+            timings['collectstatic-at-start'].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            run_variant('benchmarks.static', env)
+            timings['prebuilt'].append(time.perf_counter() - started)
+
+        files = run_variant('benchmarks.static', env, ['--bytes', '--files', str(args.files)])
+    finally:
+        shutil.rmtree(static_root, ignore_errors=True)
+
+    print('Time to first response (seconds, median of runs)')
+    print_table(
+        [
+            {'variant': name, 'cold_start': round(statistics.median(samples), 3)}
+            for name, samples in timings.items()
+        ],
+        ['variant', 'cold_start'],
+    )
+    print()
+    print('Bytes served per Accept-Encoding')
+    total = {encoding: sum(row[encoding] for row in files) for encoding in ENCODINGS}
+    print_table([*files, {'file': 'total', **total}], ['file', *ENCODINGS, 'cache_control'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Per-request overhead of the Server-Timing middleware.
+
+Runs ``GET /accounts/users/me`` (JWT) in a child process per variant with
+``SERVER_TIMING_SAMPLE_RATE`` set to 0 (``off``: the middleware is not
+installed), 0.01 (``sampled``) and 1 (``all``: every request is timed, gets a
+``Server-Timing`` header and logs a line). ``timed`` is the share of requests
+that logged their timings.
+
+Usage (from the project root, against a migrated database)::
+
+    python -m benchmarks.timing --requests 5000
+"""
+
+import argparse
+import logging
+import sys
+
+from benchmarks.common import (
+    API_PREFIX,
+    CHILD_FLAG,
+    emit_child_result,
+    print_table,
+    run_concurrently,
+    run_variant,
+    setup_django,
+    wsgi_request,
+)
+
+VARIANTS = {
+    'off': {'SERVER_TIMING_SAMPLE_RATE': '0'},
+    'sampled': {'SERVER_TIMING_SAMPLE_RATE': '0.01'},
+    'all': {'SERVER_TIMING_SAMPLE_RATE': '1'},
+}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--warmup', type=int, default=200)
+    parser.add_argument(CHILD_FLAG, action='store_true', help='internal: run one variant')
+    return parser.parse_args(argv)
+
+
+def run_child(args):
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    user, _ = User.objects.get_or_create(
+        username='benchmark-user', defaults={'email': 'benchmark@example.com'}
+    )
+    headers = {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+    connection.close()
+    application = get_wsgi_application()
+    path = f'{API_PREFIX}/accounts/users/me'
+    timed = []
+
+    class CountingHandler(logging.Handler):
+        def emit(self, record):
+            timed.append(record)
+
+    logging.getLogger('{{ cookiecutter.project_slug }}.core.timing').addHandler(CountingHandler())
+
+    def request():
+        status, _ = wsgi_request(application, 'GET', path, headers=headers)
+        if status != 200:
+            raise RuntimeError(f'unexpected status {status}')
+
+    for _ in range(args.warmup):
+        request()
+    timed.clear()
+    result = run_concurrently(request, args.requests, args.concurrency)
+    result['timed'] = f'{len(timed) / args.requests:.1%}'
+    emit_child_result(result)
+
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    if args.child:
+        run_child(args)
+        return
+
+    rows = []
+    for name, env in VARIANTS.items():
+        result = run_variant(
+            'benchmarks.timing',
+            env,
+            [
+                '--requests',
+                str(args.requests),
+                '--concurrency',
+                str(args.concurrency),
+                '--warmup',
+                str(args.warmup),
+            ],
+        )
+        rows.append({'variant': name, **result})
+
+    baseline = rows[0]['mean']
+    for row in rows:
+        row['overhead_us'] = round((row['mean'] - baseline) * 1000, 1)
+    print_table(rows, ['variant', 'mean', 'p50', 'p99', 'throughput', 'timed', 'overhead_us'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Per-request overhead of OpenTelemetry tracing.
+
+Runs ``GET /accounts/users/me`` (JWT) through the project's ``wsgi.py`` in a
+child process per variant: ``off`` (``OTEL_ENABLED=False``), ``sampled`` (10% of
+new traces) and ``all`` (every request traced). Spans are created and ended but
+not exported (``OTEL_TRACES_EXPORTER=none``), so the numbers are the cost on
+the request path; the batch processor exports from a background thread. The
+Server-Timing middleware is off in every variant.
+
+Usage (from the project root, against a migrated database)::
+
+    python -m benchmarks.tracing --requests 5000
+"""
+
+import argparse
+import sys
+
+from benchmarks.common import (
+    API_PREFIX,
+    CHILD_FLAG,
+    emit_child_result,
+    print_table,
+    run_concurrently,
+    run_variant,
+    setup_django,
+    wsgi_request,
+)
+
+VARIANTS = {
+    'off': {'OTEL_ENABLED': 'False'},
+    'sampled': {'OTEL_ENABLED': 'True', 'OTEL_TRACES_SAMPLE_RATE': '0.1'},
+    'all': {'OTEL_ENABLED': 'True', 'OTEL_TRACES_SAMPLE_RATE': '1'},
+}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--warmup', type=int, default=200)
+    parser.add_argument(CHILD_FLAG, action='store_true', help='internal: run one variant')
+    return parser.parse_args(argv)
+
+
+def run_child(args):
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    user, _ = User.objects.get_or_create(
+        username='benchmark-user', defaults={'email': 'benchmark@example.com'}
+    )
+    headers = {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+    connection.close()
+
+    # Configures tracing before creating the application, like a server would
+    from {{ cookiecutter.project_slug }}.wsgi import application
+
+    path = f'{API_PREFIX}/accounts/users/me'
+
+    def request():
+        status, _ = wsgi_request(application, 'GET', path, headers=headers)
+        if status != 200:
+            raise RuntimeError(f'unexpected status {status}')
+
+    for _ in range(args.warmup):
+        request()
+    emit_child_result(run_concurrently(request, args.requests, args.concurrency))
+
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    if args.child:
+        run_child(args)
+        return
+
+    rows = []
+    for name, env in VARIANTS.items():
+        result = run_variant(
+            'benchmarks.tracing',
+            {'OTEL_TRACES_EXPORTER': 'none', 'SERVER_TIMING_SAMPLE_RATE': '0', **env},
+            [
+                '--requests',
+                str(args.requests),
+                '--concurrency',
+                str(args.concurrency),
+                '--warmup',
+                str(args.warmup),
+            ],
+        )
+        rows.append({'variant': name, **result})
+
+    baseline = rows[0]['mean']
+    for row in rows:
+        row['overhead_us'] = round((row['mean'] - baseline) * 1000, 1)
+    print_table(rows, ['variant', 'mean', 'p50', 'p99', 'throughput', 'overhead_us'])
+
+
+if __name__ == '__main__':
+    main()
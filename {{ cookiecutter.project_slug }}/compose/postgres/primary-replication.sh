@@ -0,0 +1,10 @@
+#!/bin/sh
+# Create the replication role and allow streaming replication connections.
+# Run by the postgres image entrypoint when the data directory is first initialised.
+set -e
+
+psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" <<-EOSQL
+	CREATE ROLE "$POSTGRES_REPLICATION_USER" WITH REPLICATION LOGIN PASSWORD '$POSTGRES_REPLICATION_PASSWORD';
+EOSQL
+
+echo "host replication $POSTGRES_REPLICATION_USER all scram-sha-256" >> "$PGDATA/pg_hba.conf"
@@ -0,0 +1,27 @@
+#!/bin/sh
+# Clone the primary with pg_basebackup on first start, then run as a hot standby.
+# pg_basebackup -R writes standby.signal and primary_conninfo so the server
+# keeps streaming WAL from the primary after every restart.
+set -e
+
+PGDATA="${PGDATA:-/var/lib/postgresql/data}"
+
+if [ ! -s "$PGDATA/PG_VERSION" ]; then
+    until pg_isready -h "$PRIMARY_HOST" -p "$PRIMARY_PORT"; do
+        sleep 1
+    done
+
+    mkdir -p "$PGDATA"
+    chown postgres:postgres "$PGDATA"
+    chmod 0700 "$PGDATA"
+    PGPASSWORD="$POSTGRES_REPLICATION_PASSWORD" su-exec postgres pg_basebackup \
+        --host="$PRIMARY_HOST" \
+        --port="$PRIMARY_PORT" \
+        --username="$POSTGRES_REPLICATION_USER" \
+        --pgdata="$PGDATA" \
+        --wal-method=stream \
+        --write-recovery-conf \
+        --checkpoint=fast
+fi
+
+exec docker-entrypoint.sh postgres
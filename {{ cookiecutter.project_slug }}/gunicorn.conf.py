@@ -0,0 +1,157 @@
+"""
+Gunicorn configuration for {{ cookiecutter.project_name }}.
+
+Worker and thread counts are read from the environment so the same image can be
+sized per deployment:
+
+* ``WEB_CONCURRENCY``: number of worker processes
+{%- if cookiecutter.server == 'gunicorn-gthread' %}
+* ``GUNICORN_THREADS``: threads per worker, also used to size the database pool
+{%- endif %}
+* ``GUNICORN_TIMEOUT``: seconds before a silent worker is killed and restarted
+* ``GUNICORN_PRELOAD``: import the application once in the master before forking
+* ``GUNICORN_GC_FREEZE``: keep the preloaded objects out of garbage collection
+* ``GUNICORN_MAX_REQUESTS``: requests after which a worker is replaced (0 disables)
+* ``PROMETHEUS_MULTIPROC_DIR``: where workers write their Prometheus metrics
+
+With preloading, workers share the master's memory pages copy-on-write. The
+garbage collector would write to every object it scans and unshare them, so the
+master runs with the collector disabled and freezes its objects right before
+each fork. Each worker logs its resident memory (``rss``) at boot and exit, and
+``shared`` is the part still shared with the master: the memory saved per worker.
+"""
+
+import gc
+import os
+import shutil
+
+
+def cpu_count() -> int:
+    """CPUs this process may run on (respects container CPU sets)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+{%- if cookiecutter.server == 'gunicorn-sync' %}
+
+# Sync workers serve one request at a time, so run several per CPU to overlap I/O
+worker_class = 'sync'
+workers = int(os.getenv('WEB_CONCURRENCY', cpu_count() * 2 + 1))
+{%- elif cookiecutter.server == 'gunicorn-gthread' %}
+
+# One process per CPU, each serving GUNICORN_THREADS requests concurrently
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', cpu_count()))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+{%- elif cookiecutter.server == 'gunicorn-uvicorn' %}
+
+# ASGI: one event loop per CPU. Sync views run in asgiref's thread pool.
+worker_class = 'uvicorn_worker.UvicornWorker'
+workers = int(os.getenv('WEB_CONCURRENCY', cpu_count()))
+{%- endif %}
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+# Seconds to keep idle connections from the reverse proxy open
+keepalive = 5
+# Heartbeat files on tmpfs: a slow container filesystem can make workers look hung
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+# Replace workers after a random number of requests between max_requests and
+# max_requests + jitter, so slow leaks are bounded and they do not all restart at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10))
+
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True').lower() in ('true', '1', 'yes')
+gc_freeze = preload_app and os.getenv('GUNICORN_GC_FREEZE', 'True').lower() in ('true', '1', 'yes')
+if gc_freeze:
+    # Collections while the application is imported would leave freed holes in
+    # pages that workers then share. Enabled again in when_ready, once the
+    # imported objects are frozen.
+    gc.disable()
+
+# Prometheus multiprocess mode: each worker writes its metrics to files in this
+# directory and /metrics adds them up. Set before the application is imported.
+if os.path.isdir('/dev/shm'):
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/dev/shm/prometheus')
+else:
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus')
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    # Counters left by a previous run would be added to this one
+    directory = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def when_ready(server):
+    """Called in the master after the application is preloaded, before the first fork."""
+    if preload_app:
+        from {{ cookiecutter.project_slug }}.core.workers import close_parent_connections
+
+        close_parent_connections()
+    if gc_freeze:
+        # Collections skip frozen objects, so the master and its workers can run
+        # with the collector on without touching the shared pages
+        gc.freeze()
+        gc.enable()
+
+
+def pre_fork(server, worker):
+    if gc_freeze:
+        # Also freeze what the master allocated since, e.g. before a worker is replaced
+        gc.freeze()
+
+
+def serves_in_threads(cfg) -> bool:
+    """Whether requests run on other threads than the one the worker hooks run on."""
+    from gunicorn.workers.sync import SyncWorker
+
+    return not issubclass(cfg.worker_class, SyncWorker)
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from {{ cookiecutter.project_slug }}.core.workers import open_worker_connections
+
+        open_worker_connections(threaded=serves_in_threads(server.cfg))
+
+
+def post_worker_init(worker):
+    from {{ cookiecutter.project_slug }}.core.workers import (
+        format_memory_usage,
+        get_memory_usage,
+        open_worker_connections,
+    )
+
+    if not preload_app:
+        open_worker_connections(threaded=serves_in_threads(worker.cfg))
+    worker.log.info('Worker %s booted: %s', worker.pid, format_memory_usage(get_memory_usage()))
+
+
+def worker_exit(server, worker):
+    from {{ cookiecutter.project_slug }}.core.workers import format_memory_usage, get_memory_usage
+
+    worker.log.info(
+        'Worker %s exiting after %s requests: %s',
+        worker.pid,
+        worker.nr,
+        format_memory_usage(get_memory_usage()),
+    )
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    # Drop the live gauges of the dead worker; its counters stay in the totals
+    multiprocess.mark_process_dead(worker.pid)
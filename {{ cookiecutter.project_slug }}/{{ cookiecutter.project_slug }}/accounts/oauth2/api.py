@@ -202,14 +202,24 @@ def _find_or_create_user(normalized_data: dict) -> User:
         return user
     except User.DoesNotExist:
         # Create new user
-        # Ensure username is unique
+        # Ensure username is unique: check candidates in batches with one
+        # query each instead of one query per candidate
         base_username = username or email.split('@')[0]
-        final_username = base_username
-        counter = 1
-        while User.objects.filter(username=final_username).exists():
-            final_username = f"{base_username}{counter}"
-            counter += 1
+        final_username = None
+        start = 0
+        while final_username is None:
+            candidates = [
+                f"{base_username}{n}" if n else base_username
+                for n in range(start, start + 100)
+            ]
+            taken = set(
+                User.objects.filter(username__in=candidates)
+                .values_list('username', flat=True)
+            )
+            final_username = next((name for name in candidates if name not in taken), None)
+            start += 100
         
+        # create_user() with password=None already sets an unusable password
         user = User.objects.create_user(
             username=final_username,
             email=email,
@@ -217,7 +227,5 @@ def _find_or_create_user(normalized_data: dict) -> User:
             last_name=normalized_data.get('last_name', ''),
             password=None  # OAuth2 users don't have passwords
         )
-        user.set_unusable_password()
-        user.save()
         
         return user
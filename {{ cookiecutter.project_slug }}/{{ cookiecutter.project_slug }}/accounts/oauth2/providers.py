@@ -58,6 +58,11 @@ def get_oauth2_config(provider: str) -> Dict[str, Any]:
     config["client_id"] = getattr(settings, config["client_id_setting"], None)
     config["client_secret"] = getattr(settings, config["client_secret_setting"], None)
 
+    fake_provider_url = getattr(settings, "OAUTH2_FAKE_PROVIDER_URL", "")
+    if fake_provider_url:
+        config["token_url"] = f"{fake_provider_url}/{provider}/token"
+        config["user_info_url"] = f"{fake_provider_url}/{provider}/userinfo"
+
     if not config["client_id"] or not config["client_secret"]:
         raise ValueError(f"OAuth2 credentials not configured for {provider}")
 
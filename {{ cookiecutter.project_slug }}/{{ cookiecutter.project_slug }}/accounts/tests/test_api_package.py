@@ -351,7 +351,24 @@ class OAuth2ProvidersTestCase(TestCase):
                 self.assertIn('OAuth2 credentials not configured', str(context.exception))
         except NameError:
             self.skipTest("OAuth2 config function not available in test environment")
-    
+
+    def test_get_oauth2_config_fake_provider_url(self):
+        """Test that load tests can send token and user info requests to a fake provider."""
+        try:
+            with self.settings(
+                GOOGLE_OAUTH2_CLIENT_ID='test-client-id',
+                GOOGLE_OAUTH2_CLIENT_SECRET='test-secret',
+                OAUTH2_FAKE_PROVIDER_URL='http://fake-oauth2:8080',
+            ):
+                config = get_oauth2_config('google')
+            self.assertEqual(config['token_url'], 'http://fake-oauth2:8080/google/token')
+            self.assertEqual(config['user_info_url'], 'http://fake-oauth2:8080/google/userinfo')
+            self.assertEqual(
+                OAUTH2_PROVIDERS['google']['token_url'], 'https://oauth2.googleapis.com/token'
+            )
+        except NameError:
+            self.skipTest("OAuth2 config function not available in test environment")
+
     def test_get_available_providers(self):
         """Test getting list of available providers."""
         try:
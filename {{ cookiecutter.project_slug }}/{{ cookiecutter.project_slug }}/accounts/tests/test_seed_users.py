@@ -0,0 +1,77 @@
+"""
+Tests for the seed_users management command.
+"""
+
+import random
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+from guardian.models import UserObjectPermission
+from guardian.shortcuts import get_perms
+
+from {{ cookiecutter.project_slug }}.accounts.management.commands.seed_users import UsernameGenerator
+
+
+class UsernameGeneratorTestCase(SimpleTestCase):
+    """Test that common names collide and get numbered."""
+
+    def test_claim_numbers_taken_bases(self):
+        generator = UsernameGenerator(random.Random(0), taken={'ada.lovelace', 'ada.lovelace2'})
+        self.assertEqual(
+            [generator.claim('ada.lovelace') for _ in range(3)],
+            ['ada.lovelace1', 'ada.lovelace3', 'ada.lovelace4'],
+        )
+        self.assertEqual(generator.claim('grace.hopper'), 'grace.hopper')
+
+    def test_names_are_unique_and_collide(self):
+        names = UsernameGenerator(random.Random(0), taken=set()).names(2000)
+        usernames = [username for username, _, _ in names]
+        self.assertEqual(len(set(usernames)), len(usernames))
+        # The most common names come back numbered
+        self.assertIn('james.smith1', usernames)
+
+
+class SeedUsersCommandTestCase(TestCase):
+    """Test the loaded users, social accounts and permissions."""
+
+    def seed(self, count, **options):
+        call_command('seed_users', count, seed=1, batch_size=40, stdout=StringIO(), **options)
+
+    def test_users(self):
+        # Guardian's anonymous user is there already
+        last_id = User.objects.create(username='existing').id
+        self.seed(100, password='seed-secret')
+
+        seeded = User.objects.filter(id__gt=last_id)
+        self.assertEqual(seeded.count(), 100)
+        user = seeded.filter(is_active=True).first()
+        self.assertEqual(authenticate(username=user.username, password='seed-secret'), user)
+        self.assertTrue(user.email.startswith(f'{user.username}@'))
+        # The id sequence continues after the explicit ids
+        self.assertEqual(User.objects.create(username='after').id, last_id + 101)
+
+    def test_reseeding_avoids_taken_usernames(self):
+        self.seed(50)
+        self.seed(50)
+        self.assertEqual(User.objects.values('username').distinct().count(), User.objects.count())
+
+    def test_social_accounts_and_permissions(self):
+        self.seed(100, social_ratio=0.5, permission_ratio=0.2)
+
+        owners = UserObjectPermission.objects.values('user').distinct()
+        self.assertEqual(owners.count(), 20)
+        owner = User.objects.filter(is_active=True, pk__in=owners).first()
+        self.assertEqual(set(get_perms(owner, owner)), {'view_user', 'change_user'})
+        if apps.is_installed('social_django'):
+            from social_django.models import UserSocialAuth
+
+            self.assertEqual(UserSocialAuth.objects.count(), 50)
+            self.assertEqual(UserSocialAuth.objects.values('user').distinct().count(), 50)
+
+    def test_invalid_count(self):
+        with self.assertRaisesMessage(CommandError, 'at least 1'):
+            self.seed(0)
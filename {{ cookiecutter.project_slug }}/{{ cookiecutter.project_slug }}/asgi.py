@@ -11,7 +11,21 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from {{ cookiecutter.project_slug }}.core.staticfiles import check_static_manifest
+{%- if cookiecutter.include_opentelemetry == 'y' %}
+from {{ cookiecutter.project_slug }}.core.tracing import configure_tracing
+{%- endif %}
+
 # Default to local settings if DJANGO_SETTINGS_MODULE is not set
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', '{{ cookiecutter.project_slug }}.settings.local')
 
-application = get_asgi_application() 
\ No newline at end of file
+{%- if cookiecutter.include_opentelemetry == 'y' %}
+
+# Before the application is created: instrumentation adds the tracing middleware
+configure_tracing()
+{%- endif %}
+
+application = get_asgi_application()
+
+# Refuse to start without the collectstatic manifest rather than fail on each page
+check_static_manifest()
@@ -1,13 +1,26 @@
 import os
 from celery import Celery
+from celery.signals import task_prerun{% if cookiecutter.include_opentelemetry == 'y' %}, worker_init{% endif %}
 from django.conf import settings
 
+from {{ cookiecutter.project_slug }}.core.serialization import register_serializers
+
 # Set the default Django settings module for the 'celery' program.
 # This must happen before configuring the Celery app instance.
 # Default to 'local' if not specified.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', '{{ cookiecutter.project_slug }}.settings.local')
 
-app = Celery('{{ cookiecutter.project_slug }}')
+# Make the msgpack/orjson (+zlib/+zstd) payload formats available to
+# CELERY_TASK_SERIALIZER before anything is sent or received.
+register_serializers()
+
+# Every task checks payloads above CLAIM_CHECK_THRESHOLD bytes into the claim check
+# store instead of the broker (see core/claim_check.py), and tasks declared with
+# unique='publish' or unique='execute' are deduplicated (see core/unique.py)
+app = Celery(
+    '{{ cookiecutter.project_slug }}',
+    task_cls='{{ cookiecutter.project_slug }}.core.unique:UniqueTask',
+)
 
 # Using a string here means the worker doesn't have to serialize
 # the configuration object to child processes.
@@ -19,6 +32,26 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
 
 
+@task_prerun.connect
+def reset_database_pinning(**kwargs):
+    """Let each task read from replicas again after a previous task wrote."""
+    from {{ cookiecutter.project_slug }}.core.routers import reset_primary_pin
+
+    reset_primary_pin()
+{%- if cookiecutter.include_opentelemetry == 'y' %}
+
+
+@worker_init.connect
+def init_tracing(**kwargs):
+    """Trace tasks, continuing the trace context the publisher put in the task headers."""
+    from {{ cookiecutter.project_slug }}.core.tracing import configure_tracing
+
+    # Forked pool processes inherit the setup; the batch span processor
+    # restarts its export thread after a fork
+    configure_tracing()
+{%- endif %}
+
+
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
     """A sample task for debugging purposes."""
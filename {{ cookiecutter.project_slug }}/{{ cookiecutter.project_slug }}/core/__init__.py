@@ -0,0 +1,6 @@
+"""
+Core Package
+
+This package provides project-wide infrastructure shared by the web and
+Celery processes, such as database connection helpers.
+"""
@@ -0,0 +1,163 @@
+"""
+Celery Task Batching
+
+This module contains the ``batch_task`` decorator for tasks that are cheap per
+item but called very often, such as one email or one audit event per call.
+``delay()`` appends the call to a Redis list instead of publishing a message,
+and the buffered calls are published as a single bulk message once there are
+``flush_every`` of them or ``flush_interval`` milliseconds after the first one.
+The task function then runs once per batch and returns one result per call.
+"""
+
+import logging
+from functools import cache
+from typing import Any, NamedTuple
+
+import redis
+from celery import current_app, shared_task, uuid
+from celery.backends.base import DisabledBackend
+from celery.exceptions import Retry
+from celery.result import AsyncResult
+from django.conf import settings
+
+from .claim_check import ClaimCheckTask, resolve
+from .serialization import msgpack_dumps, msgpack_loads
+
+logger = logging.getLogger(__name__)
+
+
+class BatchItem(NamedTuple):
+    """One buffered call: the id of its result and its arguments."""
+
+    id: str
+    args: tuple
+    kwargs: dict[str, Any]
+
+
+@cache
+def get_batch_client(url: str) -> redis.Redis:
+    return redis.Redis.from_url(url)
+
+
+class BatchTask(ClaimCheckTask):
+    """
+    Task that buffers ``delay()`` calls in Redis and runs them in batches.
+
+    The task function receives a list of :class:`BatchItem` and returns a list
+    with one result per item, in the same order (or ``None`` if there are no
+    results). An exception instance in that list fails only its item. Each
+    call's ``AsyncResult`` gets its own result, stored unless the task ignores
+    results. ``apply_async()`` publishes a list of items as one batch directly.
+    """
+
+    #: Items per batch; reaching it flushes the buffer right away
+    flush_every = 100
+    #: Milliseconds after the first buffered call at which the buffer is flushed
+    flush_interval = 1000
+
+    @property
+    def buffer_key(self) -> str:
+        return f'batch:{self.name}'
+
+    @property
+    def client(self) -> redis.Redis:
+        return get_batch_client(settings.TASK_BATCH_URL or self.app.conf.broker_url)
+
+    def delay(self, *args, **kwargs) -> AsyncResult:
+        """Buffer a call and return the ``AsyncResult`` of its item."""
+        item_id = uuid()
+        length = self.client.rpush(self.buffer_key, msgpack_dumps([item_id, args, kwargs]))
+        if length >= self.flush_every:
+            # Caller publishes one full batch; a timer or later caller takes the rest
+            self.flush(max_batches=1)
+        elif length == 1:
+            # First call since the buffer was last emptied
+            options = {'queue': self.queue} if getattr(self, 'queue', None) else {}
+            flush_batch.apply_async((self.name,), countdown=self.flush_interval / 1000, **options)
+        return self.AsyncResult(item_id)
+
+    def flush(self, max_batches: int | None = None) -> int:
+        """
+        Publish buffered calls as bulk messages of up to ``flush_every`` items.
+
+        Args:
+            max_batches: Stop after this many messages, defaults to emptying the buffer
+
+        Returns:
+            Number of published items
+        """
+        published = batches = 0
+        while max_batches is None or batches < max_batches:
+            entries = self.client.lpop(self.buffer_key, self.flush_every) or []
+            if entries:
+                self.apply_async((list(map(msgpack_loads, entries)),), ignore_result=True)
+                published += len(entries)
+                batches += 1
+            if len(entries) < self.flush_every:
+                break
+        return published
+
+    def __call__(self, items):
+        batch = [
+            BatchItem(item_id, tuple(args), kwargs) for item_id, args, kwargs in resolve(items)
+        ]
+        store = not self.ignore_result and not isinstance(self.backend, DisabledBackend)
+        try:
+            results = super().__call__(batch)
+        except Retry:
+            raise
+        except Exception as exc:
+            if store:
+                for item in batch:
+                    self.backend.mark_as_failure(item.id, exc)
+            raise
+
+        if results is None:
+            results = [None] * len(batch)
+        if len(results) != len(batch):
+            raise ValueError(f'{self.name} returned {len(results)} results for {len(batch)} items')
+        failed = 0
+        for item, result in zip(batch, results, strict=True):
+            if isinstance(result, Exception):
+                failed += 1
+                logger.warning('%s failed for item %s: %r', self.name, item.id, result)
+                if store:
+                    self.backend.mark_as_failure(item.id, result)
+            elif store:
+                self.backend.mark_as_done(item.id, result)
+        return {'items': len(batch), 'failed': failed}
+
+
+def batch_task(*args, flush_every: int = 100, flush_interval: int = 1000, **options):
+    """
+    Decorate a function taking a list of :class:`BatchItem` as a batched task.
+
+    Example::
+
+        @batch_task(flush_every=500, flush_interval=200)
+        def send_emails(items):
+            return send_mass_mail(...)  # one result per item
+
+        send_emails.delay('user@example.com', template='welcome')
+
+    Args:
+        flush_every: Items per batch
+        flush_interval: Milliseconds a call waits at most for its batch to fill
+        options: Task options, as for ``shared_task``
+
+    Returns:
+        The task
+    """
+    return shared_task(
+        *args,
+        base=BatchTask,
+        flush_every=flush_every,
+        flush_interval=flush_interval,
+        **options,
+    )
+
+
+@shared_task(ignore_result=True)
+def flush_batch(task_name: str) -> int:
+    """Flush the buffer of a batch task once its interval has passed."""
+    return current_app.tasks[task_name].flush()
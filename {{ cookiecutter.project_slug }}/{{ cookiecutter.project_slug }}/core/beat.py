@@ -0,0 +1,248 @@
+"""
+Redis Beat Scheduler
+
+This module contains a Celery beat scheduler for large schedules and for
+running several beat replicas. Periodic tasks are still defined in the
+``django_celery_beat`` tables and edited in the admin, but unlike
+``DatabaseScheduler`` the ``RedisScheduler``:
+
+* keeps the next due time of every entry in a Redis sorted set, so a tick only
+  looks at the entries that are due
+* reloads the definitions only when ``PeriodicTasks`` reports a change, instead
+  of on a timer as well
+* writes last run times and run counts back in one bulk update per sync
+* sends tasks only while it holds a lease in Redis, so further replicas stand
+  by and one of them takes over within ``BEAT_LEASE_TTL`` seconds when the
+  leader stops
+"""
+
+import logging
+import os
+import socket
+import time
+import uuid
+
+import redis
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django_celery_beat.schedulers import DatabaseScheduler
+
+from .unique import RELEASE_SCRIPT, get_lock_client
+
+logger = logging.getLogger(__name__)
+
+# Extend the lease only if this scheduler still holds it
+RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Move a due entry to its next due time, unless this scheduler lost the lease
+# or the entry is no longer due because another scheduler moved it first
+CLAIM_SCRIPT = """
+if redis.call('get', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+local due = redis.call('zscore', KEYS[2], ARGV[2])
+if not due or tonumber(due) > tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('zadd', KEYS[2], ARGV[4], ARGV[2])
+return 1
+"""
+
+
+class RedisScheduler(DatabaseScheduler):
+    """
+    Beat scheduler with a Redis due-time index and a leader lease.
+
+    Enable it with ``CELERY_BEAT_SCHEDULER`` and run as many beat processes as
+    needed. The index and the lease live in ``BEAT_REDIS_URL``, which defaults
+    to the broker.
+    """
+
+    #: Prefix of the Redis keys, shared by all replicas
+    key_prefix = 'beat'
+
+    def __init__(self, *args, **kwargs):
+        self.ident = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self.lease_ttl = settings.BEAT_LEASE_TTL
+        self.is_leader = False
+        self._next_change_check = 0.0
+        super().__init__(*args, **kwargs)
+
+    @property
+    def client(self) -> redis.Redis:
+        return get_lock_client(settings.BEAT_REDIS_URL or self.app.conf.broker_url)
+
+    @property
+    def lease_key(self) -> str:
+        return f'{self.key_prefix}:leader'
+
+    @property
+    def due_key(self) -> str:
+        return f'{self.key_prefix}:due'
+
+    @property
+    def schedules_key(self) -> str:
+        return f'{self.key_prefix}:schedules'
+
+    @property
+    def schedule(self):
+        if self._schedule is None:
+            self.load_schedule()
+        return self._schedule
+
+    def enabled_models_qs(self):
+        # The due index decides what runs, so every enabled task is loaded once
+        return self.Model.objects.enabled()
+
+    def load_schedule(self):
+        """Read the definitions from the database."""
+        self._last_timestamp = self.Changes.last_change()
+        self._schedule = self.all_as_schedule()
+
+    def index_schedule(self):
+        """
+        Bring the due index in line with the loaded definitions.
+
+        Entries keep their due time unless their schedule changed, so a new
+        leader continues where the previous one stopped.
+        """
+        now = time.time()
+        fingerprints = {
+            name: f'{entry.schedule!r}|{entry.model.start_time}'
+            for name, entry in self._schedule.items()
+        }
+        indexed = {
+            name.decode(): fingerprint.decode()
+            for name, fingerprint in self.client.hgetall(self.schedules_key).items()
+        }
+        changed = {
+            name: fingerprint
+            for name, fingerprint in fingerprints.items()
+            if indexed.get(name) != fingerprint
+        }
+        removed = indexed.keys() - fingerprints.keys()
+
+        pipe = self.client.pipeline(transaction=False)
+        if removed:
+            pipe.zrem(self.due_key, *removed)
+            pipe.hdel(self.schedules_key, *removed)
+        if changed:
+            pipe.zadd(
+                self.due_key,
+                {name: now + self.remaining(self._schedule[name]) for name in changed},
+            )
+            pipe.hset(self.schedules_key, mapping=changed)
+        pipe.execute()
+        logger.info(
+            'Beat schedule indexed: %d entries, %d changed, %d removed',
+            len(fingerprints),
+            len(changed),
+            len(removed),
+        )
+
+    @staticmethod
+    def remaining(entry) -> float:
+        """Seconds until an entry is due, 0 if it is due now."""
+        is_due, next_time_to_run = entry.is_due()
+        return 0 if is_due else next_time_to_run
+
+    def acquire_lease(self) -> bool:
+        """Take or renew the leader lease and return whether this scheduler leads."""
+        ttl = int(self.lease_ttl * 1000)
+        if self.is_leader:
+            held = self.client.eval(RENEW_SCRIPT, 1, self.lease_key, self.ident, ttl)
+        else:
+            held = self.client.set(self.lease_key, self.ident, nx=True, px=ttl)
+
+        if held and not self.is_leader:
+            logger.info('Beat %s is the leader', self.ident)
+            # Definitions may have changed while standing by
+            self.load_schedule()
+            self.index_schedule()
+        elif not held and self.is_leader:
+            logger.warning('Beat %s lost the leader lease', self.ident)
+        self.is_leader = bool(held)
+        return self.is_leader
+
+    def maybe_reload(self, now: float):
+        """Reload the definitions if they changed, checked at most every ``max_interval``."""
+        if now < self._next_change_check:
+            return
+        self._next_change_check = now + self.max_interval
+        if self.schedule_changed():
+            logger.info('Beat schedule changed, reloading')
+            self.sync()
+            self.load_schedule()
+            self.index_schedule()
+
+    def tick(self, *args, **kwargs) -> float:
+        standby = self.lease_ttl / 3
+        try:
+            if not self.acquire_lease():
+                return standby
+            now = time.time()
+            self.maybe_reload(now)
+
+            due = [name.decode() for name in self.client.zrangebyscore(self.due_key, '-inf', now)]
+            removed = [name for name in due if name not in self._schedule]
+            if removed:
+                self.client.zrem(self.due_key, *removed)
+            pipe = self.client.pipeline(transaction=False)
+            entries = []
+            for name in due:
+                if name in removed:
+                    continue
+                entry = self._schedule[name]
+                is_due, next_time_to_run = entry.is_due()
+                pipe.eval(
+                    CLAIM_SCRIPT,
+                    2,
+                    self.lease_key,
+                    self.due_key,
+                    self.ident,
+                    name,
+                    now,
+                    now + next_time_to_run,
+                )
+                entries.append((entry, is_due))
+            claims = pipe.execute() if entries else []
+
+            for (entry, is_due), claimed in zip(entries, claims, strict=True):
+                if claimed and is_due:
+                    self._schedule[entry.name] = self.reserve(entry)
+                    self.apply_entry(entry, producer=self.producer)
+
+            head = self.client.zrange(self.due_key, 0, 0, withscores=True)
+        except redis.RedisError as exc:
+            logger.error('Beat cannot reach Redis: %r', exc)
+            self.is_leader = False
+            return standby
+        interval = head[0][1] - time.time() if head else self.max_interval
+        return max(0.0, min(interval, self.max_interval, standby))
+
+    def sync(self):
+        if not self._dirty:
+            return
+        models = [self._schedule[name].model for name in self._dirty if name in self._schedule]
+        try:
+            close_old_connections()
+            self.Model.objects.bulk_update(
+                models, ['last_run_at', 'total_run_count'], batch_size=1000
+            )
+        except DatabaseError as exc:
+            # The run counts are written with the next sync
+            logger.exception('Database error while syncing beat run counts: %r', exc)
+            return
+        self._dirty.clear()
+
+    def close(self):
+        super().close()
+        if self.is_leader:
+            # Lets a standby take over right away instead of after the lease expires
+            self.client.eval(RELEASE_SCRIPT, 1, self.lease_key, self.ident)
+            self.is_leader = False
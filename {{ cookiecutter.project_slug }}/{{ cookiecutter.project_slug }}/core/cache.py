@@ -0,0 +1,124 @@
+"""
+Cache Helpers
+
+This module contains the tuned ``django_redis`` profile used by the ``default``
+cache: hiredis parsing, a blocking connection pool sized per process, socket
+timeouts, msgpack serialization and zstd compression of large values.
+"""
+
+import pickle
+from typing import Any
+
+import msgpack
+import pyzstd
+from decouple import config
+from django_redis.compressors.base import BaseCompressor
+from django_redis.exceptions import CompressorError
+from django_redis.serializers.base import BaseSerializer
+from redis.utils import HIREDIS_AVAILABLE
+
+from .db import get_process_concurrency
+
+# msgpack extension type carrying a pickled object
+PICKLE_EXT_TYPE = 1
+
+# Frame header every zstd payload starts with
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+def _pack_fallback(value: Any) -> msgpack.ExtType:
+    return msgpack.ExtType(PICKLE_EXT_TYPE, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+def _unpack_ext(code: int, data: bytes) -> Any:
+    if code == PICKLE_EXT_TYPE:
+        return pickle.loads(data)
+    return msgpack.ExtType(code, data)
+
+
+class MsgpackSerializer(BaseSerializer):
+    """
+    Serialize plain data with msgpack and anything else with pickle.
+
+    Dicts, lists, strings, numbers and bytes (the bulk of cached data, such as
+    OAuth state) are packed natively, which is smaller and faster than pickle.
+    Other types, e.g. model instances, datetimes, tuples or ``SafeString``, are
+    pickled into a msgpack extension so they round-trip unchanged.
+    """
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=_pack_fallback, strict_types=True, use_bin_type=True)
+
+    def loads(self, value: bytes) -> Any:
+        return msgpack.unpackb(value, ext_hook=_unpack_ext, raw=False, strict_map_key=False)
+
+
+class ZstdCompressor(BaseCompressor):
+    """
+    Compress values larger than ``COMPRESS_MIN_LENGTH`` bytes with zstd.
+
+    Small values are stored as-is, since compressing them costs CPU without
+    saving memory. Decompression recognises zstd frames by their magic number,
+    so uncompressed values are returned without attempting to decompress them.
+    """
+
+    def __init__(self, options: dict[str, Any]):
+        super().__init__(options)
+        self.min_length = options.get('COMPRESS_MIN_LENGTH', 1024)
+        self.level = options.get('COMPRESS_LEVEL', 3)
+
+    def compress(self, value: bytes) -> bytes:
+        if len(value) > self.min_length:
+            return pyzstd.compress(value, self.level)
+        return value
+
+    def decompress(self, value: bytes) -> bytes:
+        if not value.startswith(ZSTD_MAGIC):
+            raise CompressorError('Value is not zstd compressed')
+        try:
+            return pyzstd.decompress(value)
+        except pyzstd.ZstdError as e:
+            raise CompressorError from e
+
+
+def get_redis_cache_options(argv: list[str] | None = None) -> dict[str, Any]:
+    """
+    Build ``OPTIONS`` for a ``django_redis.cache.RedisCache`` entry.
+
+    The blocking pool waits up to ``CACHE_POOL_TIMEOUT`` for a free connection
+    instead of failing when ``max_connections`` is reached. It is sized from the
+    process concurrency (see :func:`core.db.get_process_concurrency`) unless
+    ``CACHE_MAX_CONNECTIONS`` is set.
+
+    Args:
+        argv: Process arguments, defaults to ``sys.argv``
+
+    Returns:
+        Dict of ``django_redis`` options
+    """
+    concurrency = get_process_concurrency(argv)
+    options = {
+        'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+        'SERIALIZER': config(
+            'CACHE_SERIALIZER', default='{{ cookiecutter.project_slug }}.core.cache.MsgpackSerializer'
+        ),
+        'COMPRESSOR': config(
+            'CACHE_COMPRESSOR', default='{{ cookiecutter.project_slug }}.core.cache.ZstdCompressor'
+        ),
+        'COMPRESS_MIN_LENGTH': config('CACHE_COMPRESS_MIN_LENGTH', default=1024, cast=int),
+        'COMPRESS_LEVEL': config('CACHE_COMPRESS_LEVEL', default=3, cast=int),
+        'SOCKET_CONNECT_TIMEOUT': config('CACHE_SOCKET_CONNECT_TIMEOUT', default=1.0, cast=float),
+        'SOCKET_TIMEOUT': config('CACHE_SOCKET_TIMEOUT', default=1.0, cast=float),
+        'CONNECTION_POOL_CLASS': 'redis.BlockingConnectionPool',
+        'CONNECTION_POOL_KWARGS': {
+            'max_connections': config(
+                'CACHE_MAX_CONNECTIONS', default=max(concurrency * 2, 4), cast=int
+            ),
+            'timeout': config('CACHE_POOL_TIMEOUT', default=2.0, cast=float),
+            'retry_on_timeout': True,
+            'health_check_interval': 30,
+        },
+    }
+    if HIREDIS_AVAILABLE:
+        options['PARSER_CLASS'] = 'redis._parsers.hiredis._HiredisParser'
+    return options
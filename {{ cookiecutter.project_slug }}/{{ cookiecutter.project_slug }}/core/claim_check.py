@@ -0,0 +1,335 @@
+"""
+Celery Claim Checks
+
+This module contains the claim-check mechanism for large task payloads. Task
+arguments (and stored results) that serialize to more than
+``CLAIM_CHECK_THRESHOLD`` bytes are put in a blob store and replaced with a
+small reference, so the broker only carries the reference. Workers resolve
+references when the task runs and delete the blobs once the task message is
+acknowledged.
+
+It is enabled for every task by making :class:`ClaimCheckTask` the base task
+class of the app in ``celery.py``.
+"""
+
+import logging
+import os
+import time
+import uuid
+from functools import cache
+from itertools import chain
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+import redis
+from celery import Task, states
+from celery.backends.base import DisabledBackend
+from celery.result import AsyncResult
+from celery.worker.request import Request
+from django.conf import settings
+from kombu.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Key marking a dict as a reference to a stored payload
+CLAIM_CHECK_KEY = '__claim_check__'
+
+# Bounds used to skip serializing payloads that are clearly small: JSON escapes a
+# character as up to 6 bytes, and no scalar or framing takes more than 32 bytes
+MAX_EXPANSION = 6
+ITEM_OVERHEAD = 32
+
+
+class RedisBlobStore:
+    """Blobs stored as Redis strings that expire after their TTL."""
+
+    def __init__(self, url: str, prefix: str = 'claim-check:'):
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def put(self, data: bytes, ttl: int) -> str:
+        key = uuid.uuid4().hex
+        self.client.set(self.prefix + key, data, ex=ttl)
+        return key
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(self.prefix + key)
+
+    def delete(self, keys: list[str]) -> None:
+        self.client.delete(*(self.prefix + key for key in keys))
+
+
+class FileSystemBlobStore:
+    """
+    Blobs stored as files in a directory shared by publishers and workers.
+
+    The expiry time is part of the file name, and expired files are swept at
+    most every ``sweep_interval`` seconds while new blobs are written.
+    """
+
+    def __init__(self, path: str | Path, sweep_interval: float = 3600.0):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.sweep_interval = sweep_interval
+        self._swept_at = 0.0
+
+    def put(self, data: bytes, ttl: int) -> str:
+        now = time.time()
+        if now - self._swept_at > self.sweep_interval:
+            self._swept_at = now
+            self.sweep(now)
+        key = f'{int(now + ttl)}-{uuid.uuid4().hex}'
+        partial = self.path / f'.{key}'
+        partial.write_bytes(data)
+        # Readers never see a partially written blob
+        os.replace(partial, self.path / key)
+        return key
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            return (self.path / key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def delete(self, keys: list[str]) -> None:
+        for key in keys:
+            (self.path / key).unlink(missing_ok=True)
+
+    def sweep(self, now: float | None = None) -> int:
+        """Delete expired blobs and return how many were deleted."""
+        now = now or time.time()
+        expired = [
+            entry.name
+            for entry in os.scandir(self.path)
+            if entry.name[:1].isdigit() and int(entry.name.split('-', 1)[0]) < now
+        ]
+        self.delete(expired)
+        return len(expired)
+
+
+@cache
+def get_blob_store(url: str) -> RedisBlobStore | FileSystemBlobStore:
+    """
+    Get the blob store for a ``redis://``, ``rediss://`` or ``file://`` URL.
+
+    Raises:
+        ValueError: If the URL scheme is not supported
+    """
+    parts = urlsplit(url)
+    if parts.scheme in ('redis', 'rediss', 'unix'):
+        return RedisBlobStore(url)
+    if parts.scheme == 'file':
+        return FileSystemBlobStore(parts.path)
+    raise ValueError(f'Unsupported claim check store {url!r}, expected redis:// or file://')
+
+
+def is_reference(value: Any) -> bool:
+    return isinstance(value, dict) and CLAIM_CHECK_KEY in value
+
+
+def check_in(value: Any, serializer: str, ttl: int, release: bool = True) -> dict[str, Any]:
+    """
+    Store ``value`` and return the reference that stands in for it.
+
+    Args:
+        value: Payload to store
+        serializer: Kombu serializer used for the blob
+        ttl: Seconds after which the blob expires if it was never released
+        release: Whether the task receiving the reference deletes the blob
+            once it is done with it (``False`` for results, which expire)
+
+    Returns:
+        Reference dict
+    """
+    content_type, content_encoding, data = dumps(value, serializer=serializer)
+    if isinstance(data, str):
+        data = data.encode(content_encoding)
+    key = get_blob_store(settings.CLAIM_CHECK_URL).put(data, ttl)
+    return {
+        CLAIM_CHECK_KEY: key,
+        'content_type': content_type,
+        'content_encoding': content_encoding,
+        'release': release,
+    }
+
+
+def resolve(value: Any) -> Any:
+    """
+    Return the payload a reference stands for, or ``value`` if it is none.
+
+    Raises:
+        LookupError: If the blob expired or was already released
+    """
+    if not is_reference(value):
+        return value
+    data = get_blob_store(settings.CLAIM_CHECK_URL).get(value[CLAIM_CHECK_KEY])
+    if data is None:
+        raise LookupError(f'Claim check {value[CLAIM_CHECK_KEY]} expired or was released')
+    return loads(
+        data, value['content_type'], value['content_encoding'], accept=[value['content_type']]
+    )
+
+
+def release(args: tuple | list | None, kwargs: dict[str, Any] | None) -> None:
+    """Delete the blobs of the releasable references among task arguments."""
+    keys = [
+        value[CLAIM_CHECK_KEY]
+        for value in (*(args or ()), *(kwargs or {}).values())
+        if is_reference(value) and value.get('release')
+    ]
+    if keys:
+        try:
+            get_blob_store(settings.CLAIM_CHECK_URL).delete(keys)
+        except Exception:
+            # The blobs still expire with CLAIM_CHECK_TTL
+            logger.warning('Could not release claim checks %s', keys, exc_info=True)
+
+
+def _encoded_size(value: Any, serializer: str) -> int:
+    if value is None or isinstance(value, (bool, int, float)):
+        return 0
+    return len(dumps(value, serializer=serializer)[2])
+
+
+def _size_bound(value: Any, limit: int) -> int:
+    """
+    Upper bound of the serialized size of ``value``, without serializing it.
+
+    Counting stops once the bound passes ``limit``, and types other than
+    strings, bytes, scalars, lists, tuples and dicts count as over it, so only
+    payloads that may be large are measured for real.
+    """
+    if value is None or isinstance(value, (bool, float)):
+        return ITEM_OVERHEAD
+    if isinstance(value, int):
+        return ITEM_OVERHEAD if value.bit_length() < 64 else limit + 1
+    if isinstance(value, (str, bytes, bytearray)):
+        return ITEM_OVERHEAD + MAX_EXPANSION * len(value)
+    if isinstance(value, dict):
+        items = chain.from_iterable(value.items())
+    elif isinstance(value, (list, tuple)):
+        items = value
+    else:
+        return limit + 1
+    total = ITEM_OVERHEAD
+    for item in items:
+        total += _size_bound(item, limit - total)
+        if total > limit:
+            break
+    return total
+
+
+def check_in_arguments(
+    args: tuple | list, kwargs: dict[str, Any], serializer: str, threshold: int, ttl: int
+) -> tuple[tuple, dict[str, Any]]:
+    """
+    Replace the largest arguments with references until the rest fit in ``threshold``.
+
+    Returns:
+        The new ``(args, kwargs)``, unchanged if they already fit
+    """
+    if _size_bound([*args, *kwargs.values()], threshold) <= threshold:
+        return tuple(args), kwargs
+
+    sizes = {('arg', index): _encoded_size(value, serializer) for index, value in enumerate(args)}
+    sizes.update(
+        {('kwarg', name): _encoded_size(value, serializer) for name, value in kwargs.items()}
+    )
+    total = sum(sizes.values())
+    if total <= threshold:
+        return tuple(args), kwargs
+
+    args, kwargs = list(args), dict(kwargs)
+    for (kind, position), size in sorted(sizes.items(), key=lambda item: -item[1]):
+        if total <= threshold:
+            break
+        container = args if kind == 'arg' else kwargs
+        container[position] = check_in(container[position], serializer, ttl)
+        total -= size
+    return tuple(args), kwargs
+
+
+class ClaimCheckRequest(Request):
+    """Worker request that releases the task's claim checks after acknowledging it."""
+
+    retried = False
+
+    def on_retry(self, exc_info):
+        # The retry is published with the same references
+        self.retried = True
+        super().on_retry(exc_info)
+
+    def acknowledge(self):
+        acknowledged = self.acknowledged
+        super().acknowledge()
+        # Early-acked tasks are acknowledged before they run, see ClaimCheckTask.after_return
+        if not acknowledged and self.task.acks_late and not self.retried:
+            release(self.args, self.kwargs)
+
+    def reject(self, requeue=False):
+        acknowledged = self.acknowledged
+        super().reject(requeue=requeue)
+        if not acknowledged and not requeue:
+            release(self.args, self.kwargs)
+
+
+class ClaimCheckTask(Task):
+    """
+    Task that moves large arguments and results out of the broker.
+
+    Set ``claim_check = False`` on a task to always send its payloads inline.
+    Tasks sent by name with ``send_task`` bypass the check.
+    """
+
+    Request = ClaimCheckRequest
+
+    #: Whether payloads larger than ``CLAIM_CHECK_THRESHOLD`` bytes are checked in
+    claim_check = True
+
+    def apply_async(self, args=None, kwargs=None, **options):
+        if self.claim_check and not self.app.conf.task_always_eager and (args or kwargs):
+            args, kwargs = check_in_arguments(
+                args or (),
+                kwargs or {},
+                options.get('serializer') or self.serializer,
+                settings.CLAIM_CHECK_THRESHOLD,
+                settings.CLAIM_CHECK_TTL,
+            )
+        return super().apply_async(args, kwargs, **options)
+
+    def __call__(self, *args, **kwargs):
+        # Resolved here, in the process running the task, not when the message arrives
+        args = [resolve(value) for value in args]
+        kwargs = {name: resolve(value) for name, value in kwargs.items()}
+        retval = super().__call__(*args, **kwargs)
+
+        request = self.request
+        if (
+            self.claim_check
+            and not request.called_directly
+            and not request.ignore_result
+            and not isinstance(self.backend, DisabledBackend)
+            and _size_bound(retval, settings.CLAIM_CHECK_THRESHOLD) > settings.CLAIM_CHECK_THRESHOLD
+            and _encoded_size(retval, self.backend.serializer) > settings.CLAIM_CHECK_THRESHOLD
+        ):
+            # Read back by AsyncResult.get(); expires with the result itself
+            expires = self.app.conf.result_expires
+            ttl = int(expires.total_seconds()) if expires else settings.CLAIM_CHECK_TTL
+            retval = check_in(retval, self.backend.serializer, ttl, release=False)
+        return retval
+
+    def after_return(self, status, retval, task_id, args, kwargs, einfo):
+        if not self.acks_late and status != states.RETRY:
+            release(args, kwargs)
+        super().after_return(status, retval, task_id, args, kwargs, einfo)
+
+    def AsyncResult(self, task_id, **kwargs):  # noqa: N802
+        return ClaimCheckResult(task_id, backend=self.backend, task_name=self.name, **kwargs)
+
+
+class ClaimCheckResult(AsyncResult):
+    """Result whose ``get()`` returns the stored payload instead of its reference."""
+
+    def get(self, *args, **kwargs):
+        return resolve(super().get(*args, **kwargs))
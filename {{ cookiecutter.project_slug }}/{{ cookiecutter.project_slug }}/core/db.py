@@ -0,0 +1,176 @@
+"""
+Database Helpers
+
+This module contains helpers for building the ``DATABASES`` setting, including
+sizing of Django's psycopg3 connection pool for web and Celery worker processes
+and the options required to run behind PgBouncer in transaction pooling mode.
+"""
+
+import os
+import sys
+from typing import Any
+
+from decouple import config
+
+from .worker_presets import get_worker_preset, optional_int
+
+# Celery pools that run several tasks concurrently inside one process
+THREADED_CELERY_POOLS = ('threads', 'gevent', 'eventlet')
+
+# Connections a pool opens at most unless DB_POOL_MAX_SIZE is set. Threaded Celery
+# workers run up to 16 threads per core, and every process gets its own pool, so a pool
+# that grew with the thread count would exhaust Postgres max_connections. Threads beyond
+# the cap wait for a free connection, for DB_POOL_TIMEOUT seconds at most.
+DEFAULT_POOL_MAX_SIZE = 10
+
+
+def is_celery_worker(argv: list[str] | None = None) -> bool:
+    """Return True when the current process was started as ``celery ... worker``."""
+    argv = sys.argv if argv is None else argv
+    return bool(argv) and os.path.basename(argv[0]) == 'celery' and 'worker' in argv
+
+
+def get_process_concurrency(argv: list[str] | None = None) -> int:
+    """
+    Get the number of threads that may hold a database connection at once.
+
+    Connection pools live in each process, so the pool only needs to cover the
+    threads of that process: gunicorn (or granian blocking) threads for the web
+    server, and the worker concurrency for Celery pools that run tasks in threads
+    or greenlets (see :func:`core.worker_presets.get_worker_preset`). Prefork
+    Celery children and sync gunicorn workers run one task or request at a time.
+
+    Args:
+        argv: Process arguments, defaults to ``sys.argv``
+
+    Returns:
+        Number of concurrent connection users in this process (at least 1)
+    """
+    if is_celery_worker(argv):
+        preset = get_worker_preset()
+        if preset['pool'] not in THREADED_CELERY_POOLS:
+            return 1
+        return preset['concurrency']
+
+    threads = config('GRANIAN_BLOCKING_THREADS', default=1, cast=int)
+    return max(config('GUNICORN_THREADS', default=threads, cast=int), 1)
+
+
+def get_pgbouncer_settings() -> dict[str, Any]:
+    """
+    Build the ``DATABASES`` keys needed behind PgBouncer in transaction mode.
+
+    Server-side cursors are disabled because the cursor would outlive the
+    transaction that owns the server connection. Prepared statements stay
+    disabled (``prepare_threshold=None``) unless ``DB_PREPARE_THRESHOLD`` is
+    set, which is only safe with PgBouncer >= 1.21 and ``max_prepared_statements``
+    greater than psycopg's ``prepared_max`` (100).
+
+    Returns:
+        Dict with ``DISABLE_SERVER_SIDE_CURSORS`` and ``OPTIONS`` keys
+    """
+    return {
+        'DISABLE_SERVER_SIDE_CURSORS': True,
+        'OPTIONS': {
+            'prepare_threshold': config('DB_PREPARE_THRESHOLD', default='', cast=optional_int),
+        },
+    }
+
+
+def get_connection_settings(
+    use_pool: bool, argv: list[str] | None = None, pgbouncer: bool = False
+) -> dict[str, Any]:
+    """
+    Build the connection management keys for a ``DATABASES`` entry.
+
+    With pooling enabled the psycopg3 pool is sized from the process concurrency,
+    up to ``DEFAULT_POOL_MAX_SIZE`` connections, unless ``DB_POOL_MIN_SIZE``/
+    ``DB_POOL_MAX_SIZE`` are set. Without pooling,
+    persistent connections (``CONN_MAX_AGE``) are used instead so requests do not
+    open a new connection every time.
+
+    Args:
+        use_pool: Whether to enable the psycopg3 connection pool
+        argv: Process arguments, defaults to ``sys.argv``
+        pgbouncer: Whether connections go through PgBouncer in transaction mode
+
+    Returns:
+        Dict with ``CONN_MAX_AGE``, ``CONN_HEALTH_CHECKS`` and ``OPTIONS`` keys
+    """
+    settings = _get_pool_settings(use_pool, argv)
+    if pgbouncer:
+        pgbouncer_settings = get_pgbouncer_settings()
+        settings['OPTIONS'].update(pgbouncer_settings.pop('OPTIONS'))
+        settings.update(pgbouncer_settings)
+    return settings
+
+
+def get_replica_databases(primary: dict[str, Any], hosts: list[str]) -> dict[str, dict[str, Any]]:
+    """
+    Build ``DATABASES`` entries for streaming read replicas of the primary.
+
+    Each replica reuses the primary's credentials and connection settings with
+    its own host and port. Connecting gives up after ``DB_REPLICA_CONNECT_TIMEOUT``
+    seconds so an unreachable replica falls back to the primary quickly, and the
+    test runner mirrors replicas to the primary test database.
+
+    Args:
+        primary: The ``default`` database entry
+        hosts: Replica addresses as ``host`` or ``host:port``
+
+    Returns:
+        Dict mapping aliases ``replica1``, ``replica2``, ... to database entries
+    """
+    connect_timeout = config('DB_REPLICA_CONNECT_TIMEOUT', default=2, cast=int)
+    replicas = {}
+    for index, address in enumerate(filter(None, hosts), start=1):
+        host, _, port = address.strip().partition(':')
+        replica = {
+            **primary,
+            'HOST': host,
+            'PORT': port or primary.get('PORT', '5432'),
+            'OPTIONS': {**primary.get('OPTIONS', {}), 'connect_timeout': connect_timeout},
+            'TEST': {'MIRROR': 'default'},
+        }
+        if 'pool' in replica['OPTIONS']:
+            replica['OPTIONS']['pool'] = {
+                **replica['OPTIONS']['pool'],
+                'timeout': float(connect_timeout),
+            }
+        replicas[f'replica{index}'] = replica
+    return replicas
+
+
+def _get_pool_settings(use_pool: bool, argv: list[str] | None) -> dict[str, Any]:
+    health_checks = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+
+    if not use_pool:
+        return {
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': health_checks,
+            'OPTIONS': {},
+        }
+
+    concurrency = get_process_concurrency(argv)
+    max_size = config(
+        'DB_POOL_MAX_SIZE', default=min(concurrency * 2, DEFAULT_POOL_MAX_SIZE), cast=int
+    )
+    min_size = config('DB_POOL_MIN_SIZE', default=min(concurrency, max_size), cast=int)
+
+    return {
+        # Django refuses persistent connections when pooling is enabled
+        'CONN_MAX_AGE': 0,
+        # With a pool, Django passes this on as the pool's check
+        # (ConnectionPool.check_connection), which tests each connection before it is
+        # handed out. A 'check' key in the pool options would clash with it.
+        'CONN_HEALTH_CHECKS': health_checks,
+        'OPTIONS': {
+            'pool': {
+                'min_size': min_size,
+                'max_size': max(max_size, min_size),
+                'timeout': config('DB_POOL_TIMEOUT', default=10.0, cast=float),
+                'max_idle': config('DB_POOL_MAX_IDLE', default=600.0, cast=float),
+                'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=3600.0, cast=float),
+            },
+        },
+    }
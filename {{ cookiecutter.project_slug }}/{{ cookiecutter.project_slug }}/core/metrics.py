@@ -0,0 +1,279 @@
+"""
+Prometheus Metrics
+
+This module contains the metrics served at ``/metrics``: request latency per
+Ninja operation, database query durations, cache hits and misses, Celery task
+publishes and password hashing. Under gunicorn every worker writes its values
+to files in ``PROMETHEUS_MULTIPROC_DIR`` (set in ``gunicorn.conf.py``) and the
+endpoint aggregates all of them, so a scrape sees the whole server rather than
+the worker that happened to answer.
+"""
+
+import functools
+import hmac
+import inspect
+import os
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hashers
+from django.core.cache import caches
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+REQUEST_COUNT = Counter(
+    'http_requests_total',
+    'HTTP requests by operation, method and status code',
+    ['operation', 'method', 'status'],
+)
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'HTTP request latency by operation',
+    ['operation', 'method'],
+)
+DB_QUERY_LATENCY = Histogram(
+    'db_query_duration_seconds',
+    'Database query latency by connection alias',
+    ['alias'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total',
+    'Cache lookups by cache alias and result (hit or miss)',
+    ['cache', 'result'],
+)
+TASKS_PUBLISHED = Counter(
+    'celery_tasks_published_total',
+    'Celery tasks sent to the broker by task name',
+    ['task'],
+)
+PASSWORD_HASH_LATENCY = Histogram(
+    'password_hash_duration_seconds',
+    'Password hashing time by operation (encode or verify)',
+    ['operation'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+PASSWORD_HASHES_IN_PROGRESS = Gauge(
+    'password_hashes_in_progress',
+    'Password hashes being computed right now across all workers',
+    multiprocess_mode='livesum',
+)
+
+# Attribute marking patched methods, and the cache alias on backend instances
+PATCHED = 'prometheus_metrics'
+CACHE_ALIAS = 'metrics_alias'
+
+_MISSING = object()
+
+# Nested lookups (TwoTierCache.get -> L2 get, get_many -> get) count once
+_in_cache_lookup: ContextVar[bool] = ContextVar('metrics_cache_lookup', default=False)
+_in_password_hash: ContextVar[bool] = ContextVar('metrics_password_hash', default=False)
+
+
+@functools.cache
+def _get_path_view(view: Callable):
+    """Return the Ninja ``PathView`` behind a resolved view function, or None."""
+    try:
+        path_view = inspect.getclosurevars(view).nonlocals.get('self')
+    except TypeError:
+        return None
+    return path_view if hasattr(path_view, 'operations') else None
+
+
+def get_operation_id(request) -> str:
+    """
+    Get a low-cardinality label for the view that handled ``request``.
+
+    Ninja operations use their OpenAPI operation id; other views their URL name
+    or route. Unresolved requests (404s) share one label, so scanners cannot
+    create a time series per URL.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    path_view = _get_path_view(match.func)
+    if path_view is not None:
+        for operation in path_view.operations:
+            if request.method in operation.methods:
+                return operation.operation_id or operation.api.get_openapi_operation_id(operation)
+    return match.view_name or match.route
+
+
+def observe_request(request, response, duration: float) -> None:
+    operation = get_operation_id(request)
+    REQUEST_LATENCY.labels(operation, request.method).observe(duration)
+    REQUEST_COUNT.labels(operation, request.method, response.status_code).inc()
+
+
+def _time_query(alias: str, execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        DB_QUERY_LATENCY.labels(alias).observe(time.perf_counter() - start)
+
+
+def _add_query_wrapper(connection) -> None:
+    wrapper = getattr(connection, PATCHED, None)
+    if wrapper is None:
+        wrapper = functools.partial(_time_query, connection.alias)
+        setattr(connection, PATCHED, wrapper)
+    if wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(wrapper)
+
+
+def _on_connection_created(sender, connection, **kwargs) -> None:
+    _add_query_wrapper(connection)
+
+
+def _count_lookup(backend, hits: int, misses: int) -> None:
+    alias = getattr(backend, CACHE_ALIAS, 'unknown')
+    if hits:
+        CACHE_REQUESTS.labels(alias, 'hit').inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(alias, 'miss').inc(misses)
+
+
+def _counted_get(func: Callable) -> Callable:
+    @functools.wraps(func)
+    def get(self, key, default=None, *args, **kwargs):
+        if _in_cache_lookup.get():
+            return func(self, key, default, *args, **kwargs)
+        token = _in_cache_lookup.set(True)
+        try:
+            value = func(self, key, _MISSING, *args, **kwargs)
+        finally:
+            _in_cache_lookup.reset(token)
+        hit = value is not _MISSING
+        _count_lookup(self, int(hit), int(not hit))
+        return value if hit else default
+
+    setattr(get, PATCHED, True)
+    return get
+
+
+def _counted_get_many(func: Callable) -> Callable:
+    @functools.wraps(func)
+    def get_many(self, keys, *args, **kwargs):
+        if _in_cache_lookup.get():
+            return func(self, keys, *args, **kwargs)
+        keys = list(keys)
+        token = _in_cache_lookup.set(True)
+        try:
+            values = func(self, keys, *args, **kwargs)
+        finally:
+            _in_cache_lookup.reset(token)
+        _count_lookup(self, len(values), len(keys) - len(values))
+        return values
+
+    setattr(get_many, PATCHED, True)
+    return get_many
+
+
+def _timed_hash(operation: str, func: Callable) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # verify() calls encode() for most hashers
+        if _in_password_hash.get():
+            return func(*args, **kwargs)
+        token = _in_password_hash.set(True)
+        PASSWORD_HASHES_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            PASSWORD_HASH_LATENCY.labels(operation).observe(time.perf_counter() - start)
+            PASSWORD_HASHES_IN_PROGRESS.dec()
+            _in_password_hash.reset(token)
+
+    setattr(wrapper, PATCHED, True)
+    return wrapper
+
+
+def _patch(cls: type, name: str, decorate: Callable[[Callable], Callable]) -> None:
+    method = getattr(cls, name, None)
+    if method is not None and not getattr(method, PATCHED, False):
+        setattr(cls, name, decorate(method))
+
+
+def _count_task_published(sender=None, **kwargs) -> None:
+    TASKS_PUBLISHED.labels(sender or 'unknown').inc()
+
+
+def _tag_cache_connections() -> None:
+    """Label every cache backend instance with its alias as it is created."""
+    create_connection = caches.create_connection
+    if getattr(create_connection, PATCHED, False):
+        return
+
+    @functools.wraps(create_connection)
+    def create_tagged_connection(alias):
+        backend = create_connection(alias)
+        setattr(backend, CACHE_ALIAS, alias)
+        return backend
+
+    setattr(create_tagged_connection, PATCHED, True)
+    caches.create_connection = create_tagged_connection
+
+
+def install_metrics() -> None:
+    """
+    Instrument database connections, cache backends, password hashers and
+    Celery publishing in this process.
+
+    Safe to call repeatedly.
+    """
+    connection_created.connect(_on_connection_created, dispatch_uid='prometheus_metrics')
+    for connection in connections.all(initialized_only=True):
+        _add_query_wrapper(connection)
+
+    _tag_cache_connections()
+    for alias in caches:
+        backend = caches[alias]
+        setattr(backend, CACHE_ALIAS, alias)
+        _patch(type(backend), 'get', _counted_get)
+        _patch(type(backend), 'get_many', _counted_get_many)
+
+    for hasher in get_hashers():
+        _patch(type(hasher), 'encode', functools.partial(_timed_hash, 'encode'))
+        _patch(type(hasher), 'verify', functools.partial(_timed_hash, 'verify'))
+
+    try:
+        from celery.signals import after_task_publish
+    except ImportError:
+        return
+    after_task_publish.connect(_count_task_published, dispatch_uid='prometheus_metrics')
+
+
+def get_registry() -> CollectorRegistry:
+    """Return the registry to scrape: all workers' files in multiprocess mode."""
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_view(request):
+    """Serve the metrics in the Prometheus text format."""
+    if not getattr(settings, 'METRICS_ENABLED', False):
+        raise Http404()
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        authorization = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode()):
+            return HttpResponseForbidden()
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,217 @@
+"""
+Core Middleware
+
+This module contains project-wide middleware, including API-aware versions of
+Django's session, CSRF, authentication, messages and clickjacking middleware.
+They behave exactly like the originals except for bearer-token API requests
+(paths under ``API_FAST_PATH_PREFIXES``), which skip them entirely while the
+admin and other browser pages keep the full stack.
+"""
+
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware as BaseAuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.middleware import MessageMiddleware as BaseMessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware as BaseSessionMiddleware
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.middleware.clickjacking import XFrameOptionsMiddleware as BaseXFrameOptionsMiddleware
+from django.middleware.csrf import CsrfViewMiddleware as BaseCsrfViewMiddleware
+
+from .metrics import install_metrics, observe_request
+from .queries import QueryInspector, log_report
+from .routers import has_written, pin_to_primary, reset_primary_pin
+from .timing import install_instrumentation, log_timings, start_timer, stop_timer
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Clients that do not keep cookies (e.g. bearer token API clients) can send this
+# header on reads that must see their own earlier writes
+PRIMARY_PIN_HEADER = 'X-DB-Primary'
+
+
+class PrimaryPinningMiddleware:
+    """
+    Give each request read-your-writes consistency when read replicas are used.
+
+    Unsafe requests read from the primary for their whole duration. After a
+    request writes, a short-lived cookie pins the client's following requests to
+    the primary until the replicas have had time to catch up.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'DATABASE_REPLICAS', None):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.cookie_name = getattr(settings, 'DB_PRIMARY_PIN_COOKIE', 'db_primary_pin')
+        self.pin_seconds = getattr(settings, 'DB_PRIMARY_PIN_SECONDS', 5)
+
+    def __call__(self, request):
+        reset_primary_pin()
+        if (
+            request.method not in SAFE_METHODS
+            or self.cookie_name in request.COOKIES
+            or request.headers.get(PRIMARY_PIN_HEADER)
+        ):
+            pin_to_primary()
+
+        try:
+            response = self.get_response(request)
+            if has_written():
+                response.set_cookie(
+                    self.cookie_name,
+                    '1',
+                    max_age=self.pin_seconds,
+                    secure=request.is_secure(),
+                    httponly=True,
+                    samesite='Lax',
+                )
+        finally:
+            reset_primary_pin()
+        return response
+
+
+class ServerTimingMiddleware:
+    """
+    Report where the time of a sampled request went.
+
+    A ``SERVER_TIMING_SAMPLE_RATE`` share of requests is timed: database queries
+    (through ``connection.execute_wrapper``), cache calls, outbound ``requests``
+    calls and the remaining Python time. The breakdown is returned in a
+    ``Server-Timing`` header, which browser developer tools display, and logged
+    as a ``key=value`` line with the call counts. With a rate of 0 the
+    middleware and the instrumentation are not installed at all.
+    """
+
+    def __init__(self, get_response):
+        self.sample_rate = getattr(settings, 'SERVER_TIMING_SAMPLE_RATE', 0.0)
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        install_instrumentation()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        timer, token = start_timer()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timer.execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            stop_timer(token)
+
+        timings = timer.summary()
+        response.headers['Server-Timing'] = timer.server_timing(timings)
+        log_timings(request, response, timer, timings)
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Record request latency per operation for the ``/metrics`` endpoint.
+
+    Also installs the database, cache, password hashing and Celery publish
+    instrumentation from ``core.metrics`` once per process. Disabled with
+    ``METRICS_ENABLED=False``.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        install_metrics()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        observe_request(request, response, time.perf_counter() - start)
+        return response
+
+
+class QueryInspectorMiddleware:
+    """
+    Log repeated query shapes (likely N+1 loops) and slow queries per request.
+
+    Development tooling, enabled with ``QUERY_INSPECTOR_ENABLED`` (on in
+    ``settings/local.py``). Runs first in ``MIDDLEWARE`` so the ``EXPLAIN`` of
+    slow queries happens after every other middleware has finished timing.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSPECTOR_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        inspector = QueryInspector()
+        with inspector.capture():
+            response = self.get_response(request)
+        log_report(inspector, f'{request.method} {request.path}')
+        return response
+
+
+def is_api_request(request) -> bool:
+    """Return True if ``request`` may skip the browser-only middleware."""
+    try:
+        return request._is_api_request
+    except AttributeError:
+        request._is_api_request = getattr(
+            settings, 'API_MIDDLEWARE_FAST_PATH', False
+        ) and request.path_info.startswith(tuple(settings.API_FAST_PATH_PREFIXES))
+        return request._is_api_request
+
+
+class ApiBypassMixin:
+    """Turn a ``MiddlewareMixin`` middleware into a no-op for API requests."""
+
+    def process_request(self, request):
+        if is_api_request(request):
+            return None
+        process_request = getattr(super(), 'process_request', None)
+        return process_request(request) if process_request else None
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if is_api_request(request):
+            return None
+        process_view = getattr(super(), 'process_view', None)
+        if process_view is None:
+            return None
+        return process_view(request, callback, callback_args, callback_kwargs)
+
+    def process_response(self, request, response):
+        if is_api_request(request):
+            return response
+        process_response = getattr(super(), 'process_response', None)
+        return process_response(request, response) if process_response else response
+
+
+class SessionMiddleware(ApiBypassMixin, BaseSessionMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(ApiBypassMixin, BaseCsrfViewMiddleware):
+    pass
+
+
+class AuthenticationMiddleware(ApiBypassMixin, BaseAuthenticationMiddleware):
+    def process_request(self, request):
+        if is_api_request(request):
+            # API views authenticate with JWT (request.auth); keep request.user defined
+            request.user = AnonymousUser()
+            return None
+        return super().process_request(request)
+
+
+class MessageMiddleware(ApiBypassMixin, BaseMessageMiddleware):
+    pass
+
+
+class XFrameOptionsMiddleware(ApiBypassMixin, BaseXFrameOptionsMiddleware):
+    pass
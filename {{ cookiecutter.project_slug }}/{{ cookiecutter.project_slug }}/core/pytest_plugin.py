@@ -0,0 +1,72 @@
+"""
+Pytest Plugin
+
+This module contains the query checks for the test suite, loaded through
+``addopts`` in ``pyproject.toml``:
+
+*   ``@pytest.mark.max_queries(n)`` fails a test that runs more than ``n``
+    queries, with the queries grouped by shape in the failure message. On a
+    ``TestCase`` method the count includes ``setUp``.
+*   ``--query-report`` inspects every test and lists the ones with repeated
+    query shapes (likely N+1 loops) or slow queries at the end of the run.
+*   ``--query-report-strict`` also fails those tests, for CI.
+"""
+
+import pytest
+
+QUERY_REPORT = pytest.StashKey[list]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('queries')
+    group.addoption(
+        '--query-report',
+        action='store_true',
+        help='report tests with repeated query shapes (N+1) or slow queries',
+    )
+    group.addoption(
+        '--query-report-strict',
+        action='store_true',
+        help='like --query-report, and fail those tests',
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers', 'max_queries(limit, using=None): fail if the test runs more than limit queries'
+    )
+    config.stash[QUERY_REPORT] = []
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker('max_queries')
+    strict = item.config.getoption('query_report_strict')
+    report = strict or item.config.getoption('query_report')
+    if marker is None and not report:
+        return (yield)
+
+    # Django is set up by pytest-django by the time tests run
+    from .queries import QueryInspector, check_max_queries
+
+    inspector = QueryInspector(using=marker.kwargs.get('using') if marker else None)
+    with inspector.capture():
+        result = yield
+
+    if report and inspector.has_issues():
+        item.config.stash[QUERY_REPORT].append((item.nodeid, inspector.report()))
+        if strict:
+            raise AssertionError(f'Query issues found\n{inspector.report()}')
+    if marker is not None:
+        check_max_queries(inspector, marker.args[0] if marker.args else marker.kwargs['limit'])
+    return result
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    reports = config.stash.get(QUERY_REPORT, [])
+    if not reports:
+        return
+    terminalreporter.section('query report')
+    for nodeid, report in reports:
+        terminalreporter.write_line(nodeid)
+        terminalreporter.write_line(report)
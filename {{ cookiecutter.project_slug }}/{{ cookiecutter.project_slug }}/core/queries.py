@@ -0,0 +1,236 @@
+"""
+Query Inspection
+
+This module contains the development and test tooling for spotting query
+regressions. ``QueryInspector`` records the SQL run inside a block (a request
+or a test) and groups it by shape, the SQL with literals and parameters
+replaced by ``?``. A shape that repeats within one block is usually an N+1 loop.
+Queries slower than ``QUERY_INSPECTOR_SLOW_MS`` are reported with their
+``EXPLAIN (ANALYZE, BUFFERS)`` plan. ``QueryInspectorMiddleware`` logs the
+report per request in development, and ``max_queries`` (or the
+``max_queries`` pytest marker) bounds the query count of a test.
+"""
+
+import logging
+import re
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# The innermost frame from this package is reported as the call site. Frames in
+# core/ are skipped: its execute wrappers (metrics, timing) sit on every query.
+PACKAGE_DIR = str(Path(__file__).resolve().parent.parent)
+CORE_DIR = str(Path(__file__).resolve().parent)
+TESTS_DIR = str(Path(__file__).resolve().parent / 'tests')
+
+# Transaction bookkeeping (e.g. the savepoint around each TestCase test) is not counted
+IGNORED_STATEMENTS = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT', 'PRAGMA')
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s")
+_IN_LISTS = re.compile(r'\bIN \((?:\?, )*\?\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def query_shape(sql: str) -> str:
+    """
+    Return ``sql`` with literals and placeholders replaced by ``?``.
+
+    ``IN`` lists of any length collapse to ``IN (...)``, so a loop over
+    different ids and batches of different sizes each map to one shape.
+    """
+    shape = _LITERALS.sub('?', _WHITESPACE.sub(' ', sql).strip())
+    return _IN_LISTS.sub('IN (...)', shape)
+
+
+def _call_site() -> str:
+    """Return ``path:line in function`` of the innermost project frame."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(PACKAGE_DIR) and (
+            not filename.startswith(CORE_DIR) or filename.startswith(TESTS_DIR)
+        ):
+            path = filename[len(PACKAGE_DIR) + 1 :]
+            return f'{path}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return 'unknown'
+
+
+class Query:
+    """One executed statement."""
+
+    __slots__ = ('alias', 'sql', 'params', 'many', 'duration', 'location')
+
+    def __init__(self, alias, sql, params, many, duration, location):
+        self.alias = alias
+        self.sql = sql
+        self.params = params
+        self.many = many
+        self.duration = duration
+        self.location = location
+
+
+class QueryInspector:
+    """
+    Record the queries run while :meth:`capture` is active.
+
+    Args:
+        slow_ms: Duration from which a query is slow, defaults to
+            ``QUERY_INSPECTOR_SLOW_MS``
+        repeat_threshold: Executions of one shape that count as an N+1 pattern,
+            defaults to ``QUERY_INSPECTOR_REPEAT_THRESHOLD``
+        using: Database aliases to record, defaults to all
+    """
+
+    def __init__(
+        self,
+        slow_ms: float | None = None,
+        repeat_threshold: int | None = None,
+        using: list[str] | None = None,
+    ):
+        if slow_ms is None:
+            slow_ms = getattr(settings, 'QUERY_INSPECTOR_SLOW_MS', 100.0)
+        if repeat_threshold is None:
+            repeat_threshold = getattr(settings, 'QUERY_INSPECTOR_REPEAT_THRESHOLD', 5)
+        self.slow_ms = slow_ms
+        self.repeat_threshold = repeat_threshold
+        self.using = using
+        self.queries: list[Query] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database ``execute_wrapper`` that records every query."""
+        if sql.startswith(IGNORED_STATEMENTS):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                Query(
+                    context['connection'].alias,
+                    sql,
+                    params,
+                    many,
+                    time.perf_counter() - start,
+                    _call_site(),
+                )
+            )
+
+    @contextmanager
+    def capture(self) -> Iterator['QueryInspector']:
+        aliases = self.using or list(connections)
+        with ExitStack() as stack:
+            for alias in aliases:
+                stack.enter_context(connections[alias].execute_wrapper(self))
+            yield self
+
+    def groups(self) -> list[tuple[str, list[Query]]]:
+        """Return ``(shape, queries)`` pairs, the most executed shape first."""
+        groups: dict[str, list[Query]] = {}
+        for query in self.queries:
+            groups.setdefault(query_shape(query.sql), []).append(query)
+        return sorted(groups.items(), key=lambda item: len(item[1]), reverse=True)
+
+    def repeated(self) -> list[tuple[str, list[Query]]]:
+        """Return the shapes executed at least ``repeat_threshold`` times."""
+        return [group for group in self.groups() if len(group[1]) >= self.repeat_threshold]
+
+    def slow(self) -> list[Query]:
+        return [query for query in self.queries if query.duration * 1000 >= self.slow_ms]
+
+    def has_issues(self) -> bool:
+        return bool(self.repeated() or self.slow())
+
+    def report(self, explain: bool = False, all_shapes: bool = False) -> str:
+        """
+        Format the recorded queries.
+
+        Args:
+            explain: Add the plan of each slow query (see :func:`explain_query`)
+            all_shapes: List every shape rather than only repeated ones
+
+        Returns:
+            A multi-line report
+        """
+        total_ms = sum(query.duration for query in self.queries) * 1000
+        groups = self.groups()
+        lines = [f'{len(self.queries)} queries in {len(groups)} shapes, {total_ms:.1f} ms']
+        for shape, queries in groups if all_shapes else self.repeated():
+            count = len(queries)
+            flag = ' (repeated, possible N+1)' if count >= self.repeat_threshold else ''
+            duration = sum(query.duration for query in queries) * 1000
+            lines.append(f'  {count} x {duration:.1f} ms at {queries[0].location}{flag}')
+            lines.append(f'    {shape}')
+        for query in self.slow():
+            lines.append(f'  slow query {query.duration * 1000:.1f} ms at {query.location}')
+            lines.append(f'    {query_shape(query.sql)}')
+            plan = explain_query(query) if explain else ''
+            lines.extend(f'      {line}' for line in plan.splitlines())
+        return '\n'.join(lines)
+
+
+def explain_query(query: Query) -> str:
+    """
+    Return the plan of a recorded ``SELECT`` query.
+
+    PostgreSQL runs ``EXPLAIN (ANALYZE, BUFFERS)``, which executes the query
+    again, so writes are never explained. SQLite returns its query plan. Other
+    databases and failed plans return a short note instead.
+    """
+    if query.many or not query.sql.lstrip().upper().startswith('SELECT'):
+        return ''
+    connection = connections[query.alias]
+    if connection.vendor == 'postgresql':
+        prefix = 'EXPLAIN (ANALYZE, BUFFERS) '
+    elif connection.vendor == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    else:
+        return f'EXPLAIN is not supported for {connection.vendor}'
+    try:
+        # Savepoint: a failed EXPLAIN must not break the caller's transaction
+        with transaction.atomic(using=query.alias), connection.cursor() as cursor:
+            cursor.execute(prefix + query.sql, query.params)
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+    except DatabaseError as error:
+        return f'EXPLAIN failed: {error}'
+
+
+def log_report(inspector: QueryInspector, label: str) -> None:
+    """Log a warning with the report of ``inspector`` if it found issues."""
+    if inspector.has_issues():
+        explain = getattr(settings, 'QUERY_INSPECTOR_EXPLAIN', True)
+        logger.warning('%s: %s', label, inspector.report(explain=explain))
+
+
+@contextmanager
+def max_queries(limit: int, using: list[str] | None = None) -> Iterator[QueryInspector]:
+    """
+    Fail if the block runs more than ``limit`` queries.
+
+    Unlike ``assertNumQueries``, the limit is an upper bound and the failure
+    message groups the queries by shape with their call sites.
+
+    Example:
+        with max_queries(3):
+            self.client.get('/api/accounts/users/me')
+    """
+    inspector = QueryInspector(using=using)
+    with inspector.capture():
+        yield inspector
+    check_max_queries(inspector, limit)
+
+
+def check_max_queries(inspector: QueryInspector, limit: int) -> None:
+    """Raise ``AssertionError`` with the report if ``inspector`` saw over ``limit`` queries."""
+    if len(inspector.queries) > limit:
+        raise AssertionError(
+            f'{len(inspector.queries)} queries executed, expected at most {limit}\n'
+            + inspector.report(all_shapes=True)
+        )
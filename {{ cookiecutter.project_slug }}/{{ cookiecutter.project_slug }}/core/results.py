@@ -0,0 +1,78 @@
+"""
+Task Result Cleanup
+
+This module contains the beat task that prunes expired rows from the
+``django_celery_results`` tables. Celery's own ``celery.backend_cleanup`` deletes
+every expired row in one transaction, which locks and bloats a large table for
+the whole run; this task deletes them oldest first in short chunks instead.
+"""
+
+import logging
+import time
+from datetime import timedelta
+
+from celery import current_app, shared_task
+from celery.exceptions import SoftTimeLimitExceeded
+from celery.utils.time import maybe_timedelta
+from django.conf import settings
+from django.db.models import Model
+from django.utils import timezone
+from django_celery_results.models import GroupResult, TaskResult
+
+logger = logging.getLogger(__name__)
+
+
+def delete_expired_results(
+    expires: timedelta | int,
+    chunk_size: int = 1000,
+    pause: float = 0.0,
+    models: tuple[type[Model], ...] = (TaskResult, GroupResult),
+) -> int:
+    """
+    Delete results that finished more than ``expires`` ago in chunks.
+
+    Every chunk is its own short transaction on the ``date_done`` index, so
+    concurrent result writes are never blocked for long, and a run that is
+    interrupted keeps what it already deleted.
+
+    Args:
+        expires: Age after which a result expires (``timedelta`` or seconds)
+        chunk_size: Rows deleted per statement
+        pause: Seconds to sleep between chunks, to spread the load
+        models: Result models to prune
+
+    Returns:
+        Number of deleted rows
+    """
+    cutoff = timezone.now() - maybe_timedelta(expires)
+    deleted = 0
+    for model in models:
+        expired = model._default_manager.filter(date_done__lt=cutoff).order_by('date_done')
+        while True:
+            ids = list(expired.values_list('pk', flat=True)[:chunk_size])
+            if not ids:
+                break
+            count, _ = model._default_manager.filter(pk__in=ids).delete()
+            deleted += count
+            if len(ids) < chunk_size:
+                break
+            if pause:
+                time.sleep(pause)
+    return deleted
+
+
+@shared_task(ignore_result=True)
+def cleanup_task_results() -> int:
+    """Prune results older than ``CELERY_RESULT_EXPIRES`` (replaces ``celery.backend_cleanup``)."""
+    try:
+        deleted = delete_expired_results(
+            current_app.conf.result_expires,
+            chunk_size=settings.TASK_RESULT_CLEANUP_CHUNK_SIZE,
+            pause=settings.TASK_RESULT_CLEANUP_PAUSE,
+        )
+    except SoftTimeLimitExceeded:
+        # The next run continues where this one stopped
+        logger.warning('Task result cleanup hit its time limit, resuming on the next run')
+        return 0
+    logger.info('Deleted %d expired task results', deleted)
+    return deleted
@@ -0,0 +1,134 @@
+"""
+Database Routers
+
+This module contains the primary/replica router. Reads go to a healthy read
+replica from ``settings.DATABASE_REPLICAS``; writes, reads inside transactions
+and reads after a write in the same request or task go to the primary.
+"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+# Seconds the replica is behind the primary. Zero when fully replayed or when
+# the server is not a standby at all.
+REPLICA_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+_pinned_to_primary: ContextVar[bool] = ContextVar('db_pinned_to_primary', default=False)
+_wrote_to_primary: ContextVar[bool] = ContextVar('db_wrote_to_primary', default=False)
+
+
+def pin_to_primary() -> None:
+    """Send every following read in the current request or task to the primary."""
+    _pinned_to_primary.set(True)
+
+
+def is_pinned_to_primary() -> bool:
+    return _pinned_to_primary.get()
+
+
+def has_written() -> bool:
+    """Return True if the current request or task has written to the primary."""
+    return _wrote_to_primary.get()
+
+
+def reset_primary_pin() -> None:
+    """Forget pinning state, called at the start and end of each request or task."""
+    _pinned_to_primary.set(False)
+    _wrote_to_primary.set(False)
+
+
+@contextmanager
+def use_primary():
+    """Temporarily route reads to the primary, e.g. for read-modify-write code."""
+    token = _pinned_to_primary.set(True)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+class ReplicaLagMonitor:
+    """
+    Track replication lag per replica, re-checking at most every ``interval``.
+
+    A replica that is unreachable or more than ``max_lag`` seconds behind is
+    considered unhealthy until the next check.
+    """
+
+    def __init__(self, max_lag: float, interval: float):
+        self.max_lag = max_lag
+        self.interval = interval
+        self._status: dict[str, tuple[float, bool]] = {}
+        self._lock = threading.Lock()
+
+    def is_healthy(self, alias: str) -> bool:
+        now = time.monotonic()
+        checked_at, healthy = self._status.get(alias, (None, True))
+        if checked_at is not None and now - checked_at < self.interval:
+            return healthy
+
+        with self._lock:
+            # Another thread may have refreshed the status while we waited
+            checked_at, healthy = self._status.get(alias, (None, True))
+            if checked_at is None or now - checked_at >= self.interval:
+                healthy = self.get_lag(alias) <= self.max_lag
+                self._status[alias] = (time.monotonic(), healthy)
+        return healthy
+
+    def get_lag(self, alias: str) -> float:
+        """Return the replica lag in seconds, or infinity if it cannot be measured."""
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(REPLICA_LAG_QUERY)
+                return float(cursor.fetchone()[0])
+        except DatabaseError:
+            connections[alias].close()
+            return float('inf')
+
+
+class PrimaryReplicaRouter:
+    """Route reads to read replicas and everything else to the primary."""
+
+    def __init__(self):
+        self.replicas = list(getattr(settings, 'DATABASE_REPLICAS', []))
+        self.lag_monitor = ReplicaLagMonitor(
+            max_lag=getattr(settings, 'DATABASE_REPLICA_MAX_LAG', 5.0),
+            interval=getattr(settings, 'DATABASE_REPLICA_LAG_CHECK_INTERVAL', 5.0),
+        )
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas or is_pinned_to_primary():
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        healthy = [alias for alias in self.replicas if self.lag_monitor.is_healthy(alias)]
+        return random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        _pinned_to_primary.set(True)
+        _wrote_to_primary.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *self.replicas}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in self.replicas:
+            return False
+        return None
@@ -0,0 +1,104 @@
+"""
+Trace Sampling
+
+This module contains an adaptive trace sampler for Sentry's ``traces_sampler``
+option. It picks a sample rate per route (URL path or Celery task name), keeps
+the decision of an upstream service that already sampled the trace, and scales
+rates down under load so each process sends at most a fixed number of traces
+per second however much traffic it serves.
+"""
+
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+
+def get_sampling_target(sampling_context: dict[str, Any]) -> str:
+    """
+    Get the URL path or Celery task name a sampling decision is made for.
+
+    The transaction name is not usable for requests because it is only set to
+    the matched route after sampling, so the path is read from the request.
+    """
+    environ = sampling_context.get('wsgi_environ')
+    if environ:
+        return environ.get('PATH_INFO', '')
+    scope = sampling_context.get('asgi_scope')
+    if scope:
+        return scope.get('path', '')
+    job = sampling_context.get('celery_job')
+    if job:
+        return job.get('task', '')
+    return (sampling_context.get('transaction_context') or {}).get('name', '')
+
+
+class TracesSampler:
+    """
+    Sentry ``traces_sampler`` with per-route rates and a per-process budget.
+
+    The budget tracks the traces per second the route rates would produce (the
+    sum of the rates of recent requests) and scales every rate down by the same
+    factor when that exceeds ``max_per_second``. The returned rate is the one
+    actually applied, so Sentry's extrapolated throughput stays correct.
+
+    Error events are not affected: they are sampled by ``sample_rate``, not by
+    the trace sample rate, so every error is still reported.
+    """
+
+    def __init__(
+        self,
+        default_rate: float = 0.1,
+        route_rates: Iterable[tuple[str, float]] = (),
+        max_per_second: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            default_rate: Rate for targets that match no route
+            route_rates: ``(prefix, rate)`` pairs matched against the URL path or
+                Celery task name in order; the first match wins
+            max_per_second: Traces per second this process may start, or None
+                for no limit
+            clock: Monotonic clock in seconds
+        """
+        self.default_rate = default_rate
+        self.route_rates = tuple(route_rates)
+        self.max_per_second = max_per_second
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._window_start = clock()
+        self._window_demand = 0.0
+        self._last_demand = 0.0
+
+    def __call__(self, sampling_context: dict[str, Any]) -> float:
+        parent_sampled = sampling_context.get('parent_sampled')
+        if parent_sampled is not None:
+            # Keep distributed traces complete: follow the upstream decision
+            return 1.0 if parent_sampled else 0.0
+
+        rate = self.get_rate(get_sampling_target(sampling_context))
+        if rate <= 0.0 or not self.max_per_second:
+            return rate
+        return rate * self._budget_scale(rate)
+
+    def get_rate(self, target: str) -> float:
+        """Return the configured rate for a URL path or task name."""
+        for prefix, rate in self.route_rates:
+            if target.startswith(prefix):
+                return rate
+        return self.default_rate
+
+    def _budget_scale(self, rate: float) -> float:
+        with self._lock:
+            now = self._clock()
+            elapsed = now - self._window_start
+            if elapsed >= 1.0:
+                self._last_demand = self._window_demand / elapsed
+                self._window_start = now
+                self._window_demand = 0.0
+            self._window_demand += rate
+            # The current window is a lower bound for this second's demand, so
+            # a sudden burst is throttled before the window closes
+            demand = max(self._last_demand, self._window_demand)
+        return min(1.0, self.max_per_second / demand)
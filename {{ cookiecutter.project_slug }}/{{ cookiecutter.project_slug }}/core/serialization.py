@@ -0,0 +1,157 @@
+"""
+Celery Serializers
+
+This module contains the task and result payload formats registered with
+kombu: ``orjson`` (JSON encoded by orjson) and ``msgpack``, each optionally
+compressed with zlib or zstd once the payload is larger than a threshold, e.g.
+``msgpack+zstd``. ``CELERY_TASK_SERIALIZER`` picks one of them by name.
+"""
+
+import zlib
+from collections.abc import Callable
+from typing import Any
+
+import msgpack
+import orjson
+import pyzstd
+from decouple import config
+from kombu.serialization import registry
+from kombu.utils.json import JSONEncoder, object_hook
+
+# First byte of every payload of a compressed format, telling whether the rest is
+# compressed. The payload itself cannot tell: a zlib stream starts with 0x78, which is
+# also the msgpack encoding of the integer 120.
+PLAIN = b'\x00'
+COMPRESSED = b'\x01'
+
+BASE_SERIALIZERS = ('orjson', 'msgpack')
+COMPRESSIONS = ('zlib', 'zstd')
+
+# All registered names, e.g. for CELERY_ACCEPT_CONTENT
+SERIALIZERS = (
+    *BASE_SERIALIZERS,
+    *(f'{base}+{compression}' for base in BASE_SERIALIZERS for compression in COMPRESSIONS),
+)
+
+# Types kombu's json serializer tags as {"__type__": ..., "__value__": ...}
+# (datetime, date, time, Decimal, UUID and anything added with register_type)
+_json_encoder = JSONEncoder()
+_TYPE_MARKER = b'"__type__"'
+
+
+def orjson_dumps(value: Any) -> bytes:
+    # Datetimes go through kombu's encoder so they decode back to datetimes. orjson
+    # always encodes UUIDs itself, so they arrive as plain strings.
+    return orjson.dumps(
+        value,
+        default=_json_encoder.default,
+        option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+    )
+
+
+def _restore_types(value: Any) -> Any:
+    if isinstance(value, dict):
+        return object_hook({key: _restore_types(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [_restore_types(item) for item in value]
+    return value
+
+
+def orjson_loads(body: bytes) -> Any:
+    value = orjson.loads(body)
+    # orjson has no object hook, so only walk payloads that contain a tagged value
+    return _restore_types(value) if _TYPE_MARKER in body else value
+
+
+def msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, default=_json_encoder.default, use_bin_type=True)
+
+
+def msgpack_loads(body: bytes) -> Any:
+    return msgpack.unpackb(body, object_hook=object_hook, raw=False, strict_map_key=False)
+
+
+def _compressor(compression: str, level: int | None) -> tuple[Callable, Callable]:
+    if compression == 'zstd':
+        return (lambda body: pyzstd.compress(body, level or 3)), pyzstd.decompress
+    if compression == 'zlib':
+        return (lambda body: zlib.compress(body, level or 6)), zlib.decompress
+    raise ValueError(f'Unknown compression {compression!r}, expected one of: zlib, zstd')
+
+
+def compressed(
+    dumps: Callable[[Any], bytes],
+    loads: Callable[[bytes], Any],
+    compression: str,
+    min_length: int = 1024,
+    level: int | None = None,
+) -> tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    """
+    Wrap a serializer to compress payloads larger than ``min_length`` bytes.
+
+    Small payloads are sent as-is, since compressing them costs CPU on both
+    ends without saving broker memory. Both kinds share one content type, and
+    a leading ``PLAIN`` or ``COMPRESSED`` byte tells the decoder which it got.
+
+    Args:
+        dumps: Function serializing a value to bytes
+        loads: Function deserializing bytes back
+        compression: ``zlib`` or ``zstd``
+        min_length: Smallest serialized size in bytes that gets compressed
+        level: Compression level, defaults to 6 for zlib and 3 for zstd
+
+    Returns:
+        The ``(dumps, loads)`` pair of the compressed serializer
+
+    Raises:
+        ValueError: If the compression does not exist
+    """
+    compress, decompress = _compressor(compression, level)
+
+    def compressed_dumps(value: Any) -> bytes:
+        body = dumps(value)
+        return COMPRESSED + compress(body) if len(body) > min_length else PLAIN + body
+
+    def compressed_loads(body: bytes) -> Any:
+        flag, body = body[:1], body[1:]
+        if flag == COMPRESSED:
+            return loads(decompress(body))
+        if flag == PLAIN:
+            return loads(body)
+        raise ValueError(f'Unknown {compression} payload flag {flag!r}')
+
+    return compressed_dumps, compressed_loads
+
+
+def register_serializers(min_length: int | None = None, level: int | None = None) -> None:
+    """
+    Register every serializer in ``SERIALIZERS`` with kombu.
+
+    Must run in every publisher and worker before a task is sent or received,
+    which ``celery.py`` does on import. ``msgpack`` replaces kombu's own msgpack
+    serializer, whose messages it still decodes.
+
+    Args:
+        min_length: Compression threshold in bytes, defaults to
+            ``CELERY_COMPRESS_MIN_LENGTH`` (1024)
+        level: Compression level, defaults to ``CELERY_COMPRESS_LEVEL`` or the
+            default level of each compression
+    """
+    if min_length is None:
+        min_length = config('CELERY_COMPRESS_MIN_LENGTH', default=1024, cast=int)
+    if level is None:
+        level = config('CELERY_COMPRESS_LEVEL', default=None, cast=lambda v: v and int(v))
+
+    codecs = {
+        'orjson': (orjson_dumps, orjson_loads, 'application/x-orjson'),
+        'msgpack': (msgpack_dumps, msgpack_loads, 'application/x-msgpack'),
+    }
+    for name, (dumps, loads, content_type) in codecs.items():
+        registry.register(name, dumps, loads, content_type, content_encoding='binary')
+        for compression in COMPRESSIONS:
+            registry.register(
+                f'{name}+{compression}',
+                *compressed(dumps, loads, compression, min_length, level),
+                content_type=f'{content_type}+{compression}',
+                content_encoding='binary',
+            )
@@ -0,0 +1,31 @@
+"""
+Static Files Helpers
+
+This module contains the startup check for the hashed static files manifest that
+``collectstatic`` writes when the production image is built.
+"""
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin, staticfiles_storage
+from django.core.exceptions import ImproperlyConfigured
+
+
+def check_static_manifest() -> None:
+    """
+    Fail fast when a manifest storage is used but ``collectstatic`` has not run.
+
+    Manifest storages look up every static URL in ``staticfiles.json``. Without
+    it each page that links a static file fails with a 500 error, so refuse to
+    start instead. Does nothing with ``DEBUG`` on or with other storages.
+
+    Raises:
+        ImproperlyConfigured: If the manifest is missing from ``STATIC_ROOT``
+    """
+    if settings.DEBUG or not isinstance(staticfiles_storage, ManifestFilesMixin):
+        return
+    if not staticfiles_storage.manifest_storage.exists(staticfiles_storage.manifest_name):
+        raise ImproperlyConfigured(
+            f'Static files manifest {staticfiles_storage.manifest_name!r} not found in '
+            f'{settings.STATIC_ROOT}. Run "python manage.py collectstatic" when building '
+            'the image.'
+        )
@@ -0,0 +1,83 @@
+"""
+Tests for the Redis-buffered batch tasks.
+"""
+
+from unittest.mock import PropertyMock, patch
+
+import fakeredis
+from django.test import SimpleTestCase
+
+from {{ cookiecutter.project_slug }}.core.batching import BatchItem, BatchTask, batch_task, flush_batch
+
+
+@batch_task(name='core.tests.test_batching.square', flush_every=3, flush_interval=200)
+def square(items):
+    return [ValueError('negative') if item.args[0] < 0 else item.args[0] ** 2 for item in items]
+
+
+@batch_task(name='core.tests.test_batching.drop_results')
+def drop_results(items):
+    return []
+
+
+class BatchTaskTestCase(SimpleTestCase):
+    """Test buffering, flushing and the per-item results of a batch."""
+
+    def setUp(self):
+        self.client = fakeredis.FakeRedis()
+        patcher = patch.object(BatchTask, 'client', new_callable=PropertyMock)
+        patcher.start().return_value = self.client
+        self.addCleanup(patcher.stop)
+
+    def buffered(self):
+        return self.client.llen(square.buffer_key)
+
+    def test_first_call_schedules_flush(self):
+        with patch.object(flush_batch, 'apply_async') as timer:
+            result = square.delay(2)
+            square.delay(3)
+
+        timer.assert_called_once_with((square.name,), countdown=0.2)
+        self.assertEqual(self.buffered(), 2)
+        self.assertEqual(len(result.id), 36)
+
+    def test_full_batch_is_published(self):
+        with (
+            patch.object(flush_batch, 'apply_async'),
+            patch.object(BatchTask, 'apply_async') as publish,
+        ):
+            ids = [square.delay(number).id for number in (1, 2, 3)]
+
+        items = publish.call_args.args[0][0]
+        self.assertEqual([item[0] for item in items], ids)
+        self.assertEqual([item[1] for item in items], [[1], [2], [3]])
+        self.assertEqual(self.buffered(), 0)
+
+    def test_flush_empties_buffer_in_batches(self):
+        with patch.object(flush_batch, 'apply_async'):
+            for number in range(2):
+                square.delay(number)
+        self.client.rpush(square.buffer_key, *self.client.lrange(square.buffer_key, 0, -1) * 2)
+
+        with patch.object(BatchTask, 'apply_async') as publish:
+            self.assertEqual(flush_batch(square.name), 6)
+
+        self.assertEqual([len(call.args[0][0]) for call in publish.call_args_list], [3, 3])
+        self.assertEqual(self.buffered(), 0)
+
+    def test_results_per_item(self):
+        items = [['a', [2], {}], ['b', [-1], {}], ['c', [3], {}]]
+        with (
+            patch.object(square, 'ignore_result', False),
+            patch.object(BatchTask, 'backend', new_callable=PropertyMock) as backend,
+        ):
+            self.assertEqual(square(items), {'items': 3, 'failed': 1})
+
+        done, failure = backend.return_value.mark_as_done, backend.return_value.mark_as_failure
+        self.assertEqual([call.args for call in done.call_args_list], [('a', 4), ('c', 9)])
+        self.assertEqual(failure.call_args.args[0], 'b')
+        self.assertIsInstance(failure.call_args.args[1], ValueError)
+
+    def test_result_count_must_match(self):
+        with self.assertRaises(ValueError):
+            drop_results([BatchItem('a', (), {})])
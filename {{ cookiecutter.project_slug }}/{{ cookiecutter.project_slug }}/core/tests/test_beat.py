@@ -0,0 +1,151 @@
+"""
+Tests for the Redis beat scheduler.
+"""
+
+import time
+from datetime import timedelta
+from unittest.mock import PropertyMock, patch
+
+import fakeredis
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django_celery_beat.models import IntervalSchedule, PeriodicTask
+
+from {{ cookiecutter.project_slug }}.celery import app
+from {{ cookiecutter.project_slug }}.core.beat import RedisScheduler
+
+
+# Not a TestCase: the scheduler closes obsolete connections like beat does, which would
+# end the test transaction
+class RedisSchedulerTestCase(TransactionTestCase):
+    """Test the due index, the leader lease and syncing with the database."""
+
+    def setUp(self):
+        self.client = fakeredis.FakeRedis()
+        self.sent = []
+        for name, value in (
+            ('client', self.client),
+            ('producer', None),
+        ):
+            patcher = patch.object(RedisScheduler, name, new_callable=PropertyMock)
+            patcher.start().return_value = value
+            self.addCleanup(patcher.stop)
+        patcher = patch.object(
+            RedisScheduler,
+            'apply_entry',
+            lambda scheduler, entry, producer=None: self.sent.append((scheduler, entry.name)),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.task = PeriodicTask.objects.create(
+            name='report',
+            task='reports.build',
+            interval=self.every(60),
+            last_run_at=timezone.now() - timedelta(minutes=5),
+        )
+
+    def every(self, seconds):
+        return IntervalSchedule.objects.create(every=seconds, period=IntervalSchedule.SECONDS)
+
+    def make_scheduler(self):
+        scheduler = RedisScheduler(app=app)
+        self.addCleanup(scheduler.close)
+        return scheduler
+
+    def sent_reports(self):
+        return [scheduler for scheduler, name in self.sent if name == 'report']
+
+    def statements(self, func):
+        """SQL statements other than transaction control that ``func`` runs."""
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        return [query['sql'] for query in queries if query['sql'] not in ('BEGIN', 'COMMIT')]
+
+    def due_in(self, name):
+        score = self.client.zscore('beat:due', name)
+        return None if score is None else score - time.time()
+
+    def test_due_entry_is_sent_once(self):
+        scheduler = self.make_scheduler()
+        scheduler.tick()
+        scheduler.tick()
+
+        self.assertEqual(self.sent_reports(), [scheduler])
+        self.assertAlmostEqual(self.due_in('report'), 60, delta=2)
+
+    def test_one_leader_at_a_time(self):
+        leader, standby = self.make_scheduler(), self.make_scheduler()
+        leader.tick()
+
+        self.assertEqual(standby.tick(), standby.lease_ttl / 3)
+        self.assertFalse(standby.is_leader)
+
+        leader.close()
+        PeriodicTask.objects.create(
+            name='cleanup',
+            task='reports.cleanup',
+            interval=self.every(10),
+            last_run_at=timezone.now() - timedelta(minutes=5),
+        )
+        standby.tick()
+
+        # Takes over the due index, so the report is not sent again early
+        self.assertTrue(standby.is_leader)
+        self.assertEqual(self.sent, [(leader, 'report'), (standby, 'cleanup')])
+
+    def test_entry_is_not_sent_after_lease_is_lost(self):
+        scheduler = self.make_scheduler()
+        scheduler.tick()
+        self.client.set('beat:leader', 'other')
+        self.client.zadd('beat:due', {'report': time.time()})
+
+        # Lost between renewing the lease and claiming the entry
+        with patch.object(RedisScheduler, 'acquire_lease', return_value=True):
+            scheduler.tick()
+
+        self.assertEqual(self.sent_reports(), [scheduler])
+
+    def test_reloads_only_when_changed(self):
+        scheduler = self.make_scheduler()
+        scheduler.tick()
+        scheduler._next_change_check = 0
+        statements = self.statements(scheduler.tick)
+        # Only the PeriodicTasks change check
+        self.assertEqual(len(statements), 1)
+        self.assertIn('django_celery_beat_periodictasks', statements[0])
+
+        PeriodicTask.objects.create(name='cleanup', task='reports.cleanup', interval=self.every(10))
+        scheduler._next_change_check = 0
+        scheduler.tick()
+
+        self.assertIn('cleanup', scheduler.schedule)
+        self.assertAlmostEqual(self.due_in('cleanup'), 10, delta=2)
+
+    def test_changed_and_removed_entries_are_reindexed(self):
+        scheduler = self.make_scheduler()
+        scheduler.tick()
+        self.task.refresh_from_db()
+        self.task.interval = self.every(10)
+        self.task.save()
+        PeriodicTask.objects.create(name='cleanup', task='reports.cleanup', interval=self.every(10))
+        scheduler._next_change_check = 0
+        scheduler.tick()
+        self.assertAlmostEqual(self.due_in('report'), 10, delta=2)
+
+        PeriodicTask.objects.filter(name='cleanup').delete()
+        scheduler._next_change_check = 0
+        scheduler.tick()
+        self.assertIsNone(self.due_in('cleanup'))
+
+    def test_sync_writes_run_counts(self):
+        scheduler = self.make_scheduler()
+        scheduler.tick()
+        # One bulk update
+        self.assertEqual(len(self.statements(scheduler.sync)), 1)
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.total_run_count, 1)
+        self.assertGreater(self.task.last_run_at, timezone.now() - timedelta(minutes=1))
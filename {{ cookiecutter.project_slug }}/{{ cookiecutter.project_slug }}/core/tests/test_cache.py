@@ -0,0 +1,85 @@
+"""
+Tests for the tuned Redis cache serializer, compressor and options.
+"""
+
+import os
+from datetime import UTC, datetime
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.utils.safestring import SafeString, mark_safe
+from django_redis.exceptions import CompressorError
+
+from {{ cookiecutter.project_slug }}.core.cache import (
+    MsgpackSerializer,
+    ZstdCompressor,
+    get_redis_cache_options,
+)
+
+User = get_user_model()
+
+
+class MsgpackSerializerTestCase(SimpleTestCase):
+    """Test that values round-trip through msgpack with the pickle fallback."""
+
+    def setUp(self):
+        self.serializer = MsgpackSerializer(options={})
+
+    def roundtrip(self, value):
+        return self.serializer.loads(self.serializer.dumps(value))
+
+    def test_plain_data(self):
+        value = {'provider': 'google', 'ids': [1, 2, 3], 'active': True, 'raw': b'\x00'}
+        self.assertEqual(self.roundtrip(value), value)
+
+    def test_non_msgpack_types_keep_their_type(self):
+        value = {'when': datetime(2024, 1, 1, tzinfo=UTC), 'pair': (1, 2)}
+        self.assertEqual(self.roundtrip(value), value)
+        self.assertIsInstance(self.roundtrip(mark_safe('<b>')), SafeString)
+
+    def test_model_instance(self):
+        user = User(id=7, username='ada', email='ada@example.com')
+        restored = self.roundtrip(user)
+        self.assertEqual(restored.pk, 7)
+        self.assertEqual(restored.username, 'ada')
+
+    def test_smaller_than_pickle_for_plain_data(self):
+        import pickle
+
+        value = {'provider': 'google', 'redirect_uri': 'https://app.example.com/callback'}
+        self.assertLess(len(self.serializer.dumps(value)), len(pickle.dumps(value, -1)))
+
+
+class ZstdCompressorTestCase(SimpleTestCase):
+    """Test threshold-based zstd compression."""
+
+    def setUp(self):
+        self.compressor = ZstdCompressor(options={'COMPRESS_MIN_LENGTH': 100})
+
+    def test_small_values_are_not_compressed(self):
+        self.assertEqual(self.compressor.compress(b'x' * 100), b'x' * 100)
+        with self.assertRaises(CompressorError):
+            self.compressor.decompress(b'x' * 100)
+
+    def test_large_values_roundtrip(self):
+        value = b'user@example.com,' * 100
+        compressed = self.compressor.compress(value)
+        self.assertLess(len(compressed), len(value))
+        self.assertEqual(self.compressor.decompress(compressed), value)
+
+
+class RedisCacheOptionsTestCase(SimpleTestCase):
+    """Test the django_redis OPTIONS built from the environment."""
+
+    @patch.dict(os.environ, {'GUNICORN_THREADS': '8'})
+    def test_pool_sized_from_process_concurrency(self):
+        options = get_redis_cache_options(['gunicorn'])
+        self.assertEqual(options['CONNECTION_POOL_KWARGS']['max_connections'], 16)
+        self.assertEqual(options['CONNECTION_POOL_CLASS'], 'redis.BlockingConnectionPool')
+
+    @patch.dict(os.environ, {'CACHE_MAX_CONNECTIONS': '50', 'CACHE_SOCKET_TIMEOUT': '0.5'})
+    def test_overrides(self):
+        options = get_redis_cache_options(['gunicorn'])
+        self.assertEqual(options['CONNECTION_POOL_KWARGS']['max_connections'], 50)
+        self.assertEqual(options['SOCKET_TIMEOUT'], 0.5)
@@ -0,0 +1,144 @@
+"""
+Tests for the claim checks of large Celery task payloads.
+"""
+
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+from celery.contrib.testing.mocks import TaskMessage
+from django.test import SimpleTestCase, override_settings
+from kombu.serialization import dumps
+
+from {{ cookiecutter.project_slug }}.celery import app
+from {{ cookiecutter.project_slug }}.core.claim_check import (
+    ClaimCheckRequest,
+    FileSystemBlobStore,
+    _size_bound,
+    check_in,
+    check_in_arguments,
+    get_blob_store,
+    is_reference,
+    resolve,
+)
+
+# Random, so it stays large after compression
+LARGE = [os.urandom(16).hex() for _ in range(100)]
+
+
+@app.task(name='core.tests.test_claim_check.echo', ignore_result=False)
+def echo(*args, **kwargs):
+    return [args, kwargs]
+
+
+class ClaimCheckTestCase(SimpleTestCase):
+    """Test that large payloads travel as references to a blob store."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(
+            CLAIM_CHECK_URL=f'file://{directory.name}', CLAIM_CHECK_THRESHOLD=1024
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.store = get_blob_store(f'file://{directory.name}')
+
+    def stored_keys(self):
+        return sorted(path.name for path in self.store.path.iterdir())
+
+    def test_small_arguments_stay_inline(self):
+        self.assertEqual(
+            check_in_arguments((1, 'a'), {'ids': [1, 2]}, 'json', 1024, 60),
+            ((1, 'a'), {'ids': [1, 2]}),
+        )
+        self.assertEqual(self.stored_keys(), [])
+
+    def test_small_arguments_are_not_serialized(self):
+        with patch('{{ cookiecutter.project_slug }}.core.claim_check.dumps') as dumps:
+            check_in_arguments((1, 'a', b'b'), {'ids': [1, 2], 'at': 1.5}, 'json', 1024, 60)
+        dumps.assert_not_called()
+
+    def test_size_bound_covers_serialized_size(self):
+        values = [
+            'é' * 100,
+            '\x00' * 100,
+            os.urandom(100),
+            {'ids': list(range(100)), 'name': '名前'},
+            [None, True, -(2**63), 1e-300],
+        ]
+        for serializer in ('json', 'msgpack', 'pickle'):
+            for value in values:
+                with self.subTest(serializer=serializer, value=value):
+                    size = len(dumps(value, serializer=serializer)[2])
+                    self.assertGreaterEqual(_size_bound(value, 10**6), size)
+
+    def test_large_arguments_are_checked_in(self):
+        args, kwargs = check_in_arguments((LARGE, 7), {'rows': LARGE, 'page': 1}, 'json', 1024, 60)
+
+        self.assertTrue(is_reference(args[0]))
+        self.assertTrue(is_reference(kwargs['rows']))
+        self.assertEqual((args[1], kwargs['page']), (7, 1))
+        self.assertEqual(resolve(args[0]), LARGE)
+        self.assertEqual(len(self.stored_keys()), 2)
+
+    def test_only_largest_arguments_are_checked_in(self):
+        small = LARGE[:20]
+        args, _ = check_in_arguments((small, LARGE), {}, 'json', 1024, 60)
+        self.assertEqual(args[0], small)
+        self.assertTrue(is_reference(args[1]))
+
+    def test_apply_async_sends_references(self):
+        with patch.object(app, 'send_task') as send_task:
+            echo.apply_async((LARGE,), {'page': 1})
+
+        args, kwargs = send_task.call_args.args[1:3]
+        self.assertTrue(is_reference(args[0]))
+        self.assertEqual(kwargs, {'page': 1})
+
+    def test_task_resolves_references(self):
+        reference = check_in(LARGE, 'json', 60)
+        self.assertEqual(echo(reference, page=1), [(LARGE,), {'page': 1}])
+{%- if cookiecutter.celery_results != 'none' %}
+
+    def test_large_result_is_checked_in(self):
+        retval = echo.apply((LARGE,)).get()
+
+        self.assertTrue(is_reference(retval))
+        self.assertFalse(retval['release'])
+        self.assertEqual(resolve(retval), [[LARGE], {}])
+{%- endif %}
+
+    def test_missing_blob(self):
+        reference = check_in(LARGE, 'json', 60)
+        self.store.delete([reference['__claim_check__']])
+        with self.assertRaises(LookupError):
+            resolve(reference)
+
+    def make_request(self, *args):
+        return ClaimCheckRequest(TaskMessage(echo.name, args=args), app=app, task=echo)
+
+    def test_released_after_acknowledgement(self):
+        result = check_in({'kept': 'result'}, 'json', 60, release=False)
+        request = self.make_request(check_in(LARGE, 'json', 60), result)
+        request.acknowledge()
+
+        self.assertEqual(self.stored_keys(), [result['__claim_check__']])
+
+    def test_kept_for_retry_and_requeue(self):
+        request = self.make_request(check_in(LARGE, 'json', 60))
+        request.reject(requeue=True)
+        request = self.make_request(check_in(LARGE, 'json', 60))
+        request.retried = True
+        request.acknowledge()
+
+        self.assertEqual(len(self.stored_keys()), 2)
+
+    def test_sweeps_expired_blobs(self):
+        store = FileSystemBlobStore(self.store.path)
+        store.put(b'old', ttl=1)
+        kept = store.put(b'new', ttl=60)
+
+        self.assertEqual(store.sweep(time.time() + 5), 1)
+        self.assertEqual(self.stored_keys(), [kept])
@@ -0,0 +1,108 @@
+"""
+Tests for database connection helpers.
+"""
+
+import os
+from unittest.mock import patch
+
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+
+from {{ cookiecutter.project_slug }}.core.db import get_connection_settings, get_process_concurrency
+
+GUNICORN_ARGV = ['/app/.venv/bin/gunicorn', '{{ cookiecutter.project_slug }}.wsgi:application']
+CELERY_ARGV = ['/app/.venv/bin/celery', '-A', '{{ cookiecutter.project_slug }}', 'worker']
+
+
+class ProcessConcurrencyTestCase(SimpleTestCase):
+    """Test pool sizing from the web and Celery process concurrency."""
+
+    @patch.dict(os.environ, {'GUNICORN_THREADS': '8'})
+    def test_gunicorn_threads(self):
+        self.assertEqual(get_process_concurrency(GUNICORN_ARGV), 8)
+
+    @patch.dict(os.environ, {'GRANIAN_BLOCKING_THREADS': '6'})
+    def test_granian_blocking_threads(self):
+        self.assertEqual(get_process_concurrency(GUNICORN_ARGV), 6)
+
+    @patch.dict(os.environ, {'CELERY_WORKER_POOL': 'prefork', 'CELERY_WORKER_CONCURRENCY': '8'})
+    def test_celery_prefork_uses_single_connection(self):
+        self.assertEqual(get_process_concurrency(CELERY_ARGV), 1)
+
+    @patch.dict(os.environ, {'CELERY_WORKER_POOL': 'threads', 'CELERY_WORKER_CONCURRENCY': '6'})
+    def test_celery_threads_pool(self):
+        self.assertEqual(get_process_concurrency(CELERY_ARGV), 6)
+
+    @patch.dict(os.environ, {'CELERY_WORKER_PRESET': 'io', 'CELERY_WORKER_CONCURRENCY': '32'})
+    def test_celery_io_preset(self):
+        self.assertEqual(get_process_concurrency(CELERY_ARGV), 32)
+
+
+class ConnectionSettingsTestCase(SimpleTestCase):
+    """Test the DATABASES connection keys produced for each mode."""
+
+    @patch.dict(os.environ, {'GUNICORN_THREADS': '4'})
+    def test_pool_sized_from_threads(self):
+        settings = get_connection_settings(True, GUNICORN_ARGV)
+        pool = settings['OPTIONS']['pool']
+        self.assertEqual(settings['CONN_MAX_AGE'], 0)
+        self.assertTrue(settings['CONN_HEALTH_CHECKS'])
+        self.assertEqual(pool['min_size'], 4)
+        self.assertEqual(pool['max_size'], 8)
+
+    def test_pool_checks_connections(self):
+        settings = get_connection_settings(True, GUNICORN_ARGV)
+        connection = ConnectionHandler(
+            {'default': {'ENGINE': 'django.db.backends.postgresql', 'NAME': 'app', **settings}}
+        )['default']
+        with patch('psycopg_pool.ConnectionPool') as pool_class:
+            self.assertIs(connection.pool, pool_class.return_value)
+
+        self.assertIs(pool_class.call_args.kwargs['check'], pool_class.check_connection)
+
+    @patch.dict(os.environ, {'CELERY_WORKER_PRESET': 'io', 'CELERY_WORKER_CONCURRENCY': '64'})
+    def test_pool_capped_for_many_threads(self):
+        pool = get_connection_settings(True, CELERY_ARGV)['OPTIONS']['pool']
+        self.assertEqual(pool['min_size'], 10)
+        self.assertEqual(pool['max_size'], 10)
+
+    @patch.dict(
+        os.environ,
+        {'CELERY_WORKER_PRESET': 'io', 'CELERY_WORKER_CONCURRENCY': '64', 'DB_POOL_MAX_SIZE': '64'},
+    )
+    def test_pool_cap_can_be_raised(self):
+        pool = get_connection_settings(True, CELERY_ARGV)['OPTIONS']['pool']
+        self.assertEqual(pool['min_size'], 64)
+        self.assertEqual(pool['max_size'], 64)
+
+    @patch.dict(os.environ, {'DB_POOL_MIN_SIZE': '5', 'DB_POOL_MAX_SIZE': '2'})
+    def test_max_size_never_below_min_size(self):
+        pool = get_connection_settings(True, GUNICORN_ARGV)['OPTIONS']['pool']
+        self.assertEqual(pool['min_size'], 5)
+        self.assertEqual(pool['max_size'], 5)
+
+    @patch.dict(os.environ, {'DB_CONN_MAX_AGE': '120'})
+    def test_persistent_connections_without_pool(self):
+        settings = get_connection_settings(False, GUNICORN_ARGV)
+        self.assertEqual(settings['CONN_MAX_AGE'], 120)
+        self.assertNotIn('pool', settings['OPTIONS'])
+
+
+class PgBouncerSettingsTestCase(SimpleTestCase):
+    """Test the transaction pooling profile for PgBouncer."""
+
+    @patch.dict(os.environ, {'DB_PREPARE_THRESHOLD': ''})
+    def test_transaction_pooling_safe_defaults(self):
+        settings = get_connection_settings(True, GUNICORN_ARGV, pgbouncer=True)
+        self.assertTrue(settings['DISABLE_SERVER_SIDE_CURSORS'])
+        self.assertIsNone(settings['OPTIONS']['prepare_threshold'])
+        self.assertIn('pool', settings['OPTIONS'])
+
+    @patch.dict(os.environ, {'DB_PREPARE_THRESHOLD': '5'})
+    def test_prepared_statements_opt_in(self):
+        settings = get_connection_settings(False, GUNICORN_ARGV, pgbouncer=True)
+        self.assertEqual(settings['OPTIONS']['prepare_threshold'], 5)
+
+    def test_direct_connection_keeps_server_side_cursors(self):
+        settings = get_connection_settings(True, GUNICORN_ARGV)
+        self.assertNotIn('DISABLE_SERVER_SIDE_CURSORS', settings)
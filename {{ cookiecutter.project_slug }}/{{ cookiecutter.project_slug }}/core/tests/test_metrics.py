@@ -0,0 +1,150 @@
+"""
+Tests for the Prometheus metrics and the /metrics endpoint.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from {{ cookiecutter.project_slug }}.core.metrics import get_registry, install_metrics, metrics_view
+
+OPERATION = '{{ cookiecutter.project_slug }}_accounts_api_users_get_user_by_id'
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@override_settings(
+    METRICS_ENABLED=True,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+class MetricsTestCase(TestCase):
+    """Scrape /metrics after exercising the instrumented code paths."""
+
+    def setUp(self):
+        install_metrics()
+
+    def scrape(self, **headers):
+        response = self.client.get(reverse('metrics'), headers=headers)
+        return response, response.content.decode()
+
+    def test_request_latency_per_operation(self):
+        user = User.objects.create_user('metrics-user', 'metrics@example.com')
+        before = sample('http_request_duration_seconds_count', operation=OPERATION, method='GET')
+        response = self.client.get(reverse('api-1.0.0:get_user_by_id', args=[user.id]))
+        self.assertEqual(response.status_code, 200)
+
+        response, text = self.scrape()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('http_request_duration_seconds_bucket{', text)
+        self.assertEqual(
+            sample('http_request_duration_seconds_count', operation=OPERATION, method='GET'),
+            before + 1,
+        )
+        self.assertGreaterEqual(
+            sample('http_requests_total', operation=OPERATION, method='GET', status='200'), 1
+        )
+
+    def test_unmatched_requests_share_one_label(self):
+        before = sample('http_requests_total', operation='unmatched', method='GET', status='404')
+        self.client.get('/no-such-page-1')
+        self.client.get('/no-such-page-2')
+        self.assertEqual(
+            sample('http_requests_total', operation='unmatched', method='GET', status='404'),
+            before + 2,
+        )
+
+    def test_database_queries(self):
+        before = sample('db_query_duration_seconds_count', alias='default')
+        User.objects.count()
+        User.objects.exists()
+        self.assertEqual(sample('db_query_duration_seconds_count', alias='default'), before + 2)
+
+    def test_cache_hits_and_misses(self):
+        cache = caches['default']
+        hits = sample('cache_requests_total', cache='default', result='hit')
+        misses = sample('cache_requests_total', cache='default', result='miss')
+
+        self.assertEqual(cache.get('metrics-missing', 'fallback'), 'fallback')
+        cache.set('metrics-present', None)
+        self.assertIsNone(cache.get('metrics-present', 'fallback'))
+        self.assertEqual(
+            cache.get_many(['metrics-present', 'metrics-missing']), {'metrics-present': None}
+        )
+
+        self.assertEqual(sample('cache_requests_total', cache='default', result='hit'), hits + 2)
+        self.assertEqual(sample('cache_requests_total', cache='default', result='miss'), misses + 2)
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_password_hashing(self):
+        install_metrics()
+        encoded = sample('password_hash_duration_seconds_count', operation='encode')
+        verified = sample('password_hash_duration_seconds_count', operation='verify')
+
+        password = make_password('correct horse')
+        self.assertTrue(check_password('correct horse', password))
+
+        self.assertEqual(
+            sample('password_hash_duration_seconds_count', operation='encode'), encoded + 1
+        )
+        # verify() encodes internally, which is not counted again
+        self.assertEqual(
+            sample('password_hash_duration_seconds_count', operation='verify'), verified + 1
+        )
+        self.assertEqual(sample('password_hashes_in_progress'), 0)
+{%- if cookiecutter.use_celery == 'y' %}
+
+    def test_celery_task_publish(self):
+        from celery.signals import after_task_publish
+
+        before = sample('celery_tasks_published_total', task='accounts.tasks.example')
+        after_task_publish.send(sender='accounts.tasks.example', headers={}, body=())
+        self.assertEqual(
+            sample('celery_tasks_published_total', task='accounts.tasks.example'), before + 1
+        )
+{%- endif %}
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_token(self):
+        response, _ = self.scrape()
+        self.assertEqual(response.status_code, 403)
+        response, _ = self.scrape(Authorization='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        # Not routed either, but the URLconf is only read once per process
+        with self.assertRaises(Http404):
+            metrics_view(RequestFactory().get('/metrics'))
+
+
+class MultiprocessTestCase(SimpleTestCase):
+    """Values written by separate worker processes are added up in one scrape."""
+
+    def test_aggregates_worker_files(self):
+        script = (
+            'from prometheus_client import Counter, Gauge\n'
+            "Counter('worker_requests', 'Requests').inc(3)\n"
+            "Gauge('worker_busy', 'Busy', multiprocess_mode='livesum').inc()\n"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': directory}
+            for _ in range(2):
+                subprocess.run([sys.executable, '-c', script], env=env, check=True)
+
+            with patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': directory}):
+                registry = get_registry()
+            self.assertIsNot(registry, REGISTRY)
+            self.assertEqual(registry.get_sample_value('worker_requests_total'), 6)
+            self.assertEqual(registry.get_sample_value('worker_busy'), 2)
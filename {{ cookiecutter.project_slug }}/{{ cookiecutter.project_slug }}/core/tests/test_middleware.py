@@ -0,0 +1,62 @@
+"""
+Tests for the API fast path of the browser-only middleware.
+"""
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from {{ cookiecutter.project_slug }}.core.middleware import (
+    AuthenticationMiddleware,
+    CsrfViewMiddleware,
+    MessageMiddleware,
+    SessionMiddleware,
+    XFrameOptionsMiddleware,
+)
+
+
+def view(request):
+    return HttpResponse()
+
+
+def build_stack():
+    """Chain the middleware like Django's handler does."""
+    handler = view
+    for middleware in (
+        XFrameOptionsMiddleware,
+        MessageMiddleware,
+        AuthenticationMiddleware,
+        CsrfViewMiddleware,
+        SessionMiddleware,
+    ):
+        handler = middleware(handler)
+    return handler
+
+
+@override_settings(API_MIDDLEWARE_FAST_PATH=True, API_FAST_PATH_PREFIXES=('/api/',))
+class ApiFastPathTestCase(SimpleTestCase):
+    """Test that API requests skip the browser-only middleware."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.stack = build_stack()
+
+    def test_api_request_skips_middleware(self):
+        request = self.factory.get('/api/accounts/users/1')
+        response = self.stack(request)
+        self.assertFalse(hasattr(request, 'session'))
+        self.assertFalse(hasattr(request, '_messages'))
+        self.assertFalse(request.user.is_authenticated)
+        self.assertNotIn('X-Frame-Options', response.headers)
+
+    def test_admin_keeps_full_stack(self):
+        request = self.factory.get('/admin/')
+        response = self.stack(request)
+        self.assertTrue(hasattr(request, 'session'))
+        self.assertTrue(hasattr(request, '_messages'))
+        self.assertEqual(response.headers['X-Frame-Options'], 'DENY')
+
+    @override_settings(API_MIDDLEWARE_FAST_PATH=False)
+    def test_fast_path_can_be_disabled(self):
+        request = self.factory.get('/api/accounts/users/1')
+        self.stack(request)
+        self.assertTrue(hasattr(request, 'session'))
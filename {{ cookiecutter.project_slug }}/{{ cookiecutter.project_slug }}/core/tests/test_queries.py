@@ -0,0 +1,131 @@
+"""
+Tests for the query inspector, the max_queries helpers and the middleware.
+"""
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from {{ cookiecutter.project_slug }}.core.middleware import QueryInspectorMiddleware
+from {{ cookiecutter.project_slug }}.core.queries import (
+    QueryInspector,
+    explain_query,
+    max_queries,
+    query_shape,
+)
+
+
+def n_plus_one_view(request):
+    for user in User.objects.filter(email__endswith='@inspected.example'):
+        User.objects.filter(pk=user.pk).exists()
+    return HttpResponse()
+
+
+class QueryShapeTestCase(SimpleTestCase):
+    """Test that queries differing only in values share a shape."""
+
+    def test_literals_and_placeholders(self):
+        self.assertEqual(
+            query_shape('SELECT * FROM "auth_user" WHERE "id" = %s AND "username" = \'bob\''),
+            'SELECT * FROM "auth_user" WHERE "id" = ? AND "username" = ?',
+        )
+        self.assertEqual(
+            query_shape('SELECT "t1"."id" FROM "t1"\n  LIMIT 21'),
+            'SELECT "t1"."id" FROM "t1" LIMIT ?',
+        )
+
+    def test_in_lists_of_any_length(self):
+        self.assertEqual(
+            query_shape('SELECT 1 FROM "auth_user" WHERE "id" IN (%s, %s, %s)'),
+            query_shape('SELECT 1 FROM "auth_user" WHERE "id" IN (%s)'),
+        )
+
+
+class QueryInspectorTestCase(TestCase):
+    """Test grouping, thresholds, plans and the query count assertions."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create(
+            User(username=f'inspected-{index}', email=f'inspected-{index}@inspected.example')
+            for index in range(5)
+        )
+
+    def test_repeated_shape_is_reported(self):
+        inspector = QueryInspector(repeat_threshold=5)
+        with inspector.capture():
+            n_plus_one_view(None)
+
+        [(shape, queries)] = inspector.repeated()
+        self.assertEqual(len(queries), 5)
+        self.assertIn('WHERE "auth_user"."id" = ?', shape)
+        self.assertIn('core/tests/test_queries.py', queries[0].location)
+        self.assertIn('in n_plus_one_view', queries[0].location)
+        self.assertIn('possible N+1', inspector.report())
+
+    def test_slow_queries_are_explained(self):
+        inspector = QueryInspector(slow_ms=0)
+        with inspector.capture():
+            list(User.objects.filter(username='inspected-1'))
+            User.objects.filter(username='inspected-1').update(first_name='Ada')
+
+        select, update = inspector.slow()
+        self.assertTrue(explain_query(select))
+        # Writes are never run again by EXPLAIN ANALYZE
+        self.assertEqual(explain_query(update), '')
+        self.assertIn('slow query', inspector.report(explain=True))
+
+    def test_max_queries(self):
+        with max_queries(1):
+            User.objects.count()
+        with self.assertRaisesMessage(AssertionError, 'expected at most 2'), max_queries(2):
+            n_plus_one_view(None)
+
+    @pytest.mark.max_queries(2)
+    def test_max_queries_marker(self):
+        # Counts setUp too, but not setUpTestData (once per class) or savepoints
+        User.objects.count()
+{%- if cookiecutter.include_oauth2 == 'y' %}
+
+    def test_oauth2_username_collisions(self):
+        from {{ cookiecutter.project_slug }}.accounts.oauth2.api import _find_or_create_user
+
+        User.objects.bulk_create(
+            User(username=name) for name in ('inspected', 'inspected1', 'inspected2')
+        )
+        # Lookup by email, taken usernames and the insert, whatever the collisions
+        with max_queries(3):
+            user = _find_or_create_user({'email': 'new@example.com', 'username': 'inspected'})
+        self.assertEqual(user.username, 'inspected3')
+        self.assertFalse(user.has_usable_password())
+
+        # Candidates are checked 100 at a time
+        User.objects.bulk_create(User(username=f'busy{n}') for n in range(1, 150))
+        User.objects.create(username='busy')
+        with max_queries(4):
+            user = _find_or_create_user({'email': 'busy@example.com', 'username': 'busy'})
+        self.assertEqual(user.username, 'busy150')
+{%- endif %}
+
+
+class QueryInspectorMiddlewareTestCase(TestCase):
+    """Test the per-request report."""
+
+    @override_settings(QUERY_INSPECTOR_ENABLED=False)
+    def test_disabled(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            QueryInspectorMiddleware(n_plus_one_view)
+
+    @override_settings(QUERY_INSPECTOR_ENABLED=True, QUERY_INSPECTOR_REPEAT_THRESHOLD=3)
+    def test_logs_repeated_queries(self):
+        User.objects.bulk_create(
+            User(username=f'request-{index}', email=f'request-{index}@inspected.example')
+            for index in range(3)
+        )
+        middleware = QueryInspectorMiddleware(n_plus_one_view)
+        with self.assertLogs('{{ cookiecutter.project_slug }}.core.queries', 'WARNING') as logs:
+            middleware(RequestFactory().get('/users'))
+        self.assertIn('GET /users', logs.output[0])
+        self.assertIn('3 x', logs.output[0])
@@ -0,0 +1,62 @@
+"""
+Tests for the chunked task result cleanup.
+"""
+
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django_celery_results.models import GroupResult, TaskResult
+
+from {{ cookiecutter.project_slug }}.core.results import cleanup_task_results, delete_expired_results
+
+
+def create_results(model, count, age, prefix):
+    key = 'task_id' if model is TaskResult else 'group_id'
+    created = model.objects.bulk_create(model(**{key: f'{prefix}-{i}'}) for i in range(count))
+    # date_done is auto_now, so it can only be backdated after saving
+    model.objects.filter(pk__in=[row.pk for row in created]).update(date_done=timezone.now() - age)
+
+
+class DeleteExpiredResultsTestCase(TestCase):
+    """Test that only expired results are deleted, a chunk at a time."""
+
+    def setUp(self):
+        create_results(TaskResult, 25, timedelta(days=3), 'expired')
+        create_results(TaskResult, 5, timedelta(hours=1), 'recent')
+        create_results(GroupResult, 4, timedelta(days=3), 'expired-group')
+
+    def test_deletes_expired_results(self):
+        deleted = delete_expired_results(timedelta(days=1), chunk_size=10)
+
+        self.assertEqual(deleted, 29)
+        self.assertEqual(
+            set(TaskResult.objects.values_list('task_id', flat=True)),
+            {f'recent-{i}' for i in range(5)},
+        )
+        self.assertFalse(GroupResult.objects.exists())
+
+    def test_deletes_in_chunks(self):
+        with self.assertNumQueries(2 * 3 + 2):
+            # Three full or partial task chunks (select and delete each), one group chunk
+            delete_expired_results(timedelta(days=1), chunk_size=10)
+
+    def test_accepts_seconds(self):
+        self.assertEqual(delete_expired_results(2 * 86400, models=(TaskResult,)), 25)
+
+
+@override_settings(TASK_RESULT_CLEANUP_CHUNK_SIZE=10, TASK_RESULT_CLEANUP_PAUSE=0)
+class CleanupTaskResultsTestCase(TestCase):
+    """Test the beat task that replaces celery.backend_cleanup."""
+
+    def test_uses_result_expires(self):
+        # CELERY_RESULT_EXPIRES defaults to a day
+        create_results(TaskResult, 3, timedelta(days=2), 'expired')
+        create_results(TaskResult, 2, timedelta(hours=12), 'recent')
+
+        self.assertEqual(cleanup_task_results(), 3)
+        self.assertEqual(TaskResult.objects.count(), 2)
+
+    def test_replaces_backend_cleanup_entry(self):
+        entry = cleanup_task_results.app.conf.beat_schedule['celery.backend_cleanup']
+        self.assertEqual(entry['task'], cleanup_task_results.name)
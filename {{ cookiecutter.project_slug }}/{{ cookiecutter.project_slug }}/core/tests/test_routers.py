@@ -0,0 +1,123 @@
+"""
+Tests for the primary/replica database router and pinning middleware.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from {{ cookiecutter.project_slug }}.core.db import get_replica_databases
+from {{ cookiecutter.project_slug }}.core.middleware import PrimaryPinningMiddleware
+from {{ cookiecutter.project_slug }}.core.routers import (
+    PrimaryReplicaRouter,
+    ReplicaLagMonitor,
+    has_written,
+    is_pinned_to_primary,
+    reset_primary_pin,
+    use_primary,
+)
+
+User = get_user_model()
+
+REPLICA_SETTINGS = {
+    'DATABASE_REPLICAS': ['replica1'],
+    'DATABASE_REPLICA_MAX_LAG': 5.0,
+    'DATABASE_REPLICA_LAG_CHECK_INTERVAL': 60.0,
+}
+
+
+@override_settings(**REPLICA_SETTINGS)
+class PrimaryReplicaRouterTestCase(SimpleTestCase):
+    """Test read/write routing and the lag-aware fallback."""
+
+    def setUp(self):
+        reset_primary_pin()
+        self.addCleanup(reset_primary_pin)
+        self.router = PrimaryReplicaRouter()
+        patcher = patch.object(ReplicaLagMonitor, 'get_lag', return_value=0.0)
+        self.get_lag = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_go_to_replica(self):
+        self.assertEqual(self.router.db_for_read(User), 'replica1')
+
+    def test_writes_go_to_primary_and_pin_reads(self):
+        self.assertEqual(self.router.db_for_write(User), 'default')
+        self.assertTrue(has_written())
+        self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def test_use_primary(self):
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(User), 'default')
+        self.assertEqual(self.router.db_for_read(User), 'replica1')
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        self.get_lag.return_value = 30.0
+        self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def test_lag_is_checked_once_per_interval(self):
+        for _ in range(3):
+            self.router.db_for_read(User)
+        self.get_lag.assert_called_once_with('replica1')
+
+    def test_migrations_only_on_primary(self):
+        self.assertFalse(self.router.allow_migrate('replica1', 'accounts'))
+        self.assertIsNone(self.router.allow_migrate('default', 'accounts'))
+
+
+@override_settings(**REPLICA_SETTINGS, DB_PRIMARY_PIN_SECONDS=5)
+class PrimaryPinningMiddlewareTestCase(SimpleTestCase):
+    """Test read-your-writes pinning across requests."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.pinned = None
+
+    def view(self, write=False):
+        def get_response(request):
+            if write:
+                PrimaryReplicaRouter().db_for_write(User)
+            self.pinned = is_pinned_to_primary()
+            return HttpResponse()
+
+        return PrimaryPinningMiddleware(get_response)
+
+    def test_write_sets_pin_cookie(self):
+        response = self.view(write=True)(self.factory.post('/'))
+        self.assertEqual(response.cookies['db_primary_pin']['max-age'], 5)
+        self.assertFalse(is_pinned_to_primary())
+
+    def test_read_without_cookie_uses_replicas(self):
+        response = self.view()(self.factory.get('/'))
+        self.assertFalse(self.pinned)
+        self.assertNotIn('db_primary_pin', response.cookies)
+
+    def test_pin_cookie_pins_reads(self):
+        request = self.factory.get('/')
+        request.COOKIES['db_primary_pin'] = '1'
+        self.view()(request)
+        self.assertTrue(self.pinned)
+
+    def test_pin_header_pins_reads(self):
+        self.view()(self.factory.get('/', HTTP_X_DB_PRIMARY='1'))
+        self.assertTrue(self.pinned)
+
+
+class ReplicaDatabasesTestCase(SimpleTestCase):
+    """Test the DATABASES entries built for replicas."""
+
+    def test_replica_entries(self):
+        primary = {'HOST': 'db', 'PORT': '5432', 'OPTIONS': {'pool': {'timeout': 10}}}
+        replicas = get_replica_databases(primary, ['replica-a', 'replica-b:5433'])
+        self.assertEqual(list(replicas), ['replica1', 'replica2'])
+        self.assertEqual(replicas['replica1']['PORT'], '5432')
+        self.assertEqual(replicas['replica2']['HOST'], 'replica-b')
+        self.assertEqual(replicas['replica2']['PORT'], '5433')
+        self.assertEqual(replicas['replica1']['TEST'], {'MIRROR': 'default'})
+        self.assertEqual(replicas['replica1']['OPTIONS']['pool']['timeout'], 2.0)
+        self.assertEqual(primary['OPTIONS']['pool']['timeout'], 10)
+
+    def test_no_replicas(self):
+        self.assertEqual(get_replica_databases({'HOST': 'db'}, ['']), {})
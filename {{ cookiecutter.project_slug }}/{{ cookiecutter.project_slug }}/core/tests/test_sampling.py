@@ -0,0 +1,73 @@
+"""
+Tests for the adaptive trace sampler.
+"""
+
+from django.test import SimpleTestCase
+
+from {{ cookiecutter.project_slug }}.core.sampling import TracesSampler, get_sampling_target
+
+ROUTE_RATES = [
+    ('/api/accounts/users/me', 0.01),
+    ('/api/accounts/oauth2/callback', 1.0),
+    ('/static/', 0.0),
+    ('accounts.tasks.', 0.5),
+]
+
+
+def request(path, **context):
+    return {'wsgi_environ': {'PATH_INFO': path}, **context}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TracesSamplerTestCase(SimpleTestCase):
+    """Test per-route rates, parent decisions and the per-process budget."""
+
+    def test_route_rates(self):
+        sampler = TracesSampler(default_rate=0.2, route_rates=ROUTE_RATES)
+        self.assertEqual(sampler(request('/api/accounts/users/me')), 0.01)
+        self.assertEqual(sampler(request('/api/accounts/oauth2/callback')), 1.0)
+        self.assertEqual(sampler(request('/static/admin/css/base.css')), 0.0)
+        self.assertEqual(sampler(request('/api/accounts/users/42')), 0.2)
+
+    def test_celery_task_names(self):
+        sampler = TracesSampler(default_rate=0.2, route_rates=ROUTE_RATES)
+        self.assertEqual(sampler({'celery_job': {'task': 'accounts.tasks.send_email'}}), 0.5)
+
+    def test_parent_decision_is_honored(self):
+        sampler = TracesSampler(default_rate=0.0, route_rates=ROUTE_RATES)
+        self.assertEqual(sampler(request('/static/app.js', parent_sampled=True)), 1.0)
+        self.assertEqual(
+            sampler(request('/api/accounts/oauth2/callback', parent_sampled=False)), 0.0
+        )
+
+    def test_budget_scales_rates_under_load(self):
+        clock = FakeClock()
+        sampler = TracesSampler(default_rate=1.0, max_per_second=10, clock=clock)
+        rates = [sampler(request('/api/accounts/users/42')) for _ in range(100)]
+        self.assertEqual(rates[:10], [1.0] * 10)
+        # Expected traces within the first second stay close to the budget
+        self.assertLess(sum(rates), 10 * 6)
+        self.assertAlmostEqual(rates[-1], 0.1)
+
+        # The next second starts from the measured demand of 100 requests/s
+        clock.now = 1.0
+        self.assertAlmostEqual(sampler(request('/api/accounts/users/42')), 0.1)
+
+        # Once traffic drops, full rates come back
+        clock.now = 10.0
+        sampler(request('/api/accounts/users/42'))
+        clock.now = 11.0
+        self.assertEqual(sampler(request('/api/accounts/users/42')), 1.0)
+
+    def test_target_from_asgi_scope_and_transaction(self):
+        self.assertEqual(get_sampling_target({'asgi_scope': {'path': '/api/'}}), '/api/')
+        self.assertEqual(
+            get_sampling_target({'transaction_context': {'name': 'cleanup'}}), 'cleanup'
+        )
@@ -0,0 +1,85 @@
+"""
+Tests for the Celery task payload serializers.
+"""
+
+import uuid
+from datetime import UTC, datetime
+from decimal import Decimal
+
+import msgpack
+from django.test import SimpleTestCase
+from kombu.serialization import dumps, loads
+
+from {{ cookiecutter.project_slug }}.core.serialization import (
+    COMPRESSED,
+    PLAIN,
+    SERIALIZERS,
+    compressed,
+    msgpack_dumps,
+    msgpack_loads,
+    register_serializers,
+)
+
+VALUE = {
+    'ids': [1, 2, 3],
+    'active': True,
+    'name': 'Ada',
+    'when': datetime(2024, 1, 1, 12, tzinfo=UTC),
+    'price': Decimal('9.99'),
+    'token': uuid.UUID(int=1),
+}
+
+
+class SerializerTestCase(SimpleTestCase):
+    """Test that task payloads round-trip through every registered format."""
+
+    def setUp(self):
+        register_serializers(min_length=64)
+        # Back to the configured threshold for other tests
+        self.addCleanup(register_serializers)
+
+    def roundtrip(self, serializer, value):
+        content_type, content_encoding, body = dumps(value, serializer=serializer)
+        return loads(body, content_type, content_encoding, accept=[content_type]), body
+
+    def test_round_trip_keeps_types(self):
+        for serializer in SERIALIZERS:
+            with self.subTest(serializer=serializer):
+                value = self.roundtrip(serializer, VALUE)[0]
+                if serializer.startswith('orjson'):
+                    # orjson encodes UUIDs natively, as strings
+                    value['token'] = uuid.UUID(value['token'])
+                self.assertEqual(value, VALUE)
+
+    def test_task_body(self):
+        # Celery's protocol 2 body: (args, kwargs, embed), with tuples sent as lists
+        body = ((1, 'a'), {'page': 2}, {'callbacks': None})
+        for serializer in SERIALIZERS:
+            with self.subTest(serializer=serializer):
+                self.assertEqual(
+                    self.roundtrip(serializer, body)[0],
+                    [[1, 'a'], {'page': 2}, {'callbacks': None}],
+                )
+
+    def test_compresses_only_above_threshold(self):
+        small, small_body = self.roundtrip('msgpack+zstd', {'id': 1})
+        self.assertEqual(small_body, PLAIN + msgpack_dumps({'id': 1}))
+
+        large = {'users': [f'user{i}@example.com' for i in range(100)]}
+        self.assertTrue(self.roundtrip('msgpack+zstd', large)[1].startswith(COMPRESSED))
+        self.assertTrue(self.roundtrip('orjson+zlib', large)[1].startswith(COMPRESSED))
+        self.assertEqual(self.roundtrip('orjson+zstd', large)[0], large)
+
+    def test_plain_payload_like_compression_header(self):
+        # msgpack encodes 120 as 0x78, the first byte of a zlib stream
+        self.assertEqual(msgpack_dumps(120), b'\x78')
+        for serializer in ('msgpack+zlib', 'msgpack+zstd'):
+            with self.subTest(serializer=serializer):
+                self.assertEqual(self.roundtrip(serializer, 120)[0], 120)
+
+    def test_reads_kombu_msgpack(self):
+        self.assertEqual(msgpack_loads(msgpack.packb({'id': 1}, use_bin_type=True)), {'id': 1})
+
+    def test_unknown_compression(self):
+        with self.assertRaises(ValueError):
+            compressed(msgpack_dumps, msgpack_loads, 'lz4')
@@ -0,0 +1,51 @@
+"""
+Tests for the static files manifest startup check.
+"""
+
+import json
+import os
+import tempfile
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from {{ cookiecutter.project_slug }}.core.staticfiles import check_static_manifest
+
+MANIFEST_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
+
+
+class StaticManifestCheckTestCase(SimpleTestCase):
+    """Test that startup fails without the collectstatic manifest."""
+
+    def setUp(self):
+        static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(static_root.cleanup)
+        self.static_root = static_root.name
+
+    def test_missing_manifest(self):
+        with (
+            override_settings(
+                DEBUG=False, STORAGES=MANIFEST_STORAGES, STATIC_ROOT=self.static_root
+            ),
+            self.assertRaisesMessage(ImproperlyConfigured, 'collectstatic'),
+        ):
+            check_static_manifest()
+
+    def test_manifest_present(self):
+        with open(os.path.join(self.static_root, 'staticfiles.json'), 'w') as manifest:
+            json.dump({'version': '1.1', 'paths': {}}, manifest)
+        with override_settings(
+            DEBUG=False, STORAGES=MANIFEST_STORAGES, STATIC_ROOT=self.static_root
+        ):
+            check_static_manifest()
+
+    @override_settings(DEBUG=True, STORAGES=MANIFEST_STORAGES)
+    def test_skipped_in_debug(self):
+        check_static_manifest()
+
+    def test_skipped_without_manifest_storage(self):
+        with override_settings(DEBUG=False, STATIC_ROOT=self.static_root):
+            check_static_manifest()
@@ -0,0 +1,32 @@
+"""
+Tests for the Celery queues and task routes.
+"""
+
+from django.test import SimpleTestCase
+
+from {{ cookiecutter.project_slug }}.celery import app, debug_task
+
+
+def queue_for(name, **options):
+    return app.amqp.router.route(options, name)['queue'].name
+
+
+class TaskRoutesTestCase(SimpleTestCase):
+    """Test that tasks land on the queue of their kind."""
+
+    def test_latency_sensitive_tasks(self):
+        self.assertEqual(queue_for('accounts.tasks.send_welcome_email'), 'critical')
+        self.assertEqual(queue_for('accounts.tasks.clear_expired_tokens'), 'critical')
+
+    def test_bulk_tasks(self):
+        self.assertEqual(queue_for('accounts.tasks.export_users'), 'bulk')
+        self.assertEqual(queue_for('reports.tasks.generate_monthly_report'), 'bulk')
+
+    def test_default_queue(self):
+        self.assertEqual(queue_for(debug_task.name), 'default')
+
+    def test_explicit_queue_wins(self):
+        self.assertEqual(queue_for('accounts.tasks.export_users', queue='critical'), 'critical')
+
+    def test_default_priority(self):
+        self.assertEqual(debug_task.priority, 5)
@@ -0,0 +1,114 @@
+"""
+Tests for the two-tier cache backend.
+"""
+
+import time
+from unittest.mock import patch
+
+import fakeredis
+from django.test import SimpleTestCase, override_settings
+
+from {{ cookiecutter.project_slug }}.core.tiered_cache import TwoTierCache
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TwoTierCacheTestCase(SimpleTestCase):
+    """Test L1 hits, cross-process invalidation and hit ratios."""
+
+    def setUp(self):
+        server = fakeredis.FakeServer()
+        patcher = patch(
+            'redis.Redis.from_url', side_effect=lambda *a, **kw: fakeredis.FakeRedis(server=server)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Two backends sharing L2 and the channel stand in for two worker processes
+        self.cache = self.make_cache()
+        self.other = self.make_cache()
+
+    def make_cache(self, **options):
+        cache = TwoTierCache('redis://cache:6379/2', {'OPTIONS': options})
+        self.addCleanup(setattr, cache, '_listener_pid', None)
+        cache.received = []
+        evict = cache._evict
+        cache._evict = lambda data: (cache.received.append(data), evict(data))
+        cache._ensure_listener()
+        self.assertTrue(cache._listening.wait(2), 'listener did not subscribe')
+        return cache
+
+    def wait_for(self, condition):
+        deadline = time.monotonic() + 2
+        while not condition():
+            self.assertLess(time.monotonic(), deadline, 'condition not met in time')
+            time.sleep(0.01)
+
+    def drain(self, cache):
+        """Wait until ``cache`` has processed every invalidation published so far."""
+        marker = f'drain:{time.monotonic()}'.encode()
+        cache._get_redis().publish(cache._channel, marker)
+        self.wait_for(lambda: marker in cache.received)
+
+    def test_second_read_is_served_from_l1(self):
+        self.cache.set('providers', ['google', 'github'])
+        self.drain(self.cache)
+        self.assertEqual(self.cache.get('providers'), ['google', 'github'])
+        self.assertEqual(self.cache.get('providers'), ['google', 'github'])
+
+        stats = self.cache.stats()
+        self.assertEqual(stats['l1_hits'], 1)
+        self.assertEqual(stats['l2_hits'], 1)
+        self.assertEqual(stats['l1_hit_ratio'], 0.5)
+        self.assertEqual(stats['hit_ratio'], 1.0)
+
+    def test_l1_returns_copies(self):
+        self.cache.set('user', {'name': 'ada'})
+        self.drain(self.cache)
+        self.cache.get('user')
+        self.cache.get('user')['name'] = 'changed'
+        self.assertEqual(self.cache.get('user'), {'name': 'ada'})
+
+    def test_write_invalidates_other_processes(self):
+        self.cache.set('user:1', 'ada')
+        self.drain(self.other)
+        self.assertEqual(self.other.get('user:1'), 'ada')
+        self.assertEqual(self.other.stats()['l1_entries'], 1)
+
+        self.cache.set('user:1', 'grace')
+        self.drain(self.other)
+        self.assertEqual(self.other.stats()['l1_entries'], 0)
+        self.assertEqual(self.other.get('user:1'), 'grace')
+
+    def test_delete_and_clear_invalidate(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.drain(self.other)
+        self.other.get('a')
+        self.other.get('b')
+
+        self.cache.delete('a')
+        self.drain(self.other)
+        self.assertEqual(self.other.stats()['l1_entries'], 1)
+        self.cache.clear()
+        self.drain(self.other)
+        self.assertEqual(self.other.stats()['l1_entries'], 0)
+        self.assertIsNone(self.other.get('b'))
+
+    def test_l1_is_bounded(self):
+        cache = self.make_cache(MAX_ENTRIES=2)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, key)
+            self.drain(cache)
+            cache.get(key)
+        self.assertEqual(cache.stats()['l1_entries'], 2)
+
+    def test_l1_bypassed_without_subscription(self):
+        self.cache.set('key', 'value')
+        self.cache._listening.clear()
+        self.cache.get('key')
+        self.cache.get('key')
+        self.assertEqual(self.cache.stats()['l1_hits'], 0)
+        self.assertEqual(self.cache.stats()['l2_hits'], 2)
@@ -0,0 +1,85 @@
+"""
+Tests for the Server-Timing middleware and request timing instrumentation.
+"""
+
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from {{ cookiecutter.project_slug }}.core.middleware import ServerTimingMiddleware
+from {{ cookiecutter.project_slug }}.core.timing import install_instrumentation
+
+
+def view(request):
+    cache.set('timing-test', 1)
+    cache.get_or_set('timing-test', 2)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.execute('SELECT 2')
+    return HttpResponse()
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ServerTimingMiddlewareTestCase(TestCase):
+    """Test the per-category breakdown of sampled requests."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        install_instrumentation()
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_disabled_without_sample_rate(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ServerTimingMiddleware(view)
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1.0)
+    def test_breakdown(self):
+        middleware = ServerTimingMiddleware(view)
+        with self.assertLogs('{{ cookiecutter.project_slug }}.core.timing', 'INFO') as logs:
+            response = middleware(self.factory.get('/api/accounts/users/me'))
+
+        header = response.headers['Server-Timing']
+        for entry in ('db;', 'cache;', 'http;', 'python;', 'total;'):
+            self.assertIn(entry, header)
+        self.assertIn('db_queries=2', logs.output[0])
+        # get_or_set calls get internally but counts as one call
+        self.assertIn('cache_calls=2', logs.output[0])
+        self.assertIn('http_calls=0', logs.output[0])
+        self.assertIn('path=/api/accounts/users/me', logs.output[0])
+{%- if cookiecutter.include_oauth2 == 'y' %}
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1.0)
+    def test_outbound_requests(self):
+        # requests is installed with the OAuth2 client
+        import requests
+
+        def fake_send(adapter, request, **kwargs):
+            response = requests.Response()
+            response.status_code = 200
+            response._content = b'{}'
+            response.request = request
+            return response
+
+        def outbound_view(request):
+            requests.get('https://provider.invalid/userinfo')
+            return HttpResponse()
+
+        middleware = ServerTimingMiddleware(outbound_view)
+        with (
+            patch('requests.adapters.HTTPAdapter.send', fake_send),
+            self.assertLogs('{{ cookiecutter.project_slug }}.core.timing', 'INFO') as logs,
+        ):
+            middleware(self.factory.get('/'))
+        self.assertIn('http_calls=1', logs.output[0])
+{%- endif %}
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0.5)
+    def test_unsampled_request_has_no_header(self):
+        middleware = ServerTimingMiddleware(lambda request: HttpResponse())
+        with patch('{{ cookiecutter.project_slug }}.core.middleware.random.random', return_value=0.9):
+            response = middleware(self.factory.get('/'))
+        self.assertNotIn('Server-Timing', response.headers)
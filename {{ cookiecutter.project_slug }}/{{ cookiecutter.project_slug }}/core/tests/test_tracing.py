@@ -0,0 +1,147 @@
+"""
+Tests for the OpenTelemetry setup, using an in-memory span exporter.
+"""
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from opentelemetry import trace
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.sdk.trace.sampling import Decision
+from opentelemetry.trace import NonRecordingSpan, SpanContext, SpanKind, TraceFlags
+
+from {{ cookiecutter.project_slug }}.core.tracing import configure_tracing, get_sampler
+
+EXPORTER = InMemorySpanExporter()
+
+
+def finished_spans():
+    trace.get_tracer_provider().force_flush()
+    return EXPORTER.get_finished_spans()
+
+
+def parent_context(sampled):
+    flags = TraceFlags(TraceFlags.SAMPLED if sampled else TraceFlags.DEFAULT)
+    span = NonRecordingSpan(SpanContext(1, 2, is_remote=True, trace_flags=flags))
+    return trace.set_span_in_context(span)
+
+
+class SamplerTestCase(SimpleTestCase):
+    """Test the sampling decisions for new and continued traces."""
+
+    def test_new_traces_use_the_rate(self):
+        self.assertEqual(
+            get_sampler(1.0).should_sample(None, 1, 'GET', SpanKind.SERVER).decision,
+            Decision.RECORD_AND_SAMPLE,
+        )
+        self.assertEqual(
+            get_sampler(0.0).should_sample(None, 1, 'GET', SpanKind.SERVER).decision,
+            Decision.DROP,
+        )
+
+    def test_root_client_spans_are_dropped(self):
+        result = get_sampler(1.0).should_sample(None, 1, 'BRPOP', SpanKind.CLIENT)
+        self.assertEqual(result.decision, Decision.DROP)
+
+    def test_parent_decision_is_followed(self):
+        sampler = get_sampler(0.0)
+        result = sampler.should_sample(parent_context(True), 1, 'run', SpanKind.CONSUMER)
+        self.assertEqual(result.decision, Decision.RECORD_AND_SAMPLE)
+        sampler = get_sampler(1.0)
+        result = sampler.should_sample(parent_context(False), 1, 'run', SpanKind.CONSUMER)
+        self.assertEqual(result.decision, Decision.DROP)
+
+    @override_settings(OTEL_ENABLED=False)
+    def test_disabled(self):
+        self.assertFalse(configure_tracing(exporter=EXPORTER))
+
+
+@override_settings(OTEL_ENABLED=True, OTEL_TRACES_SAMPLE_RATE=1.0)
+class TracingTestCase(TestCase):
+    """Test the spans recorded for requests, outbound calls and tasks."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Adds the tracing middleware to the overridden MIDDLEWARE of this class
+        configure_tracing(exporter=EXPORTER)
+
+    def setUp(self):
+        EXPORTER.clear()
+
+    def test_request_span_has_operation_id(self):
+        user = User.objects.create_user('traced-user', 'traced@example.com')
+        response = self.client.get(reverse('api-1.0.0:get_user_by_id', args=[user.id]))
+        self.assertEqual(response.status_code, 200)
+
+        [span] = [span for span in finished_spans() if span.kind == SpanKind.SERVER]
+        self.assertEqual(
+            span.attributes['ninja.operation_id'],
+            '{{ cookiecutter.project_slug }}_accounts_api_users_get_user_by_id',
+        )
+        self.assertTrue(span.attributes['http.route'].endswith('accounts/users/<user_id>'))
+
+    def test_excluded_urls(self):
+        self.client.get(reverse('metrics'))
+        self.assertEqual([span for span in finished_spans() if span.kind == SpanKind.SERVER], [])
+{%- if cookiecutter.include_oauth2 == 'y' %}
+
+    def test_outbound_request_propagates_context(self):
+        from unittest.mock import patch
+
+        import requests
+
+        def fake_send(adapter, request, **kwargs):
+            response = requests.Response()
+            response.status_code = 200
+            response._content = b'{}'
+            response.request = request
+            return response
+
+        tracer = trace.get_tracer(__name__)
+        with (
+            patch(
+                'requests.adapters.HTTPAdapter.send', autospec=True, side_effect=fake_send
+            ) as send,
+            tracer.start_as_current_span('callback') as parent,
+        ):
+            requests.get('https://provider.invalid/userinfo')
+
+        [client] = [span for span in finished_spans() if span.kind == SpanKind.CLIENT]
+        self.assertEqual(client.parent.span_id, parent.get_span_context().span_id)
+        outgoing = send.call_args.args[1]
+        self.assertIn(format(client.context.span_id, '016x'), outgoing.headers['traceparent'])
+{%- endif %}
+{%- if cookiecutter.use_celery == 'y' %}
+
+    def test_task_continues_publisher_trace(self):
+        import time
+
+        from celery.contrib.testing.worker import start_worker
+
+        from {{ cookiecutter.project_slug }}.celery import app, debug_task
+
+        original = {key: app.conf[key] for key in ('broker_url', 'result_backend')}
+        app.conf.update(CELERY_BROKER_URL='memory://', CELERY_RESULT_BACKEND='cache+memory://')
+        self.addCleanup(app.close)
+        self.addCleanup(
+            app.conf.update,
+            CELERY_BROKER_URL=original['broker_url'],
+            CELERY_RESULT_BACKEND=original['result_backend'],
+        )
+
+        tracer = trace.get_tracer(__name__)
+        with start_worker(app, pool='solo', perform_ping_check=False, loglevel='WARNING'):
+            with tracer.start_as_current_span('request'):
+                debug_task.delay()
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline:
+                spans = {span.kind: span for span in finished_spans()}
+                if SpanKind.CONSUMER in spans:
+                    break
+                time.sleep(0.05)
+
+        producer, consumer = spans[SpanKind.PRODUCER], spans[SpanKind.CONSUMER]
+        self.assertEqual(consumer.context.trace_id, producer.context.trace_id)
+        self.assertEqual(consumer.parent.span_id, producer.context.span_id)
+{%- endif %}
@@ -0,0 +1,214 @@
+"""
+Tests for the deduplication of unique Celery tasks.
+"""
+
+import time
+from unittest.mock import PropertyMock, patch
+
+import fakeredis
+import redis
+from celery.exceptions import Ignore
+from django.test import SimpleTestCase
+
+from {{ cookiecutter.project_slug }}.celery import app
+from {{ cookiecutter.project_slug }}.core.serialization import msgpack_dumps, msgpack_loads
+from {{ cookiecutter.project_slug }}.core.unique import UniqueTask
+
+
+@app.task(name='core.tests.test_unique.refresh', unique='publish')
+def refresh(team_id, full=False):
+    return team_id
+
+
+@app.task(name='core.tests.test_unique.recompute', unique='execute', ignore_result=False)
+def recompute(pk):
+    recompute.runs += 1
+    if pk < 0:
+        raise ValueError('negative')
+    return pk * 2
+
+
+class Snapshot:
+    """A result msgpack cannot encode."""
+
+
+@app.task(name='core.tests.test_unique.snapshot', unique='execute', ignore_result=False)
+def snapshot(pk):
+    return Snapshot()
+
+
+class UniqueTaskTestCase(SimpleTestCase):
+    """Test dropping duplicates at publish time and coalescing them at execution."""
+
+    def setUp(self):
+        self.client = fakeredis.FakeRedis()
+        patcher = patch.object(UniqueTask, 'lock_client', new_callable=PropertyMock)
+        patcher.start().return_value = self.client
+        self.addCleanup(patcher.stop)
+        recompute.runs = 0
+
+    def publishing(self):
+        """Capture published messages, returning results with their task id."""
+        return patch.object(
+            app,
+            'send_task',
+            side_effect=lambda *args, **options: app.AsyncResult(options['task_id']),
+        )
+
+    def run_task(self, task, *args, task_id='leader', published=None):
+        """Run a task as the worker would, with the headers ``apply_async`` set."""
+        task.push_request(
+            id=task_id,
+            called_directly=False,
+            unique_key=task.unique_key(args, {}),
+            unique_published=published or time.time(),
+        )
+        try:
+            return task(*args)
+        finally:
+            task.pop_request()
+
+    def test_key_normalizes_arguments(self):
+        key = refresh.unique_key((1,), {})
+        self.assertEqual(refresh.unique_key((), {'team_id': 1, 'full': False}), key)
+        self.assertEqual(refresh.unique_key((1, False), {}), key)
+        self.assertNotEqual(refresh.unique_key((1,), {'full': True}), key)
+        self.assertNotEqual(recompute.unique_key((1,), {}), key)
+
+    def test_duplicate_is_dropped_while_queued(self):
+        with self.publishing() as send_task:
+            first = refresh.delay(1)
+            second = refresh.delay(team_id=1)
+            other = refresh.delay(2)
+
+        self.assertEqual(second.id, first.id)
+        self.assertNotEqual(other.id, first.id)
+        self.assertEqual(send_task.call_count, 2)
+        self.assertEqual(
+            send_task.call_args.kwargs['headers']['unique_key'], refresh.unique_key((2,), {})
+        )
+
+    def test_lock_is_released_when_task_starts(self):
+        with self.publishing():
+            first = refresh.delay(1)
+            self.run_task(refresh, 1, task_id=first.id)
+            second = refresh.delay(1)
+
+        self.assertNotEqual(second.id, first.id)
+
+    def test_retry_of_queued_task_is_published(self):
+        with self.publishing() as send_task:
+            first = refresh.delay(1)
+            retried = refresh.apply_async((1,), task_id=first.id)
+
+        self.assertEqual(retried.id, first.id)
+        self.assertEqual(send_task.call_count, 2)
+
+    def test_lock_is_released_when_publish_fails(self):
+        with (
+            patch.object(app, 'send_task', side_effect=ConnectionError('broker down')),
+            self.assertRaises(ConnectionError),
+        ):
+            refresh.delay(1)
+
+        with self.publishing() as send_task:
+            refresh.delay(1)
+
+        send_task.assert_called_once()
+
+    def test_execution_runs_once_and_releases(self):
+        self.assertEqual(self.run_task(recompute, 3), 6)
+        self.assertEqual(self.run_task(recompute, 3, task_id='later'), 6)
+        self.assertEqual(recompute.runs, 2)
+        self.assertEqual(self.client.keys('*:running'), [])
+
+    def test_waiter_gets_result_of_running_execution(self):
+        key = recompute.unique_key((3,), {})
+        self.client.set(f'{key}:running', 'leader')
+        with self.assertRaises(Ignore):
+            self.run_task(recompute, 3, task_id='waiter')
+
+        with patch.object(UniqueTask, 'backend', new_callable=PropertyMock) as backend:
+            self.assertEqual(self.run_task(recompute, 3), 6)
+
+        backend.return_value.mark_as_done.assert_called_once_with('waiter', 6)
+        self.assertEqual(recompute.runs, 1)
+
+    def test_waiter_gets_error_of_running_execution(self):
+        key = recompute.unique_key((-1,), {})
+        self.client.set(f'{key}:running', 'leader')
+        with self.assertRaises(Ignore):
+            self.run_task(recompute, -1, task_id='waiter')
+
+        with (
+            patch.object(UniqueTask, 'backend', new_callable=PropertyMock) as backend,
+            self.assertRaises(ValueError),
+        ):
+            self.run_task(recompute, -1)
+
+        failure = backend.return_value.mark_as_failure
+        self.assertEqual(failure.call_args.args[0], 'waiter')
+        self.assertIsInstance(failure.call_args.args[1], ValueError)
+        self.assertEqual(self.client.keys('*:running'), [])
+
+    def join_waiter(self, task, *args):
+        """Queue a duplicate behind a running execution of ``leader``."""
+        self.client.set(f'{task.unique_key(args, {})}:running', 'leader')
+        with self.assertRaises(Ignore):
+            self.run_task(task, *args, task_id='waiter')
+
+    def test_unencodable_result_fails_waiters(self):
+        self.join_waiter(snapshot, 1)
+        with patch.object(UniqueTask, 'backend', new_callable=PropertyMock) as backend:
+            # A result backend that can store it
+            backend.return_value.serializer = 'pickle'
+            self.assertIsInstance(self.run_task(snapshot, 1), Snapshot)
+
+        failure = backend.return_value.mark_as_failure
+        self.assertEqual(failure.call_args.args[0], 'waiter')
+        self.assertIsInstance(failure.call_args.args[1], TypeError)
+        self.assertEqual(self.client.keys('*:running'), [])
+
+    def test_store_error_still_releases(self):
+        self.join_waiter(recompute, 3)
+        set_key = self.client.set
+
+        def failing_set(name, *args, **kwargs):
+            if name.endswith(':done'):
+                raise redis.ConnectionError('Redis went away')
+            return set_key(name, *args, **kwargs)
+
+        with (
+            patch.object(self.client, 'set', side_effect=failing_set),
+            patch.object(UniqueTask, 'backend', new_callable=PropertyMock) as backend,
+        ):
+            self.assertEqual(self.run_task(recompute, 3), 6)
+
+        backend.return_value.mark_as_done.assert_called_once_with('waiter', 6)
+        self.assertEqual(self.client.keys('*:running'), [])
+
+    def test_times_come_from_lock_server(self):
+        with (
+            patch.object(self.client, 'time', return_value=(1000, 500000)),
+            self.publishing() as send_task,
+        ):
+            recompute.delay(3)
+            self.run_task(recompute, 3, published=1000.0)
+
+        self.assertEqual(send_task.call_args.kwargs['headers']['unique_published'], 1000.5)
+        done = self.client.get(f'{recompute.unique_key((3,), {})}:done')
+        self.assertEqual(msgpack_loads(done), [1000.5, 6])
+
+    def test_queued_duplicate_takes_finished_result(self):
+        key = recompute.unique_key((3,), {})
+        self.client.set(f'{key}:done', msgpack_dumps([time.time(), 6]))
+
+        self.assertEqual(self.run_task(recompute, 3, published=time.time() - 10), 6)
+        self.assertEqual(recompute.runs, 0)
+        # Published after that execution started, so it runs again
+        self.assertEqual(self.run_task(recompute, 3, published=time.time() + 10), 6)
+        self.assertEqual(recompute.runs, 1)
+
+    def test_unknown_mode(self):
+        with patch.object(refresh, 'unique', 'sometimes'), self.assertRaises(ValueError):
+            refresh.delay(1)
@@ -0,0 +1,54 @@
+"""
+Tests for the Celery worker presets.
+"""
+
+import os
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from {{ cookiecutter.project_slug }}.core.worker_presets import get_worker_preset
+
+
+@patch('os.cpu_count', return_value=4)
+class WorkerPresetTestCase(SimpleTestCase):
+    """Test the CPU and I/O presets and their environment overrides."""
+
+    def test_cpu_preset(self, cpu_count):
+        preset = get_worker_preset('cpu')
+        self.assertEqual(preset['pool'], 'prefork')
+        self.assertEqual(preset['concurrency'], 4)
+        self.assertEqual(preset['prefetch_multiplier'], 1)
+        self.assertEqual(preset['max_tasks_per_child'], 1000)
+        self.assertLess(preset['soft_time_limit'], preset['time_limit'])
+
+    def test_io_preset(self, cpu_count):
+        preset = get_worker_preset('io')
+        self.assertEqual(preset['pool'], 'threads')
+        self.assertEqual(preset['concurrency'], 64)
+        self.assertIsNone(preset['max_memory_per_child'])
+
+    @patch.dict(os.environ, {'CELERY_WORKER_PRESET': 'io'})
+    def test_preset_from_environment(self, cpu_count):
+        self.assertEqual(get_worker_preset()['pool'], 'threads')
+
+    @patch.dict(
+        os.environ,
+        {
+            'CELERY_WORKER_CONCURRENCY': '2',
+            'CELERY_WORKER_MAX_TASKS_PER_CHILD': 'None',
+            'CELERY_TASK_SOFT_TIME_LIMIT': '600',
+            'CELERY_TASK_TIME_LIMIT': '7200',
+        },
+    )
+    def test_environment_overrides(self, cpu_count):
+        preset = get_worker_preset('cpu')
+        self.assertEqual(preset['concurrency'], 2)
+        self.assertIsNone(preset['max_tasks_per_child'])
+        self.assertEqual(preset['soft_time_limit'], 600)
+        # Late-acked tasks must finish before the broker redelivers them
+        self.assertGreater(preset['visibility_timeout'], 7200)
+
+    def test_unknown_preset(self, cpu_count):
+        with self.assertRaisesMessage(ValueError, "Unknown Celery worker preset 'gpu'"):
+            get_worker_preset('gpu')
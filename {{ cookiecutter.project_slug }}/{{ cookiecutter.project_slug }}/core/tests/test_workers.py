@@ -0,0 +1,84 @@
+"""
+Tests for the pre-forking worker helpers.
+"""
+
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+from django.db import DatabaseError
+from django.test import SimpleTestCase
+
+from {{ cookiecutter.project_slug }}.core.workers import (
+    close_parent_connections,
+    format_memory_usage,
+    get_memory_usage,
+    open_worker_connections,
+)
+
+
+class ConnectionsTestCase(SimpleTestCase):
+    """Test closing connections before fork and opening them in workers."""
+
+    @patch('{{ cookiecutter.project_slug }}.core.workers.caches')
+    @patch('{{ cookiecutter.project_slug }}.core.workers.connections')
+    def test_close_parent_connections_closes_pools(self, connections, caches):
+        connection, cache = MagicMock(), MagicMock()
+        connections.all.return_value = [connection]
+        caches.all.return_value = [cache]
+        close_parent_connections()
+        connection.close.assert_called_once_with()
+        connection.close_pool.assert_called_once_with()
+        cache.close.assert_called_once_with()
+
+    @patch('{{ cookiecutter.project_slug }}.core.workers.caches')
+    @patch('{{ cookiecutter.project_slug }}.core.workers.connections')
+    def test_open_worker_connections_returns_pooled_connection(self, connections, caches):
+        connection = connections.__getitem__.return_value
+        connection.settings_dict = {'OPTIONS': {'pool': {'min_size': 2}}}
+        open_worker_connections()
+        connection.ensure_connection.assert_called()
+        connection.close.assert_called()
+        caches.__getitem__.return_value.get.assert_called()
+
+    @patch('{{ cookiecutter.project_slug }}.core.workers.caches')
+    @patch('{{ cookiecutter.project_slug }}.core.workers.connections')
+    def test_threaded_worker_skips_unpooled_database(self, connections, caches):
+        connection = connections.__getitem__.return_value
+        connection.settings_dict = {'OPTIONS': {}}
+        open_worker_connections(threaded=True)
+        connection.ensure_connection.assert_not_called()
+        caches.__getitem__.return_value.get.assert_called()
+
+        connection.settings_dict = {'OPTIONS': {'pool': {'min_size': 2}}}
+        open_worker_connections(threaded=True)
+        connection.ensure_connection.assert_called()
+
+    @patch('{{ cookiecutter.project_slug }}.core.workers.caches')
+    @patch('{{ cookiecutter.project_slug }}.core.workers.connections')
+    def test_open_worker_connections_logs_failures(self, connections, caches):
+        connections.__getitem__.return_value.ensure_connection.side_effect = DatabaseError('down')
+        caches.__getitem__.return_value.get.side_effect = ConnectionError('down')
+        with self.assertLogs('{{ cookiecutter.project_slug }}.core.workers', 'WARNING') as logs:
+            open_worker_connections()
+        self.assertTrue(any('Could not connect to database' in line for line in logs.output))
+        self.assertTrue(any('Could not connect to cache' in line for line in logs.output))
+
+
+class MemoryUsageTestCase(SimpleTestCase):
+    """Test reading process memory from /proc."""
+
+    @unittest.skipUnless(os.path.exists('/proc/self/smaps_rollup'), 'requires Linux 4.14+')
+    def test_current_process(self):
+        usage = get_memory_usage()
+        self.assertGreater(usage['rss'], 0)
+        self.assertEqual(usage['rss'], usage['shared'] + usage['private'])
+
+    def test_unknown_process(self):
+        self.assertEqual(get_memory_usage(-1), {})
+
+    def test_format(self):
+        self.assertEqual(
+            format_memory_usage({'rss': 3 * 2**20, 'shared': 2**19}),
+            'rss=3.0MiB shared=0.5MiB',
+        )
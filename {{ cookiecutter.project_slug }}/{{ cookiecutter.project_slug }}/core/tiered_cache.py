@@ -0,0 +1,268 @@
+"""
+Two-Tier Cache
+
+This module contains a cache backend with a bounded in-process LRU (L1) in
+front of another cache alias (L2, the ``django_redis`` ``default`` cache).
+Writes go to L2 and are broadcast over Redis pub/sub so every gunicorn and
+Celery process evicts the key from its L1.
+
+L1 is only used while the process is subscribed to the invalidation channel;
+after a disconnect it is cleared and bypassed until the subscription is back,
+so a missed invalidation can never be served.
+"""
+
+import contextlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+import redis
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+_MISSING = object()
+
+# Invalidation message that clears every L1
+CLEAR_ALL = b'*'
+
+
+class LocalLRU:
+    """Thread-safe LRU of pickled values with a per-entry expiry."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.generation = 0
+        self._data: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, pickled = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+        return pickle.loads(pickled)
+
+    def set(self, key: str, value: Any, timeout: float, generation: int) -> None:
+        """Store ``value`` unless an invalidation arrived since ``generation``."""
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._data[key] = (time.monotonic() + timeout, pickled)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self.generation += 1
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+
+
+class TwoTierCache(BaseCache):
+    """
+    Cache backend with an in-process L1 in front of another cache alias.
+
+    ``LOCATION`` is the Redis URL used for the invalidation channel. Options:
+
+    * ``L2_CACHE``: alias of the shared cache (default ``'default'``)
+    * ``MAX_ENTRIES``: L1 size per process (default 1000)
+    * ``L1_TIMEOUT``: upper bound in seconds for how long L1 keeps a value
+      (default 30). It also bounds staleness for keys that expire in L2, which
+      does not broadcast expiry.
+    * ``CHANNEL``: pub/sub channel name
+    """
+
+    def __init__(self, server: str, params: dict[str, Any]):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._server = server
+        self._l2_alias = options.get('L2_CACHE', 'default')
+        self._l1_timeout = float(options.get('L1_TIMEOUT', 30))
+        self._channel = options.get('CHANNEL', 'cache:invalidate')
+        self._local = LocalLRU(int(options.get('MAX_ENTRIES', 1000)))
+        self._stats = dict.fromkeys(('l1_hits', 'l1_misses', 'l2_hits', 'l2_misses'), 0)
+        self._stats_lock = threading.Lock()
+        self._redis: redis.Redis | None = None
+        self._listening = threading.Event()
+        self._listener_pid: int | None = None
+        self._listener_lock = threading.Lock()
+
+    @property
+    def l2(self) -> BaseCache:
+        return caches[self._l2_alias]
+
+    # L1 bookkeeping
+
+    def _get_redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(
+                self._server,
+                socket_connect_timeout=1.0,
+                socket_timeout=5.0,
+                health_check_interval=30,
+            )
+        return self._redis
+
+    def _ensure_listener(self) -> bool:
+        """Start the invalidation listener in this process; return True if subscribed."""
+        if self._listener_pid != os.getpid():
+            with self._listener_lock:
+                if self._listener_pid != os.getpid():
+                    # Forked child: the parent's thread and L1 contents are not ours
+                    self._listener_pid = os.getpid()
+                    self._listening.clear()
+                    self._local.clear()
+                    threading.Thread(
+                        target=self._listen, name='cache-invalidation', daemon=True
+                    ).start()
+        return self._listening.is_set()
+
+    def _listen(self) -> None:
+        pid = os.getpid()
+        backoff = 0.1
+        while self._listener_pid == pid:
+            pubsub = self._get_redis().pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self._channel)
+                # Anything cached before the subscription may have missed invalidations
+                self._local.clear()
+                self._listening.set()
+                backoff = 0.1
+                while self._listener_pid == pid:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self._evict(message['data'])
+            except redis.RedisError:
+                self._listening.clear()
+                self._local.clear()
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 5.0)
+            finally:
+                pubsub.close()
+
+    def _evict(self, data: bytes) -> None:
+        if data == CLEAR_ALL:
+            self._local.clear()
+        else:
+            self._local.delete(data.decode())
+
+    def _invalidate(self, *keys: str) -> None:
+        for key in keys:
+            self._local.delete(key)
+        # If publishing fails, other processes keep the old value for at most L1_TIMEOUT
+        with contextlib.suppress(redis.RedisError):
+            client = self._get_redis()
+            for key in keys:
+                client.publish(self._channel, key)
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return hit counters and ratios for both tiers in this process.
+
+        ``l2_hit_ratio`` is relative to L1 misses, ``hit_ratio`` to all reads.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        reads = stats['l1_hits'] + stats['l1_misses']
+        l2_reads = stats['l2_hits'] + stats['l2_misses']
+        stats['l1_hit_ratio'] = stats['l1_hits'] / reads if reads else 0.0
+        stats['l2_hit_ratio'] = stats['l2_hits'] / l2_reads if l2_reads else 0.0
+        stats['hit_ratio'] = (stats['l1_hits'] + stats['l2_hits']) / reads if reads else 0.0
+        stats['l1_entries'] = len(self._local)
+        return stats
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self._stats = dict.fromkeys(self._stats, 0)
+
+    # Cache API
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        use_local = self._ensure_listener()
+        if use_local:
+            value = self._local.get(local_key)
+            if value is not _MISSING:
+                self._count('l1_hits')
+                return value
+        self._count('l1_misses')
+
+        generation = self._local.generation
+        value = self.l2.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            self._count('l2_misses')
+            return default
+        self._count('l2_hits')
+        if use_local:
+            self._local.set(local_key, value, self._l1_timeout, generation)
+        return value
+
+    def get_many(self, keys, version=None):
+        return {
+            key: value
+            for key in keys
+            if (value := self.get(key, _MISSING, version=version)) is not _MISSING
+        }
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l2.set(key, value, timeout=timeout, version=version)
+        self._invalidate(self.make_and_validate_key(key, version=version))
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.l2.add(key, value, timeout=timeout, version=version)
+        if added:
+            self._invalidate(self.make_and_validate_key(key, version=version))
+        return added
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.l2.set_many(data, timeout=timeout, version=version)
+        self._invalidate(*(self.make_and_validate_key(key, version=version) for key in data))
+        return failed
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.l2.touch(key, timeout=timeout, version=version)
+
+    def delete(self, key, version=None):
+        deleted = self.l2.delete(key, version=version)
+        self._invalidate(self.make_and_validate_key(key, version=version))
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self.l2.delete_many(keys, version=version)
+        self._invalidate(*(self.make_and_validate_key(key, version=version) for key in keys))
+
+    def incr(self, key, delta=1, version=None):
+        value = self.l2.incr(key, delta, version=version)
+        self._invalidate(self.make_and_validate_key(key, version=version))
+        return value
+
+    def clear(self):
+        self.l2.clear()
+        self._local.clear()
+        with contextlib.suppress(redis.RedisError):
+            self._get_redis().publish(self._channel, CLEAR_ALL)
@@ -0,0 +1,152 @@
+"""
+Request Timing
+
+This module contains the instrumentation behind ``ServerTimingMiddleware``: a
+per-request timer that attributes wall time to database queries, cache calls,
+outbound HTTP requests and the remaining Python time. The timer lives in a
+context variable, so instrumented calls outside a sampled request only pay for
+one lookup.
+"""
+
+import functools
+import logging
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
+from typing import Any
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ('db', 'cache', 'http')
+
+# Cache methods timed as one call each; nested calls (get_or_set -> get) count once
+CACHE_METHODS = (
+    'add',
+    'get',
+    'set',
+    'touch',
+    'delete',
+    'get_many',
+    'get_or_set',
+    'has_key',
+    'incr',
+    'decr',
+    'set_many',
+    'delete_many',
+    'clear',
+)
+
+_current_timer: ContextVar['RequestTimer | None'] = ContextVar('request_timer', default=None)
+
+
+class RequestTimer:
+    """Accumulate time and call counts per category for one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = dict.fromkeys(CATEGORIES, 0.0)
+        self.counts = dict.fromkeys(CATEGORIES, 0)
+        self._active: set[str] = set()
+
+    def measure(self, category: str, func: Callable, *args, **kwargs) -> Any:
+        """Call ``func`` and add its duration to ``category``."""
+        if category in self._active:
+            return func(*args, **kwargs)
+        self._active.add(category)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.durations[category] += time.perf_counter() - start
+            self.counts[category] += 1
+            self._active.discard(category)
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """Database ``execute_wrapper`` that times every query."""
+        return self.measure('db', execute, sql, params, many, context)
+
+    def summary(self) -> dict[str, float]:
+        """Return milliseconds per category plus ``python`` and ``total``."""
+        total = time.perf_counter() - self.started
+        timings = {category: self.durations[category] * 1000 for category in CATEGORIES}
+        timings['python'] = max(total * 1000 - sum(timings.values()), 0.0)
+        timings['total'] = total * 1000
+        return timings
+
+    def server_timing(self, timings: dict[str, float]) -> str:
+        """Format :meth:`summary` as a ``Server-Timing`` header value."""
+        entries = []
+        for name, duration in timings.items():
+            entry = f'{name};dur={duration:.1f}'
+            if name in self.counts:
+                entry += f';desc="{self.counts[name]} calls"'
+            entries.append(entry)
+        return ', '.join(entries)
+
+
+def start_timer() -> tuple[RequestTimer, Any]:
+    """Start timing the current request; pass the token to :func:`stop_timer`."""
+    timer = RequestTimer()
+    return timer, _current_timer.set(timer)
+
+
+def stop_timer(token: Any) -> None:
+    _current_timer.reset(token)
+
+
+def log_timings(request, response, timer: RequestTimer, timings: dict[str, float]) -> None:
+    """Log the timings of a request as one ``key=value`` line."""
+    logger.info(
+        'method=%s path=%s status=%s total_ms=%.1f python_ms=%.1f db_ms=%.1f db_queries=%d '
+        'cache_ms=%.1f cache_calls=%d http_ms=%.1f http_calls=%d',
+        request.method,
+        request.path,
+        response.status_code,
+        timings['total'],
+        timings['python'],
+        timings['db'],
+        timer.counts['db'],
+        timings['cache'],
+        timer.counts['cache'],
+        timings['http'],
+        timer.counts['http'],
+    )
+
+
+def timed(category: str, func: Callable) -> Callable:
+    """Wrap ``func`` so calls inside a timed request count towards ``category``."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        timer = _current_timer.get()
+        if timer is None:
+            return func(*args, **kwargs)
+        return timer.measure(category, func, *args, **kwargs)
+
+    wrapper.request_timing = True
+    return wrapper
+
+
+def _instrument(cls: type, methods: tuple[str, ...], category: str) -> None:
+    for name in methods:
+        method = getattr(cls, name, None)
+        if method is not None and not getattr(method, 'request_timing', False):
+            setattr(cls, name, timed(category, method))
+
+
+def install_instrumentation() -> None:
+    """
+    Time the cache backends in ``CACHES`` and outbound ``requests`` calls.
+
+    Patches the classes once per process; safe to call repeatedly.
+    """
+    for options in settings.CACHES.values():
+        _instrument(import_string(options['BACKEND']), CACHE_METHODS, 'cache')
+    try:
+        import requests
+    except ImportError:
+        return
+    _instrument(requests.Session, ('send',), 'http')
@@ -0,0 +1,160 @@
+"""
+Tracing
+
+This module contains the OpenTelemetry setup shared by the web and Celery
+processes. ``configure_tracing()`` installs a tracer provider with a batch span
+processor and instruments Django (Ninja operations included), psycopg, redis,
+requests and Celery. The Celery instrumentation injects the trace context into
+the task headers on publish and continues it in the worker, so one trace covers
+the request, the broker hop and the task.
+"""
+
+import importlib
+import logging
+
+from django.conf import settings
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+)
+from opentelemetry.sdk.trace.sampling import (
+    Decision,
+    ParentBased,
+    Sampler,
+    SamplingResult,
+    TraceIdRatioBased,
+)
+from opentelemetry.trace import SpanKind
+
+logger = logging.getLogger(__name__)
+
+_configured = False
+
+
+class RootSpanSampler(Sampler):
+    """
+    Sample traces that start at a request, task or publish at a fixed rate.
+
+    Client spans without a parent (broker polling, the cache invalidation
+    listener, queries at startup) are dropped rather than sampled as traces of
+    their own.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._ratio = TraceIdRatioBased(rate)
+
+    def should_sample(
+        self,
+        parent_context,
+        trace_id,
+        name,
+        kind=None,
+        attributes=None,
+        links=None,
+        trace_state=None,
+    ) -> SamplingResult:
+        if kind == SpanKind.CLIENT:
+            return SamplingResult(Decision.DROP)
+        return self._ratio.should_sample(
+            parent_context, trace_id, name, kind, attributes, links, trace_state
+        )
+
+    def get_description(self) -> str:
+        return f'RootSpanSampler(rate={self.rate})'
+
+
+def get_sampler(rate: float) -> Sampler:
+    """Follow the caller's sampling decision, or sample new traces at ``rate``."""
+    return ParentBased(root=RootSpanSampler(rate))
+
+
+def get_exporter() -> SpanExporter | None:
+    """
+    Return the exporter selected by ``OTEL_TRACES_EXPORTER``.
+
+    ``otlp`` sends OTLP over HTTP to ``OTEL_EXPORTER_OTLP_ENDPOINT``, ``console``
+    prints spans, ``none`` records nothing.
+    """
+    name = settings.OTEL_TRACES_EXPORTER
+    if name == 'otlp':
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        return OTLPSpanExporter()
+    if name == 'console':
+        return ConsoleSpanExporter()
+    return None
+
+
+def _add_operation_id(span, request, response) -> None:
+    from .metrics import get_operation_id
+
+    if span.is_recording():
+        span.set_attribute('ninja.operation_id', get_operation_id(request))
+
+
+def instrument() -> None:
+    """Instrument Django, psycopg, redis, requests and Celery in this process."""
+    from opentelemetry.instrumentation.django import DjangoInstrumentor
+    from opentelemetry.instrumentation.psycopg import PsycopgInstrumentor
+    from opentelemetry.instrumentation.redis import RedisInstrumentor
+
+    # Inserts its middleware first in MIDDLEWARE: call before the application is loaded
+    DjangoInstrumentor().instrument(
+        response_hook=_add_operation_id, excluded_urls=settings.OTEL_EXCLUDED_URLS
+    )
+    PsycopgInstrumentor().instrument(skip_dep_check=True)
+    RedisInstrumentor().instrument()
+    # requests (OAuth2 provider calls) and Celery are only installed with those features
+    for module, name in (
+        ('opentelemetry.instrumentation.requests', 'RequestsInstrumentor'),
+        ('opentelemetry.instrumentation.celery', 'CeleryInstrumentor'),
+    ):
+        try:
+            instrumentor = getattr(importlib.import_module(module), name)
+        except ImportError:
+            continue
+        instrumentor().instrument()
+
+
+def configure_tracing(exporter: SpanExporter | None = None) -> bool:
+    """
+    Set up tracing for this process if ``OTEL_ENABLED`` is on.
+
+    Call once per process before the WSGI/ASGI application is created, and in
+    each Celery worker process. Safe to call repeatedly.
+
+    Args:
+        exporter: Exporter to use instead of the one from ``OTEL_TRACES_EXPORTER``
+
+    Returns:
+        True if tracing is active
+    """
+    global _configured
+    if not getattr(settings, 'OTEL_ENABLED', False):
+        return False
+    if _configured:
+        return True
+
+    provider = TracerProvider(
+        resource=Resource.create({'service.name': settings.OTEL_SERVICE_NAME}),
+        sampler=get_sampler(settings.OTEL_TRACES_SAMPLE_RATE),
+    )
+    exporter = exporter or get_exporter()
+    if exporter is not None:
+        # Spans are exported from a background thread in batches, off the request path
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    instrument()
+    _configured = True
+    logger.info(
+        'Tracing enabled: service=%s sample_rate=%s exporter=%s',
+        settings.OTEL_SERVICE_NAME,
+        settings.OTEL_TRACES_SAMPLE_RATE,
+        type(exporter).__name__ if exporter is not None else None,
+    )
+    return True
@@ -0,0 +1,227 @@
+"""
+Unique Celery Tasks
+
+This module contains the deduplication of tasks that get enqueued many times
+for the same work, such as beat jobs piling up behind a slow queue or
+recomputations triggered on every save. Duplicates share a key made of the
+task name and its normalized arguments, and Redis locks with a TTL keep them
+apart, in one of two modes set with ``@shared_task(unique=...)``:
+
+* ``publish``: a duplicate published while one is still queued is dropped,
+  and ``apply_async()`` returns the ``AsyncResult`` of the queued task
+* ``execute``: every duplicate is queued, but one execution at a time runs
+  the task, and duplicates queued before it started take over its result
+"""
+
+import hashlib
+import inspect
+import logging
+from functools import cache
+from typing import Any
+
+import orjson
+import redis
+from celery import uuid
+from celery.backends.base import DisabledBackend
+from celery.exceptions import Ignore, Retry
+from django.conf import settings
+
+from .claim_check import ClaimCheckTask
+from .serialization import msgpack_dumps, msgpack_loads
+
+logger = logging.getLogger(__name__)
+
+UNIQUE_MODES = ('publish', 'execute')
+
+# Delete a lock only if it is still held by the given owner
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Join the waiters of the running execution, if there is one
+WAIT_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 1 then
+    redis.call('sadd', KEYS[2], ARGV[1])
+    redis.call('expire', KEYS[2], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# Release the lock and hand over the waiters that joined while it was held
+FINISH_SCRIPT = """
+local waiters = redis.call('smembers', KEYS[2])
+redis.call('del', KEYS[2])
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    redis.call('del', KEYS[1])
+end
+return waiters
+"""
+
+
+@cache
+def get_lock_client(url: str) -> redis.Redis:
+    return redis.Redis.from_url(url)
+
+
+def normalize_arguments(func, args: tuple | list, kwargs: dict[str, Any]) -> dict[str, Any]:
+    """
+    Map arguments to parameter names, with defaults filled in.
+
+    ``f(1)``, ``f(a=1)`` and ``f(1, b=2)`` (where ``b`` defaults to 2) all
+    normalize to ``{'a': 1, 'b': 2}``. Arguments that do not fit the signature
+    are returned as they are, so they still produce a stable key.
+    """
+    try:
+        bound = inspect.signature(func).bind(*args, **kwargs)
+    except (TypeError, ValueError):
+        return {'args': list(args), 'kwargs': kwargs}
+    bound.apply_defaults()
+    return bound.arguments
+
+
+def make_unique_key(name: str, arguments: dict[str, Any]) -> str:
+    """Key of a task name and its normalized arguments."""
+    data = orjson.dumps(
+        arguments, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+    )
+    return f'unique:{name}:{hashlib.sha256(data).hexdigest()}'
+
+
+class UniqueTask(ClaimCheckTask):
+    """
+    Task that can deduplicate itself by name and arguments.
+
+    Set ``unique = 'publish'`` or ``unique = 'execute'`` on a task (see the
+    module docstring), and optionally ``unique_ttl`` in seconds, which defaults
+    to ``TASK_UNIQUE_TTL``. The TTL bounds how long a crashed worker can hold a
+    lock, so it must exceed the longest queue wait plus run time of the task.
+    Override :meth:`unique_key` to ignore some arguments. Only calls through
+    ``apply_async()`` or ``delay()`` are deduplicated.
+    """
+
+    #: ``publish``, ``execute`` or ``None`` (no deduplication)
+    unique: str | None = None
+    #: Seconds a lock is held at most, defaults to ``TASK_UNIQUE_TTL``
+    unique_ttl: int | None = None
+
+    @property
+    def lock_client(self) -> redis.Redis:
+        return get_lock_client(settings.TASK_LOCK_URL or self.app.conf.broker_url)
+
+    def lock_time(self) -> float:
+        """Time on the lock server, so publishers and workers compare one clock."""
+        seconds, microseconds = self.lock_client.time()
+        return seconds + microseconds / 1_000_000
+
+    def get_unique_ttl(self) -> int:
+        return self.unique_ttl or settings.TASK_UNIQUE_TTL
+
+    def unique_key(self, args: tuple | list, kwargs: dict[str, Any]) -> str:
+        """Key shared by duplicates of a call."""
+        return make_unique_key(self.name, normalize_arguments(self.run, args, kwargs))
+
+    def apply_async(self, args=None, kwargs=None, task_id=None, **options):
+        if self.unique is None or self.app.conf.task_always_eager:
+            return super().apply_async(args, kwargs, task_id=task_id, **options)
+        if self.unique not in UNIQUE_MODES:
+            raise ValueError(f'Unknown unique mode {self.unique!r} of {self.name}')
+
+        key = self.unique_key(args or (), kwargs or {})
+        headers = {**(options.pop('headers', None) or {}), 'unique_key': key}
+        task_id = task_id or uuid()
+        if self.unique == 'execute':
+            headers['unique_published'] = self.lock_time()
+            return super().apply_async(args, kwargs, task_id=task_id, headers=headers, **options)
+
+        queued = self._queued(key, task_id)
+        if queued is not None:
+            logger.debug('Dropped duplicate of %s task %s', self.name, queued)
+            return self.AsyncResult(queued)
+        try:
+            return super().apply_async(args, kwargs, task_id=task_id, headers=headers, **options)
+        except BaseException:
+            # Nothing was queued, so duplicates must not be dropped until the TTL
+            self.lock_client.eval(RELEASE_SCRIPT, 1, key, task_id)
+            raise
+
+    def _queued(self, key: str, task_id: str) -> str | None:
+        """Lock the key for a task, or return the id of the task holding it."""
+        while not self.lock_client.set(key, task_id, nx=True, ex=self.get_unique_ttl()):
+            queued = self.lock_client.get(key)
+            # Otherwise the lock expired in between
+            if queued is not None:
+                queued = queued.decode()
+                # A retry of the queued task is published again
+                return None if queued == task_id else queued
+        return None
+
+    def __call__(self, *args, **kwargs):
+        key = getattr(self.request, 'unique_key', None)
+        if key is None or self.request.called_directly:
+            return super().__call__(*args, **kwargs)
+        if self.unique == 'publish':
+            # Running: calls from now on may see newer data, so they are queued again
+            self.lock_client.eval(RELEASE_SCRIPT, 1, key, self.request.id)
+            return super().__call__(*args, **kwargs)
+        return self._coalesce(key, args, kwargs)
+
+    def _coalesce(self, key: str, args: tuple, kwargs: dict[str, Any]) -> Any:
+        client, task_id, ttl = self.lock_client, self.request.id, self.get_unique_ttl()
+        lock_key, waiters_key, done_key = f'{key}:running', f'{key}:waiters', f'{key}:done'
+        published = getattr(self.request, 'unique_published', None) or self.lock_time()
+
+        while True:
+            done = client.get(done_key)
+            if done is not None:
+                started, result = msgpack_loads(done)
+                if started >= published:
+                    # An execution that started after this call was queued covers it
+                    return result
+            # A redelivered leader finds its own lock
+            if client.set(lock_key, task_id, nx=True, ex=ttl) or (
+                client.get(lock_key) == task_id.encode()
+            ):
+                break
+            if client.eval(WAIT_SCRIPT, 2, lock_key, waiters_key, task_id, ttl):
+                # The running execution stores this task's result when it finishes
+                raise Ignore()
+
+        started = self.lock_time()
+        try:
+            result = super().__call__(*args, **kwargs)
+        except Retry:
+            # The retry keeps the lock and its waiters
+            raise
+        except Exception as exc:
+            self._finish(lock_key, waiters_key, exc, failed=True)
+            raise
+
+        try:
+            done = msgpack_dumps([started, result])
+        except Exception as exc:
+            # The task ran, but its waiters cannot take over a result msgpack cannot encode
+            logger.warning('Result of %s task %s cannot be shared: %r', self.name, task_id, exc)
+            self._finish(lock_key, waiters_key, exc, failed=True)
+            return result
+        try:
+            client.set(done_key, done, ex=ttl)
+        except redis.RedisError as exc:
+            # Waiters still get the result; duplicates queued from now on run again
+            logger.warning('Result of %s task %s was not stored: %r', self.name, task_id, exc)
+        finally:
+            self._finish(lock_key, waiters_key, result)
+        return result
+
+    def _finish(self, lock_key: str, waiters_key: str, result: Any, failed: bool = False):
+        waiters = self.lock_client.eval(FINISH_SCRIPT, 2, lock_key, waiters_key, self.request.id)
+        if self.ignore_result or isinstance(self.backend, DisabledBackend):
+            return
+        for waiter in map(bytes.decode, waiters):
+            if failed:
+                self.backend.mark_as_failure(waiter, result)
+            else:
+                self.backend.mark_as_done(waiter, result)
@@ -0,0 +1,105 @@
+"""
+Celery Worker Presets
+
+This module contains the worker profiles for the two kinds of queues a project
+usually has: CPU-bound tasks, which need one process per core and a short
+prefetch, and I/O-bound tasks, which spend their time waiting on the network
+and are cheaper to run in many threads of one process.
+"""
+
+import os
+from typing import Any
+
+from decouple import config
+
+# Redis and SQS redeliver unacknowledged tasks after the visibility timeout, so
+# it must stay above the hard time limit or late-acked tasks run twice
+MIN_VISIBILITY_TIMEOUT = 3600
+
+WORKER_PRESETS: dict[str, dict[str, Any]] = {
+    # Hashing, image processing, reports: one task per core at a time. A worker
+    # reserves a single task so long tasks do not hold up others in its buffer,
+    # and children are replaced before leaks or fragmentation pile up.
+    'cpu': {
+        'pool': 'prefork',
+        'concurrency_per_core': 1,
+        'prefetch_multiplier': 1,
+        'soft_time_limit': 240,
+        'time_limit': 300,
+        'max_tasks_per_child': 1000,
+        'max_memory_per_child': 512 * 1024,  # KiB
+    },
+    # HTTP calls, emails, webhooks: tasks mostly wait, so many threads share
+    # one process and reserve a few tasks each to hide the broker round trip.
+    # The threads pool does not enforce time limits or recycle anything; give
+    # every network call its own timeout instead.
+    'io': {
+        'pool': 'threads',
+        'concurrency_per_core': 16,
+        'prefetch_multiplier': 4,
+        'soft_time_limit': 60,
+        'time_limit': 90,
+        'max_tasks_per_child': None,
+        'max_memory_per_child': None,
+    },
+}
+
+
+def optional_int(value: str | int | None) -> int | None:
+    """Cast a setting to an int, where an empty value or ``None`` means no value."""
+    return int(value) if value not in ('', 'None', None) else None
+
+
+def get_worker_preset(name: str | None = None) -> dict[str, Any]:
+    """
+    Get the worker settings of a preset.
+
+    Every value can be overridden with the Celery environment variable of the
+    same name, e.g. ``CELERY_WORKER_CONCURRENCY`` or ``CELERY_TASK_TIME_LIMIT``.
+    Set ``CELERY_WORKER_MAX_TASKS_PER_CHILD`` (or the memory limit) to ``None``
+    to turn recycling off.
+
+    Args:
+        name: ``cpu`` or ``io``, defaults to ``CELERY_WORKER_PRESET`` (``cpu``)
+
+    Returns:
+        Dict with ``pool``, ``concurrency``, ``prefetch_multiplier``,
+        ``soft_time_limit``, ``time_limit``, ``max_tasks_per_child``,
+        ``max_memory_per_child`` (KiB) and ``visibility_timeout`` keys
+
+    Raises:
+        ValueError: If the preset does not exist
+    """
+    name = name or config('CELERY_WORKER_PRESET', default='cpu')
+    try:
+        preset = WORKER_PRESETS[name]
+    except KeyError:
+        choices = ', '.join(WORKER_PRESETS)
+        message = f'Unknown Celery worker preset {name!r}, expected one of: {choices}'
+        raise ValueError(message) from None
+
+    concurrency = (os.cpu_count() or 1) * preset['concurrency_per_core']
+    time_limit = config('CELERY_TASK_TIME_LIMIT', default=preset['time_limit'], cast=int)
+    return {
+        'pool': config('CELERY_WORKER_POOL', default=preset['pool']),
+        'concurrency': max(config('CELERY_WORKER_CONCURRENCY', default=concurrency, cast=int), 1),
+        'prefetch_multiplier': config(
+            'CELERY_WORKER_PREFETCH_MULTIPLIER', default=preset['prefetch_multiplier'], cast=int
+        ),
+        'soft_time_limit': min(
+            config('CELERY_TASK_SOFT_TIME_LIMIT', default=preset['soft_time_limit'], cast=int),
+            time_limit,
+        ),
+        'time_limit': time_limit,
+        'max_tasks_per_child': config(
+            'CELERY_WORKER_MAX_TASKS_PER_CHILD',
+            default=preset['max_tasks_per_child'],
+            cast=optional_int,
+        ),
+        'max_memory_per_child': config(
+            'CELERY_WORKER_MAX_MEMORY_PER_CHILD',
+            default=preset['max_memory_per_child'],
+            cast=optional_int,
+        ),
+        'visibility_timeout': max(MIN_VISIBILITY_TIMEOUT, time_limit * 2),
+    }
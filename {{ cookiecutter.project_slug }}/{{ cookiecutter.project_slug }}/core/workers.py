@@ -0,0 +1,109 @@
+"""
+Worker Process Helpers
+
+This module contains helpers for pre-forking servers that load the application
+once in a parent process: closing the parent's database and cache connections
+before forking, opening fresh ones in each worker, and reading a process's
+memory usage to see how much of it is shared with the parent.
+"""
+
+import logging
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Read in each worker to open a connection to every cache backend
+WARMUP_CACHE_KEY = 'core:workers:warmup'
+
+
+def close_parent_connections() -> None:
+    """
+    Close every database and cache connection of the parent process.
+
+    Forked workers would otherwise share the parent's sockets (and pool threads
+    that do not survive the fork), so this runs after the application is
+    preloaded and before the first worker is forked.
+    """
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+        close_pool = getattr(connection, 'close_pool', None)
+        if close_pool is not None:
+            close_pool()
+    for cache in caches.all(initialized_only=True):
+        cache.close()
+
+
+def open_worker_connections(threaded: bool = False) -> None:
+    """
+    Open database and cache connections before the worker accepts requests.
+
+    The first requests of a fresh worker then do not pay for the TCP and TLS
+    handshakes, which matters when workers are recycled regularly. Failures are
+    logged and left to the first request to retry.
+
+    Args:
+        threaded: Whether the worker serves requests on other threads. Django's
+            database connections belong to the thread that opened them, so then
+            only pooled databases are warmed. Redis connection pools are shared
+            by all threads either way.
+    """
+    for alias in settings.DATABASES:
+        connection = connections[alias]
+        if threaded and not connection.settings_dict['OPTIONS'].get('pool'):
+            continue
+        try:
+            connection.ensure_connection()
+        except DatabaseError as exc:
+            logger.warning('Could not connect to database %r: %s', alias, exc)
+            continue
+        if connection.settings_dict['OPTIONS'].get('pool'):
+            # Keep the pool open but hand the connection back to it
+            connection.close()
+    for alias in settings.CACHES:
+        try:
+            caches[alias].get(WARMUP_CACHE_KEY)
+        except Exception as exc:
+            logger.warning('Could not connect to cache %r: %s', alias, exc)
+
+
+def get_memory_usage(pid: int | str = 'self') -> dict[str, Any]:
+    """
+    Read the memory usage of a process from ``/proc`` (Linux only).
+
+    ``shared`` is resident memory also mapped by other processes, such as pages
+    inherited from a preloaded parent that neither side has written to since the
+    fork. ``private`` is what the process would free if it exited, and ``pss``
+    charges shared pages proportionally to every process that maps them.
+
+    Args:
+        pid: Process id, defaults to the current process
+
+    Returns:
+        Dict with ``rss``, ``pss``, ``shared`` and ``private`` in bytes, or an
+        empty dict when the information is not available
+    """
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as rollup:
+            lines = rollup.readlines()[1:]
+    except OSError:
+        return {}
+
+    fields = {}
+    for line in lines:
+        name, _, value = line.partition(':')
+        fields[name] = int(value.split()[0]) * 1024
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'shared': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0),
+        'private': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+    }
+
+
+def format_memory_usage(usage: dict[str, Any]) -> str:
+    """Format :func:`get_memory_usage` as ``rss=... shared=... private=...`` in MiB."""
+    return ' '.join(f'{name}={value / 2**20:.1f}MiB' for name, value in usage.items())
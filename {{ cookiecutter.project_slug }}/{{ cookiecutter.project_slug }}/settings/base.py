@@ -12,6 +12,15 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 import os
 from pathlib import Path
 from datetime import timedelta
+{%- if cookiecutter.use_celery == 'y' %}
+{% if cookiecutter.celery_results == 'django-db' %}
+from celery.schedules import crontab
+{%- endif %}
+from kombu import Queue
+
+from {{ cookiecutter.project_slug }}.core.serialization import SERIALIZERS
+from {{ cookiecutter.project_slug }}.core.worker_presets import get_worker_preset
+{%- endif %}
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 # BASE_DIR points to the directory containing manage.py
@@ -46,8 +55,12 @@ DJANGO_APPS = [
 ]
 
 THIRD_PARTY_APPS = [
+{%- if cookiecutter.use_celery == 'y' %}
     'django_celery_beat',       # Celery Periodic Tasks Scheduler
+{%- if cookiecutter.celery_results == 'django-db' %}
     'django_celery_results',    # Celery Result Backend using Django ORM
+{%- endif %}
+{%- endif %}
     'rest_framework_simplejwt', # JWT Authentication
     'guardian',                 # Object-level Permissions
     'django_redis',             # Redis Cache Backend
@@ -66,14 +79,61 @@ LOCAL_APPS = [
 # Combine the lists
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
+# Session, CSRF, authentication, messages and clickjacking middleware are API-aware
+# subclasses of Django's: bearer-token API requests under API_FAST_PATH_PREFIXES skip them,
+# the admin keeps the full stack. Set API_MIDDLEWARE_FAST_PATH=False to disable.
+API_MIDDLEWARE_FAST_PATH = (
+    os.getenv('API_MIDDLEWARE_FAST_PATH', 'True').lower() in ('true', '1', 'yes')
+)
+API_FAST_PATH_PREFIXES = ('/api/',)
+
+# Share of requests timed by ServerTimingMiddleware (Server-Timing header and a log line
+# with DB, cache and outbound HTTP time). 0 disables it without any per-request cost.
+SERVER_TIMING_SAMPLE_RATE = float(os.getenv('SERVER_TIMING_SAMPLE_RATE', '0'))
+
+# Prometheus metrics at /metrics (see core/metrics.py), which is only routed while
+# METRICS_ENABLED is on. With METRICS_TOKEN set, scrapes must send
+# "Authorization: Bearer <token>". settings/production.py turns them off by default.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() in ('true', '1', 'yes')
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Query inspector (see core/queries.py), on in settings/local.py: logs a warning for
+# query shapes repeated QUERY_INSPECTOR_REPEAT_THRESHOLD times in one request (N+1) and
+# for queries over QUERY_INSPECTOR_SLOW_MS, with the EXPLAIN (ANALYZE, BUFFERS) plan.
+QUERY_INSPECTOR_ENABLED = (
+    os.getenv('QUERY_INSPECTOR_ENABLED', 'False').lower() in ('true', '1', 'yes')
+)
+QUERY_INSPECTOR_SLOW_MS = float(os.getenv('QUERY_INSPECTOR_SLOW_MS', '100'))
+QUERY_INSPECTOR_REPEAT_THRESHOLD = int(os.getenv('QUERY_INSPECTOR_REPEAT_THRESHOLD', '5'))
+QUERY_INSPECTOR_EXPLAIN = (
+    os.getenv('QUERY_INSPECTOR_EXPLAIN', 'True').lower() in ('true', '1', 'yes')
+)
+{%- if cookiecutter.include_opentelemetry == 'y' %}
+
+# OpenTelemetry tracing (see core/tracing.py), off unless OTEL_ENABLED is set. The OTLP
+# exporter reads the standard OTEL_EXPORTER_OTLP_* variables, e.g.
+# OTEL_EXPORTER_OTLP_ENDPOINT=http://jaeger:4318. New traces are sampled at
+# OTEL_TRACES_SAMPLE_RATE; requests and tasks continue their caller's decision.
+OTEL_ENABLED = os.getenv('OTEL_ENABLED', 'False').lower() in ('true', '1', 'yes')
+OTEL_SERVICE_NAME = os.getenv('OTEL_SERVICE_NAME', '{{ cookiecutter.project_slug }}')
+OTEL_TRACES_EXPORTER = os.getenv('OTEL_TRACES_EXPORTER', 'otlp')  # otlp, console or none
+OTEL_TRACES_SAMPLE_RATE = float(os.getenv('OTEL_TRACES_SAMPLE_RATE', '0.1'))
+OTEL_EXCLUDED_URLS = os.getenv('OTEL_EXCLUDED_URLS', '/metrics$,/static/')
+{%- endif %}
+
 MIDDLEWARE = [
+    # Development: N+1 and slow queries
+    '{{ cookiecutter.project_slug }}.core.middleware.QueryInspectorMiddleware',
+    '{{ cookiecutter.project_slug }}.core.middleware.ServerTimingMiddleware', # Times everything below
+    '{{ cookiecutter.project_slug }}.core.middleware.MetricsMiddleware', # Prometheus request latency
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    '{{ cookiecutter.project_slug }}.core.middleware.PrimaryPinningMiddleware', # Read replicas
+    '{{ cookiecutter.project_slug }}.core.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    '{{ cookiecutter.project_slug }}.core.middleware.CsrfViewMiddleware',
+    '{{ cookiecutter.project_slug }}.core.middleware.AuthenticationMiddleware',
+    '{{ cookiecutter.project_slug }}.core.middleware.MessageMiddleware',
+    '{{ cookiecutter.project_slug }}.core.middleware.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = '{{ cookiecutter.project_slug }}.urls'
@@ -102,6 +162,8 @@ ASGI_APPLICATION = '{{ cookiecutter.project_slug }}.asgi.application'
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 # Database configuration will be handled in local.py and production.py
 DATABASES = {}
+# Aliases of read replicas, populated from POSTGRES_REPLICA_HOSTS
+DATABASE_REPLICAS = []
 
 
 # Authentication Backends
@@ -149,7 +211,8 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.0/howto/static-files/
 
 STATIC_URL = '/static/'
-STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles') # For collectstatic
+# For collectstatic
+STATIC_ROOT = os.getenv('DJANGO_STATIC_ROOT', os.path.join(BASE_DIR, 'staticfiles'))
 STATICFILES_DIRS = [
     os.path.join(PROJECT_DIR, 'static'), # Optional: common static files dir
 ]
@@ -159,6 +222,25 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'mediafiles')
 
 
+# Logging
+# Project loggers (e.g. request timings) go to the console; Django keeps its defaults.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        '{{ cookiecutter.project_slug }}': {
+            'handlers': ['console'],
+            'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -169,15 +251,125 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Celery Configuration Options
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html
 CELERY_BROKER_URL = "{{ cookiecutter.celery_broker_url }}"
-CELERY_RESULT_BACKEND = "{{ cookiecutter.celery_result_backend }}"
-CELERY_ACCEPT_CONTENT = ['json']
-CELERY_TASK_SERIALIZER = 'json'
-CELERY_RESULT_SERIALIZER = 'json'
+# Payload format of tasks and results. JSON by default, which Flower, celery inspect and
+# consumers outside Celery can read. Opt in to orjson or msgpack, optionally compressed
+# with zlib or zstd once larger than CELERY_COMPRESS_MIN_LENGTH bytes (e.g. msgpack+zstd),
+# when every reader is a worker of this project. Every format stays accepted, so workers
+# still read tasks queued before a format change.
+# See core/serialization.py and benchmarks/celery_serialization.py
+CELERY_TASK_SERIALIZER = os.getenv('CELERY_TASK_SERIALIZER', 'json')
+{%- if cookiecutter.celery_results == 'django-db' %}
+# JSON keeps stored results readable in the admin
+CELERY_RESULT_SERIALIZER = os.getenv('CELERY_RESULT_SERIALIZER', 'json')
+{%- else %}
+CELERY_RESULT_SERIALIZER = os.getenv('CELERY_RESULT_SERIALIZER', CELERY_TASK_SERIALIZER)
+{%- endif %}
+CELERY_ACCEPT_CONTENT = ['json', *SERIALIZERS]
+# Task arguments and stored results larger than CLAIM_CHECK_THRESHOLD bytes (serialized)
+# are put in this store (redis:// or a file:// directory shared by all containers) and
+# only a reference goes through the broker. Blobs are deleted once the task is
+# acknowledged and expire after CLAIM_CHECK_TTL seconds otherwise; see core/claim_check.py
+CLAIM_CHECK_URL = os.getenv('CLAIM_CHECK_URL', 'redis://redis:6379/3')
+CLAIM_CHECK_THRESHOLD = int(os.getenv('CLAIM_CHECK_THRESHOLD', str(64 * 1024)))
+CLAIM_CHECK_TTL = int(os.getenv('CLAIM_CHECK_TTL', str(7 * 86400)))
+# Redis holding the buffered calls of batch tasks (core/batching.py), defaults to the broker
+TASK_BATCH_URL = os.getenv('TASK_BATCH_URL', '')
+# Redis holding the locks of unique tasks (core/unique.py), defaults to the broker, and the
+# seconds a lock is held at most unless a task sets unique_ttl
+TASK_LOCK_URL = os.getenv('TASK_LOCK_URL', '')
+TASK_UNIQUE_TTL = int(os.getenv('TASK_UNIQUE_TTL', '3600'))
 CELERY_TIMEZONE = TIME_ZONE
-# Use Django-Celery-Results as the result backend
+# Periodic tasks are defined in the django_celery_beat tables. DatabaseScheduler polls them
+# and allows a single beat process; {{ cookiecutter.project_slug }}.core.beat:RedisScheduler keeps
+# due times in Redis and lets several beat replicas run, with one leader at a time.
+CELERY_BEAT_SCHEDULER = os.getenv(
+    'CELERY_BEAT_SCHEDULER', 'django_celery_beat.schedulers:DatabaseScheduler'
+)
+# Redis holding the RedisScheduler due index and leader lease, defaults to the broker, and the
+# seconds after which a standby replica takes over from a leader that stopped renewing it
+BEAT_REDIS_URL = os.getenv('BEAT_REDIS_URL', '')
+BEAT_LEASE_TTL = int(os.getenv('BEAT_LEASE_TTL', '30'))
+
+# Task results: most tasks are fire-and-forget, so results are only stored for tasks
+# that opt in with @shared_task(ignore_result=False), and expire after
+# CELERY_RESULT_EXPIRES seconds.
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_RESULT_EXPIRES = timedelta(seconds=int(os.getenv('CELERY_RESULT_EXPIRES', '86400')))
+{%- if cookiecutter.celery_results == 'redis' %}
+# Stored in Redis with CELERY_RESULT_EXPIRES as their TTL
+CELERY_RESULT_BACKEND = "{{ cookiecutter.celery_result_backend }}"
+{%- elif cookiecutter.celery_results == 'django-db' %}
+# Stored in the django_celery_results tables (visible in the admin), including the task
+# name and arguments. core.results.cleanup_task_results prunes expired rows in chunks
+# every night, in place of Celery's single-transaction celery.backend_cleanup.
+CELERY_RESULT_BACKEND = 'django-db'
 CELERY_RESULT_EXTENDED = True
-# Make Celery Beat use the Django database scheduler
-CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+CELERY_IMPORTS = ('{{ cookiecutter.project_slug }}.core.results',)
+CELERY_BEAT_SCHEDULE = {
+    'celery.backend_cleanup': {
+        'task': '{{ cookiecutter.project_slug }}.core.results.cleanup_task_results',
+        'schedule': crontab(minute=0, hour=4),
+        'options': {'expire_seconds': 12 * 3600},
+    },
+}
+# Rows deleted per statement and seconds to wait between statements
+TASK_RESULT_CLEANUP_CHUNK_SIZE = int(os.getenv('TASK_RESULT_CLEANUP_CHUNK_SIZE', '1000'))
+TASK_RESULT_CLEANUP_PAUSE = float(os.getenv('TASK_RESULT_CLEANUP_PAUSE', '0.05'))
+{%- else %}
+# Not stored: AsyncResult.get() is unavailable
+CELERY_RESULT_BACKEND = None
+{%- endif %}
+
+# Worker profile for the queue this worker consumes: 'cpu' (prefork, one child per core,
+# prefetch 1, recycled children) or 'io' (many threads, prefetch 4). Each value can be
+# overridden with the environment variable of the same name; see core/worker_presets.py
+CELERY_WORKER_PRESET = os.getenv('CELERY_WORKER_PRESET', 'cpu')
+_worker_preset = get_worker_preset(CELERY_WORKER_PRESET)
+CELERY_WORKER_POOL = _worker_preset['pool']
+CELERY_WORKER_CONCURRENCY = _worker_preset['concurrency']
+CELERY_WORKER_PREFETCH_MULTIPLIER = _worker_preset['prefetch_multiplier']
+# Soft limit raises SoftTimeLimitExceeded in the task, the hard limit kills the child
+# (both prefork only)
+CELERY_TASK_SOFT_TIME_LIMIT = _worker_preset['soft_time_limit']
+CELERY_TASK_TIME_LIMIT = _worker_preset['time_limit']
+# Replace prefork children after this many tasks or once they use this much memory (KiB)
+CELERY_WORKER_MAX_TASKS_PER_CHILD = _worker_preset['max_tasks_per_child']
+CELERY_WORKER_MAX_MEMORY_PER_CHILD = _worker_preset['max_memory_per_child']
+# Acknowledge after the task ran, and requeue it if the child running it dies (OOM kill,
+# deploy), so tasks must be idempotent. A child killed at the hard time limit is not
+# requeued: the task fails with TimeLimitExceeded and is acknowledged
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+# Cancel unacknowledged tasks when the broker connection drops, since the broker
+# redelivers them anyway
+CELERY_WORKER_CANCEL_LONG_RUNNING_TASKS_ON_CONNECTION_LOSS = True
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'visibility_timeout': _worker_preset['visibility_timeout'],
+    # One Redis list per priority and queue, drained from 0 (highest) to 9 (lowest)
+    'priority_steps': list(range(10)),
+    'sep': ':',
+}
+# Tasks published without a priority sit in the middle, so apply_async(priority=0) jumps
+# ahead of them and priority=9 waits behind them (Redis orders 0 first)
+CELERY_TASK_DEFAULT_PRIORITY = 5
+
+# Queues, each consumed by its own worker service in docker-compose.yml, so a flood of
+# bulk jobs cannot delay latency-sensitive tasks
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_QUEUES = (
+    Queue('critical'),  # Short and latency-sensitive: emails, token cleanup
+    Queue('default'),
+    Queue('bulk'),  # Long-running batch work: imports, exports, reports
+)
+# Routes by task name (glob patterns, first match wins). Tasks can also set their queue
+# with @shared_task(queue=...) or per call with apply_async(queue=...).
+CELERY_TASK_ROUTES = {
+    '*.send_*': {'queue': 'critical'},
+    '*.clear_expired_*': {'queue': 'critical'},
+    '*.import_*': {'queue': 'bulk'},
+    '*.export_*': {'queue': 'bulk'},
+    '*.generate_*_report': {'queue': 'bulk'},
+}
 {% endif %}
 
 
@@ -243,6 +435,10 @@ GITHUB_OAUTH2_CLIENT_SECRET = os.getenv("GITHUB_OAUTH2_CLIENT_SECRET", None)
 FACEBOOK_OAUTH2_CLIENT_ID = os.getenv("FACEBOOK_OAUTH2_CLIENT_ID", None)
 FACEBOOK_OAUTH2_CLIENT_SECRET = os.getenv("FACEBOOK_OAUTH2_CLIENT_SECRET", None)
 
+# Load tests only: send token and user info requests of every provider to
+# <url>/<provider>/token and <url>/<provider>/userinfo (benchmarks/load/fake_oauth2.py)
+OAUTH2_FAKE_PROVIDER_URL = os.getenv("OAUTH2_FAKE_PROVIDER_URL", "")
+
 # Social Auth Settings (for social-auth-app-django)
 SOCIAL_AUTH_GOOGLE_OAUTH2_KEY = GOOGLE_OAUTH2_CLIENT_ID
 SOCIAL_AUTH_GOOGLE_OAUTH2_SECRET = GOOGLE_OAUTH2_CLIENT_SECRET
@@ -2,11 +2,20 @@ from .base import *
 import os
 from decouple import config, Csv  # Using python-decouple for env vars
 
+from {{ cookiecutter.project_slug }}.core.cache import get_redis_cache_options
+from {{ cookiecutter.project_slug }}.core.db import get_connection_settings, get_replica_databases
+
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
 ALLOWED_HOSTS = ["localhost", "127.0.0.1", "0.0.0.0"]
 
+# Time every request during development (Server-Timing header and a log line)
+SERVER_TIMING_SAMPLE_RATE = config("SERVER_TIMING_SAMPLE_RATE", default=1.0, cast=float)
+
+# Log N+1 patterns and slow queries with their plan (see core/queries.py)
+QUERY_INSPECTOR_ENABLED = config("QUERY_INSPECTOR_ENABLED", default=True, cast=bool)
+
 # Use python-decouple to load sensitive settings from .env file or environment variables
 # Create a .env file in the root directory (where manage.py is) for local development
 # Example .env:
@@ -33,6 +42,30 @@ DATABASES = {
         ),  # Internal port within docker network
     }
 }
+
+# Connection pooling with psycopg3's native pool (sized per process from GUNICORN_THREADS
+# or the Celery worker pool/concurrency). Set DB_POOL=False to fall back to persistent
+# connections controlled by DB_CONN_MAX_AGE.
+DB_POOL = config("DB_POOL", default={% if cookiecutter.use_db_pool == 'y' %}True{% else %}False{% endif %}, cast=bool)
+# Set DB_PGBOUNCER=True when POSTGRES_HOST points at PgBouncer in transaction pooling
+# mode: disables server-side cursors and prepared statements (see DB_PREPARE_THRESHOLD).
+DB_PGBOUNCER = config("DB_PGBOUNCER", default={% if cookiecutter.use_pgbouncer == 'y' %}True{% else %}False{% endif %}, cast=bool)
+DATABASES["default"].update(get_connection_settings(DB_POOL, pgbouncer=DB_PGBOUNCER))
+
+# Streaming read replicas as a comma-separated list of host[:port]. Reads are routed to
+# a replica unless it lags more than DATABASE_REPLICA_MAX_LAG seconds; writes and reads
+# after a write (pinned for DB_PRIMARY_PIN_SECONDS via a cookie) go to the primary.
+POSTGRES_REPLICA_HOSTS = config("POSTGRES_REPLICA_HOSTS", default="", cast=Csv())
+DATABASES.update(get_replica_databases(DATABASES["default"], POSTGRES_REPLICA_HOSTS))
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ["{{ cookiecutter.project_slug }}.core.routers.PrimaryReplicaRouter"]
+DATABASE_REPLICA_MAX_LAG = config("DATABASE_REPLICA_MAX_LAG", default=5.0, cast=float)
+DATABASE_REPLICA_LAG_CHECK_INTERVAL = config(
+    "DATABASE_REPLICA_LAG_CHECK_INTERVAL", default=5.0, cast=float
+)
+DB_PRIMARY_PIN_SECONDS = config("DB_PRIMARY_PIN_SECONDS", default=5, cast=int)
+
 # Optional: Use DATABASE_URL from environment if defined and dj-database-url is installed
 # from dj_database_url import parse as db_url
 # DATABASES['default'] = config('DATABASE_URL', cast=db_url, default=f"postgres://{DATABASES['default']['USER']}:{DATABASES['default']['PASSWORD']}@{DATABASES['default']['HOST']}:{DATABASES['default']['PORT']}/{DATABASES['default']['NAME']}")
@@ -44,9 +77,11 @@ DATABASES = {
 CELERY_BROKER_URL = config(
     "CELERY_BROKER_URL", default="{{ cookiecutter.celery_broker_url }}"
 )
+{%- if cookiecutter.celery_results == 'redis' %}
 CELERY_RESULT_BACKEND = config(
     "CELERY_RESULT_BACKEND", default="{{ cookiecutter.celery_result_backend }}"
 )
+{%- endif %}
 {% endif %}
 
 
@@ -54,15 +89,26 @@ CELERY_RESULT_BACKEND = config(
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
 # Cache (use Redis defined in docker-compose)
+# Tuned django-redis profile: hiredis parser, per-process blocking pool, socket timeouts,
+# msgpack serializer and zstd above CACHE_COMPRESS_MIN_LENGTH bytes (see core/cache.py)
 CACHE_URL = config("CACHE_URL", default="redis://redis:6379/2")
 CACHES = {
     "default": {
         "BACKEND": "django_redis.cache.RedisCache",
         "LOCATION": CACHE_URL,
+        "OPTIONS": get_redis_cache_options(),
+    },
+    # In-process LRU in front of "default" for hot keys, invalidated via Redis pub/sub
+    # (use caches["tiered"]; see core/tiered_cache.py)
+    "tiered": {
+        "BACKEND": "{{ cookiecutter.project_slug }}.core.tiered_cache.TwoTierCache",
+        "LOCATION": CACHE_URL,
         "OPTIONS": {
-            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "L2_CACHE": "default",
+            "MAX_ENTRIES": config("CACHE_L1_MAX_ENTRIES", default=1000, cast=int),
+            "L1_TIMEOUT": config("CACHE_L1_TIMEOUT", default=30.0, cast=float),
         },
-    }
+    },
 }
 
 # Add django-extensions if you want it for development
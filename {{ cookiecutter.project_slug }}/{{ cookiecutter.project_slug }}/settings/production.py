@@ -1,6 +1,17 @@
 from .base import *
 import os
 from decouple import config, Csv
+from django.core.exceptions import ImproperlyConfigured
+{%- if cookiecutter.include_sentry == 'y' %}
+import sentry_sdk
+from sentry_sdk.integrations.django import DjangoIntegration
+{%- endif %}
+
+from {{ cookiecutter.project_slug }}.core.cache import get_redis_cache_options
+from {{ cookiecutter.project_slug }}.core.db import get_connection_settings, get_replica_databases
+{%- if cookiecutter.include_sentry == 'y' %}
+from {{ cookiecutter.project_slug }}.core.sampling import TracesSampler
+{%- endif %}
 
 # SECURITY WARNING: keep the secret key used in production secret!
 # Must be set via environment variable in production
@@ -9,7 +20,7 @@ SECRET_KEY = config('DJANGO_SECRET_KEY')
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = config('DJANGO_DEBUG', default=False, cast=bool)
 
-ALLOWED_HOSTS = config('DJANGO_ALLOWED_HOSTS', cast=Csv(), default=[])
+ALLOWED_HOSTS = config('DJANGO_ALLOWED_HOSTS', cast=Csv(), default='')
 
 
 # Middleware Configuration - Add WhiteNoise
@@ -34,41 +45,107 @@ DATABASES = {
     }
 }
 
+# Connection pooling with psycopg3's native pool (sized per process from GUNICORN_THREADS
+# or the Celery worker pool/concurrency). Set DB_POOL=False to fall back to persistent
+# connections controlled by DB_CONN_MAX_AGE.
+DB_POOL = config('DB_POOL', default={% if cookiecutter.use_db_pool == 'y' %}True{% else %}False{% endif %}, cast=bool)
+# Set DB_PGBOUNCER=True when POSTGRES_HOST points at PgBouncer in transaction pooling
+# mode: disables server-side cursors and prepared statements (see DB_PREPARE_THRESHOLD).
+DB_PGBOUNCER = config('DB_PGBOUNCER', default={% if cookiecutter.use_pgbouncer == 'y' %}True{% else %}False{% endif %}, cast=bool)
+DATABASES['default'].update(get_connection_settings(DB_POOL, pgbouncer=DB_PGBOUNCER))
+
+# Streaming read replicas as a comma-separated list of host[:port]. Reads are routed to
+# a replica unless it lags more than DATABASE_REPLICA_MAX_LAG seconds; writes and reads
+# after a write (pinned for DB_PRIMARY_PIN_SECONDS via a cookie) go to the primary.
+POSTGRES_REPLICA_HOSTS = config('POSTGRES_REPLICA_HOSTS', default='', cast=Csv())
+DATABASES.update(get_replica_databases(DATABASES['default'], POSTGRES_REPLICA_HOSTS))
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['{{ cookiecutter.project_slug }}.core.routers.PrimaryReplicaRouter']
+DATABASE_REPLICA_MAX_LAG = config('DATABASE_REPLICA_MAX_LAG', default=5.0, cast=float)
+DATABASE_REPLICA_LAG_CHECK_INTERVAL = config(
+    'DATABASE_REPLICA_LAG_CHECK_INTERVAL', default=5.0, cast=float
+)
+DB_PRIMARY_PIN_SECONDS = config('DB_PRIMARY_PIN_SECONDS', default=5, cast=int)
+
+# Prometheus metrics are off unless METRICS_ENABLED is set, and scrapes must then send
+# "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_ENABLED = config('METRICS_ENABLED', default=False, cast=bool)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+if METRICS_ENABLED and not METRICS_TOKEN:
+    raise ImproperlyConfigured('METRICS_TOKEN must be set when METRICS_ENABLED is on')
+
 
 {% if cookiecutter.use_celery == 'y' %}
 # Celery
 CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='{{ cookiecutter.celery_broker_url }}')
+{%- if cookiecutter.celery_results == 'redis' %}
 CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default='{{ cookiecutter.celery_result_backend }}')
+{%- endif %}
 {% endif %}
 
 
-# Static files storage using whitenoise
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Static files storage using whitenoise. collectstatic runs when the image is built and
+# writes hashed file names plus gzip and Brotli copies of each file; WhiteNoise serves
+# hashed files with a far-future "immutable" Cache-Control and picks the encoding per request.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+# Cache lifetime (seconds) of static files without a hash in their name
+WHITENOISE_MAX_AGE = config('WHITENOISE_MAX_AGE', default=3600, cast=int)
 
 
 # Cache
+# Tuned django-redis profile: hiredis parser, per-process blocking pool, socket timeouts,
+# msgpack serializer and zstd above CACHE_COMPRESS_MIN_LENGTH bytes (see core/cache.py)
 CACHE_URL = config('CACHE_URL', default='redis://redis:6379/2')
 CACHES = {
     'default': {
         'BACKEND': 'django_redis.cache.RedisCache',
         'LOCATION': CACHE_URL,
+        'OPTIONS': get_redis_cache_options(),
+    },
+    # In-process LRU in front of "default" for hot keys, invalidated via Redis pub/sub
+    # (use caches['tiered']; see core/tiered_cache.py)
+    'tiered': {
+        'BACKEND': '{{ cookiecutter.project_slug }}.core.tiered_cache.TwoTierCache',
+        'LOCATION': CACHE_URL,
         'OPTIONS': {
-            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
-        }
-    }
+            'L2_CACHE': 'default',
+            'MAX_ENTRIES': config('CACHE_L1_MAX_ENTRIES', default=1000, cast=int),
+            'L1_TIMEOUT': config('CACHE_L1_TIMEOUT', default=30.0, cast=float),
+        },
+    },
 }
 
 
 # Sentry
 {% if cookiecutter.include_sentry == 'y' %}
-import sentry_sdk
-from sentry_sdk.integrations.django import DjangoIntegration
+# Trace sample rate per URL path or Celery task name prefix (first match wins); other
+# requests use SENTRY_TRACES_SAMPLE_RATE. Upstream sampling decisions are always kept,
+# and rates are scaled down so each process starts at most SENTRY_TRACES_MAX_PER_SECOND
+# traces per second. Errors are reported regardless of trace sampling.
+SENTRY_TRACES_ROUTE_RATES = [
+    ('/static/', 0.0),
+    ('/api{% if cookiecutter.api_versioning == 'v1' %}/v1{% endif %}/accounts/users/me', 0.01),
+    ('/api{% if cookiecutter.api_versioning == 'v1' %}/v1{% endif %}/accounts/auth/', 0.2),
+    ('/api{% if cookiecutter.api_versioning == 'v1' %}/v1{% endif %}/accounts/oauth2/callback', 1.0),
+]
 
 sentry_sdk.init(
     dsn=config('SENTRY_DSN', default=''),
     integrations=[DjangoIntegration()],
-    traces_sample_rate=config('SENTRY_TRACES_SAMPLE_RATE', default=1.0, cast=float),
-    send_default_pii=True,
+    traces_sampler=TracesSampler(
+        default_rate=config('SENTRY_TRACES_SAMPLE_RATE', default=0.1, cast=float),
+        route_rates=SENTRY_TRACES_ROUTE_RATES,
+        max_per_second=config('SENTRY_TRACES_MAX_PER_SECOND', default=5.0, cast=float),
+    ),
+    send_default_pii=config('SENTRY_SEND_DEFAULT_PII', default=False, cast=bool),
 )
 {% endif %}
 
@@ -18,6 +18,7 @@ from rest_framework_simplejwt.views import (
 
 from ninja import NinjaAPI
 from {{ cookiecutter.project_slug }}.accounts.api import router as accounts_router
+from {{ cookiecutter.project_slug }}.core.metrics import metrics_view
 
 api = NinjaAPI(
     title="{{ cookiecutter.project_name }} API",
@@ -34,6 +35,9 @@ urlpatterns = [
     path('{{ api_prefix }}token/verify/', TokenVerifyView.as_view(), name='token_verify'),
 ]
 
+if settings.METRICS_ENABLED:
+    urlpatterns.append(path('metrics', metrics_view, name='metrics'))
+
 # Serve static and media files during development
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)